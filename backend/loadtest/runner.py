@@ -0,0 +1,177 @@
+"""
+Ramp-up load test for the Extracto backend.
+
+Usage (from the ``backend`` directory):
+
+    python -m loadtest.seed_fixtures --users 50 --manifest fixtures.json
+    python -m loadtest.runner --manifest fixtures.json --stages 50,100,250,500 --in-process
+    python -m loadtest.runner --manifest fixtures.json --base-url http://localhost:8080
+
+Each stage holds a fixed number of virtual users for ``--stage-duration`` seconds.
+The report contains latency percentiles and error rates per stage and per request,
+plus the saturation curve (throughput and p95 against concurrency).
+"""
+import argparse
+import asyncio
+import json
+import math
+import time
+from collections import defaultdict
+
+import httpx
+
+from loadtest.scenarios import SCENARIOS, VirtualUser, pick_scenario, shared_cookies
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = defaultdict(list)
+
+    def record(self, stage, name, latency, status_code, error):
+        self.samples[stage].append((name, latency, status_code, error))
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(samples, duration):
+    latencies = sorted(sample[1] for sample in samples)
+    errors = [sample for sample in samples if sample[3] is not None]
+    summary = {
+        "requests": len(samples),
+        "errors": len(errors),
+        "errorRate": round(len(errors) / len(samples), 4) if samples else 0.0,
+        "throughput": round(len(samples) / duration, 2) if duration else 0.0,
+    }
+    for pct in PERCENTILES:
+        value = percentile(latencies, pct)
+        summary[f"p{pct}Ms"] = round(value * 1000, 2) if value is not None else None
+    return summary
+
+
+def build_report(recorder, stage_durations):
+    stages = []
+    for concurrency, duration in stage_durations:
+        samples = recorder.samples[concurrency]
+        per_request = defaultdict(list)
+        error_kinds = defaultdict(int)
+        for sample in samples:
+            per_request[sample[0]].append(sample)
+            if sample[3] is not None:
+                error_kinds[f"{sample[0]}: {sample[3]}"] += 1
+        stages.append({
+            "concurrency": concurrency,
+            "durationSec": round(duration, 2),
+            **summarize(samples, duration),
+            "requestsByName": {name: summarize(items, duration) for name, items in sorted(per_request.items())},
+            "errorsByKind": dict(error_kinds),
+        })
+    saturation = [
+        {"concurrency": stage["concurrency"], "throughput": stage["throughput"], "p95Ms": stage["p95Ms"],
+         "errorRate": stage["errorRate"]}
+        for stage in stages
+    ]
+    return {"stages": stages, "saturationCurve": saturation}
+
+
+def print_report(report):
+    header = f"{'users':>6} {'req/s':>9} {'p50ms':>9} {'p90ms':>9} {'p95ms':>9} {'p99ms':>9} {'errors':>8}"
+    print(header)
+    print("-" * len(header))
+    for stage in report["stages"]:
+        print(
+            f"{stage['concurrency']:>6} {stage['throughput']:>9} {stage['p50Ms'] or '-':>9} {stage['p90Ms'] or '-':>9} "
+            f"{stage['p95Ms'] or '-':>9} {stage['p99Ms'] or '-':>9} {stage['errorRate'] * 100:>7.2f}%"
+        )
+
+
+async def virtual_user_loop(user: VirtualUser, scenario_names, deadline, think_time):
+    if not user.access_token:
+        await user.login()
+    while time.monotonic() < deadline:
+        await pick_scenario(scenario_names)(user)
+        if think_time:
+            await asyncio.sleep(think_time)
+
+
+def build_client(args, max_connections):
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    timeout = httpx.Timeout(args.timeout)
+    if args.in_process:
+        from extracto.main import app
+
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        return httpx.AsyncClient(
+            transport=transport, base_url="http://extracto.loadtest", timeout=timeout, cookies=shared_cookies()
+        )
+    return httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=timeout, cookies=shared_cookies())
+
+
+async def run(args):
+    with open(args.manifest) as fp:
+        users = json.load(fp)["users"]
+    if not users:
+        raise ValueError(f"No users found in fixtures manifest '{args.manifest}'")
+
+    stages = [int(stage) for stage in args.stages.split(",")]
+    scenario_names = args.scenarios.split(",") if args.scenarios else list(SCENARIOS)
+    unknown = set(scenario_names) - set(SCENARIOS)
+    if unknown:
+        raise ValueError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    recorder = Recorder()
+    stage_durations = []
+    async with build_client(args, max(stages)) as client:
+        # Virtual users are kept across stages so the ramp only adds sessions.
+        pool = []
+        for concurrency in stages:
+            while len(pool) < concurrency:
+                pool.append(VirtualUser(
+                    client, users[len(pool) % len(users)], recorder,
+                    task_poll_attempts=args.task_poll_attempts, task_poll_interval=args.task_poll_interval
+                ))
+            for user in pool:
+                user.stage = concurrency
+            started = time.monotonic()
+            deadline = started + args.stage_duration
+            await asyncio.gather(*[
+                virtual_user_loop(user, scenario_names, deadline, args.think_time) for user in pool[:concurrency]
+            ])
+            stage_durations.append((concurrency, time.monotonic() - started))
+            print(f"Stage with {concurrency} users finished ({len(recorder.samples[concurrency])} requests).")
+
+    report = build_report(recorder, stage_durations)
+    report["target"] = "in-process" if args.in_process else args.base_url
+    report["scenarios"] = scenario_names
+    with open(args.output, "w") as fp:
+        json.dump(report, fp, indent=2)
+    print_report(report)
+    print(f"Report written to {args.output}")
+    return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Ramp-up load test for the Extracto API.")
+    parser.add_argument("--manifest", default="fixtures.json", help="Manifest written by loadtest.seed_fixtures.")
+    parser.add_argument("--base-url", default="http://localhost:8080", help="Target of a running uvicorn server.")
+    parser.add_argument("--in-process", action="store_true", help="Drive the ASGI app in-process instead.")
+    parser.add_argument("--stages", default="10,50,100,250,500", help="Comma separated concurrency levels.")
+    parser.add_argument("--stage-duration", type=float, default=30, help="Seconds spent at each stage.")
+    parser.add_argument("--scenarios", default=None, help=f"Subset of: {', '.join(SCENARIOS)}.")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Pause between scenarios of one user.")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds.")
+    parser.add_argument("--task-poll-attempts", type=int, default=5)
+    parser.add_argument("--task-poll-interval", type=float, default=0.5)
+    parser.add_argument("--output", default="loadtest_report.json")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_args()))
@@ -0,0 +1,156 @@
+import asyncio
+import random
+import time
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+
+import httpx
+
+API_PREFIX = "/api/v1"
+SAMPLE_DOCUMENT = b"%PDF-1.4\n% Extracto load-test fixture\n%%EOF\n"
+
+
+def shared_cookies() -> CookieJar:
+    """Cookie jar for the shared client that stores nothing; each VirtualUser keeps its own."""
+    return CookieJar(policy=DefaultCookiePolicy(allowed_domains=[]))
+
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, credentials: dict, recorder, task_poll_attempts: int = 5,
+                 task_poll_interval: float = 0.5):
+        """
+        A single simulated client session driving the scenarios.
+
+        Args:
+            client (httpx.AsyncClient): Shared HTTP client (remote or in-process ASGI transport),
+                built with ``shared_cookies()`` so that cookies stay with the user that got them.
+            credentials (dict): One user entry of the fixtures manifest (email, password, projects, documents).
+            recorder (Recorder): Collects one sample per HTTP request.
+            task_poll_attempts (int): Max number of polls of a created task.
+            task_poll_interval (float): Seconds between two task polls.
+        """
+        self.client = client
+        self.credentials = credentials
+        self.recorder = recorder
+        self.task_poll_attempts = task_poll_attempts
+        self.task_poll_interval = task_poll_interval
+        self.access_token = None
+        self.stage = None
+        # Own cookie jar: cookies set for one simulated session are never sent by another.
+        self.cookies = httpx.Cookies()
+
+    @property
+    def headers(self):
+        if not self.access_token:
+            return {}
+        return {"Authorization": f"Bearer {self.access_token}"}
+
+    def random_project_id(self):
+        return random.choice(self.credentials["projectIds"])
+
+    def random_document_id(self):
+        return random.choice(self.credentials["documentIds"])
+
+    async def request(self, name: str, method: str, url: str, **kwargs):
+        """
+        Execute one HTTP request and record its latency and outcome.
+
+        The API answers most failures with HTTP 200 and ``success: false`` in the
+        envelope, so the body is inspected as well as the status code.
+        """
+        headers = {**self.headers, **kwargs.pop("headers", {})}
+        started = time.perf_counter()
+        error = None
+        response = None
+        try:
+            request = self.client.build_request(method, url, headers=headers, **kwargs)
+            self.cookies.set_cookie_header(request)
+            response = await self.client.send(request)
+            self.cookies.extract_cookies(response)
+            if response.status_code >= 400:
+                error = f"HTTP {response.status_code}"
+            elif response.headers.get("content-type", "").startswith("application/json"):
+                body = response.json()
+                if isinstance(body, dict) and body.get("success") is False:
+                    error = body.get("error", {}).get("code") or "envelope error"
+        except httpx.HTTPError as e:
+            error = type(e).__name__
+        latency = time.perf_counter() - started
+        status_code = response.status_code if response is not None else 0
+        self.recorder.record(stage=self.stage, name=name, latency=latency, status_code=status_code, error=error)
+        return response if error is None else None
+
+    async def login(self):
+        response = await self.request(
+            "auth.login", "POST", f"{API_PREFIX}/auth/login",
+            data={"username": self.credentials["email"], "password": self.credentials["password"]}
+        )
+        if response is not None:
+            self.access_token = response.json().get("access_token")
+        return response
+
+
+async def login(user: VirtualUser):
+    # /auth/login answers with a bearer token only; no route issues the refresh cookie that
+    # /auth/refresh needs, so refresh is not part of the mix.
+    await user.login()
+
+
+async def list_projects(user: VirtualUser):
+    await user.request("project.list", "GET", f"{API_PREFIX}/project")
+
+
+async def list_documents(user: VirtualUser):
+    project_id = user.random_project_id()
+    await user.request("document.list", "GET", f"{API_PREFIX}/document", params={"projectId": project_id})
+    await user.request("project.documents", "GET", f"{API_PREFIX}/project/{project_id}/documents")
+
+
+async def upload_document(user: VirtualUser):
+    await user.request(
+        "document.upload", "POST", f"{API_PREFIX}/document",
+        data={"projectId": user.random_project_id(), "folderName": "loadtest", "documentType": "pdf"},
+        files={"document": ("loadtest.pdf", SAMPLE_DOCUMENT, "application/pdf")}
+    )
+
+
+async def download_document(user: VirtualUser):
+    await user.request("document.download", "GET", f"{API_PREFIX}/document/{user.random_document_id()}/download")
+
+
+async def create_and_poll_task(user: VirtualUser):
+    response = await user.request(
+        "task.create", "POST", f"{API_PREFIX}/task", json={"documentIds": [user.random_document_id()]}
+    )
+    if response is None:
+        return
+    task_id = response.json().get("result", {}).get("taskId")
+    if not task_id:
+        return
+    for _ in range(user.task_poll_attempts):
+        await asyncio.sleep(user.task_poll_interval)
+        response = await user.request("task.poll", "GET", f"{API_PREFIX}/task/{task_id}")
+        if response is None:
+            return
+        status = response.json().get("result", {}).get("status")
+        if isinstance(status, dict):
+            status = status.get("status")
+        if status not in ("NOT_STARTED", "IN_PROGRESS", "DEFERRED"):
+            return
+
+
+# Relative weights of the scenario mix, roughly matching dashboard traffic.
+SCENARIOS = {
+    "login": (login, 1),
+    "list_projects": (list_projects, 4),
+    "list_documents": (list_documents, 4),
+    "upload_document": (upload_document, 1),
+    "download_document": (download_document, 2),
+    "create_and_poll_task": (create_and_poll_task, 1),
+}
+
+
+def pick_scenario(names):
+    """Pick a scenario coroutine function by weight among the enabled names."""
+    weights = [SCENARIOS[name][1] for name in names]
+    name = random.choices(names, weights=weights, k=1)[0]
+    return SCENARIOS[name][0]
@@ -0,0 +1,126 @@
+"""
+Seed a local database with deterministic users, projects and documents for load tests.
+
+Usage (from the ``backend`` directory, with ``CONF_PATH``/``ENV`` pointing at a local database):
+
+    python -m loadtest.seed_fixtures --users 50 --projects-per-user 3 --documents-per-project 20
+
+IDs are derived from the fixture index with ``uuid5``, so re-running the script with the
+same arguments deletes and re-creates exactly the same rows and load-test results stay
+comparable from run to run. A manifest with the credentials and IDs is written for
+``loadtest.runner``.
+"""
+import argparse
+import json
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import insert
+
+from extracto.common.storage.schema import S3Location
+from extracto.db.azure.base import DBConnection
+from extracto.db.model import Document, Project, RefreshToken, User
+from extracto.utils import auth_utils
+from extracto.utils.util import RoleEnum, get_storage_absolute_path
+
+FIXTURE_NAMESPACE = uuid.UUID("6f1d0c36-3f5e-4a8e-9a43-0d2b7c7f9e10")
+
+
+def fixture_id(*parts):
+    return uuid.uuid5(FIXTURE_NAMESPACE, "/".join(str(part) for part in parts))
+
+
+def build_rows(users: int, projects_per_user: int, documents_per_project: int, password: str):
+    timestamp = datetime.now(timezone.utc)
+    # bcrypt is deliberately slow; every fixture user shares the same password hash.
+    hashed_password = auth_utils.hash_password(password)
+    user_rows, project_rows, document_rows, manifest = [], [], [], []
+
+    for user_index in range(users):
+        user_id = fixture_id("user", user_index)
+        email = f"loadtest-{user_index}@extracto.local"
+        user_rows.append({
+            "ID": user_id, "FIRST_NAME": "Load", "LAST_NAME": f"Test {user_index}", "EMAIL": email,
+            "ROLE": RoleEnum.USER.value, "HASHED_PASSWORD": hashed_password, "IS_ACTIVE": True,
+            "IS_VERIFIED": True, "CREATED_AT": timestamp, "MODIFIED_AT": timestamp,
+        })
+        entry = {"email": email, "password": password, "userId": str(user_id), "projectIds": [], "documentIds": []}
+
+        for project_index in range(projects_per_user):
+            project_id = fixture_id("project", user_index, project_index)
+            project_rows.append({
+                "ID": project_id, "NAME": f"loadtest-project-{project_index}", "TAGS": ["loadtest"],
+                "WORKFLOW": [], "DESCRIPTION": "Seeded by loadtest.seed_fixtures", "OWNER": user_id,
+                "CREATED_AT": timestamp, "MODIFIED_AT": timestamp,
+            })
+            entry["projectIds"].append(str(project_id))
+
+            for document_index in range(documents_per_project):
+                document_id = fixture_id("document", user_index, project_index, document_index)
+                document_name = f"loadtest-{document_index}.pdf"
+                storage_path = get_storage_absolute_path(
+                    projectId=str(project_id), documentId=str(document_id), documentName=document_name
+                )
+                document_rows.append({
+                    "ID": document_id, "NAME": document_name, "TYPE": "pdf", "PROJECT_ID": project_id,
+                    "FOLDER_NAME": f"folder-{document_index % 5}",
+                    "STORAGE_PATH": S3Location(absolute_path=storage_path).dict(),
+                    "CREATED_AT": timestamp, "MODIFIED_AT": timestamp,
+                })
+                entry["documentIds"].append(str(document_id))
+
+        manifest.append(entry)
+    return user_rows, project_rows, document_rows, manifest
+
+
+def seed(users: int, projects_per_user: int, documents_per_project: int, password: str, with_files: bool = False,
+         batch_size: int = 5000):
+    user_rows, project_rows, document_rows, manifest = build_rows(
+        users, projects_per_user, documents_per_project, password
+    )
+    user_ids = [row["ID"] for row in user_rows]
+    project_ids = [row["ID"] for row in project_rows]
+
+    with DBConnection().session_scope() as session:
+        # Remove a previous run with the same fixture IDs before re-inserting.
+        session.query(Document).filter(Document.PROJECT_ID.in_(project_ids)).delete(synchronize_session=False)
+        session.query(Project).filter(Project.ID.in_(project_ids)).delete(synchronize_session=False)
+        session.query(RefreshToken).filter(RefreshToken.USER_ID.in_(user_ids)).delete(synchronize_session=False)
+        session.query(User).filter(User.ID.in_(user_ids)).delete(synchronize_session=False)
+
+        for model, rows in ((User, user_rows), (Project, project_rows), (Document, document_rows)):
+            for start in range(0, len(rows), batch_size):
+                session.execute(insert(model), rows[start:start + batch_size])
+
+    if with_files:
+        from extracto.common.storage.s3_file_manager import S3FileManager
+        from loadtest.scenarios import SAMPLE_DOCUMENT
+
+        file_manager = S3FileManager()
+        for row in document_rows:
+            file_manager.create(file_data=SAMPLE_DOCUMENT, remote_path=row["STORAGE_PATH"]["absolute_path"])
+
+    return manifest
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Seed deterministic load-test fixtures.")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--projects-per-user", type=int, default=3)
+    parser.add_argument("--documents-per-project", type=int, default=20)
+    parser.add_argument("--password", default="LoadTest#2024")
+    parser.add_argument("--with-files", action="store_true",
+                        help="Also upload a small file per document to S3 so downloads succeed.")
+    parser.add_argument("--manifest", default="fixtures.json")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    manifest = seed(
+        users=args.users, projects_per_user=args.projects_per_user,
+        documents_per_project=args.documents_per_project, password=args.password, with_files=args.with_files
+    )
+    with open(args.manifest, "w") as fp:
+        json.dump({"users": manifest}, fp, indent=2)
+    print(f"Seeded {len(manifest)} users. Manifest written to {args.manifest}")
@@ -1,12 +1,13 @@
 from typing import Optional
 
-from fastapi import APIRouter, UploadFile, File, Form, Response, Depends
+from fastapi import APIRouter, UploadFile, File, Form, Request, Response, Depends
+from starlette.concurrency import run_in_threadpool
 
 from extracto.db.model import User
 from extracto.logger.log_utils import Logger
 from extracto.services.document_service import DocumentService
 from extracto.utils.user_dependancy import get_current_user
-from extracto.utils.util import JsonResponse
+from extracto.utils.util import JsonResponse, etag_matches, not_modified, stream_json_envelope, weak_etag, with_etag
 
 logger = Logger()
 
@@ -14,17 +15,23 @@ document_api = APIRouter(tags=["Document Processing APIs"])
 
 
 @document_api.get("")
-async def list_of_documents(projectId: str = None, user: User = Depends(get_current_user)):
+async def list_of_documents(request: Request, projectId: str = None, user: User = Depends(get_current_user)):
     json_response = JsonResponse()
     try:
-        logger.info("Starting to list down the documents...")
-        response = await DocumentService(user=user).list_based_on_project(projectId=projectId)
-        json_response.result = response
-        json_response.success = True
+        logger.debug("Starting to list down the documents...")
+        service = DocumentService(user=user)
+        etag = weak_etag(user.ID, projectId, *await run_in_threadpool(service.listing_version, projectId))
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+        rows = service.stream_based_on_project(projectId=projectId)
+        # Nested JSON comes ready from Postgres; the first fetch happens here so errors become an envelope.
+        first = await run_in_threadpool(next, rows, None)
+        return with_etag(stream_json_envelope(first, rows), etag)
     except Exception as e:
         json_response.error = {"code": "101", "message": f"Error in listing of documents: {e}"}
         logger.error(f'Exception in listing of documents: {e}')
-    return json_response.dict()
+    return json_response.render()
 
 
 @document_api.post("")
@@ -50,7 +57,7 @@ async def upload_document(
     except Exception as e:
         json_response.error = {"code": "102", "message": f"Error in uploading of document: {e}"}
         logger.error(f'Exception in uploading document: {e}')
-    return json_response.dict()
+    return json_response.render()
 
 
 @document_api.get("/{documentId}")
@@ -64,7 +71,7 @@ async def get_document(documentId: str, user: User = Depends(get_current_user)):
     except Exception as e:
         json_response.error = {"code": "103", "message": f"Error in fetching the details of the document: {e}"}
         logger.error(f'Exception in fetching the document: {e}')
-    return json_response.dict()
+    return json_response.render()
 
 
 @document_api.get("/{documentId}/download")
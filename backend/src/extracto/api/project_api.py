@@ -1,36 +1,50 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
+from starlette.concurrency import run_in_threadpool
 
 from extracto.db.model import User
 from extracto.schema.objects import ProjectRequestSchema
+from extracto.services.document_service import DocumentService
 from extracto.services.project_service import ProjectService
 from extracto.utils.user_dependancy import get_current_user
-from extracto.utils.util import JsonResponse
+from extracto.utils.util import JsonResponse, etag_matches, not_modified, stream_json_envelope, weak_etag, with_etag
 
 project_api = APIRouter(tags=["Project Management APIs"])
 
 
 @project_api.get("")
-async def list(user: User = Depends(get_current_user)):
+async def list(request: Request, user: User = Depends(get_current_user)):
     json_response = JsonResponse()
     try:
-        response = await ProjectService(user=user).list()
+        service = ProjectService(user=user)
+        etag = weak_etag(user.ID, *await run_in_threadpool(service.list_version))
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+        response = await service.list()
         json_response.result = response
         json_response.success = True
+        return with_etag(json_response.render(), etag)
     except Exception as e:
         json_response.error = {"code": "101", "message": f"Error in listing of projects: {e}"}
-    return json_response.dict()
+    return json_response.render()
 
 
 @project_api.get("/{projectId}/documents")
-async def list_by_project(projectId: str, user: User = Depends(get_current_user)):
+async def list_by_project(request: Request, projectId: str, user: User = Depends(get_current_user)):
     json_response = JsonResponse()
     try:
-        response = await ProjectService(user=user).list_based_on_project(projectId=projectId)
-        json_response.result = response
-        json_response.success = True
+        version = await run_in_threadpool(DocumentService(user=user).listing_version, projectId)
+        etag = weak_etag(user.ID, projectId, *version)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+        rows = ProjectService(user=user).stream_based_on_project(projectId=projectId)
+        # Nested JSON comes ready from Postgres; the first fetch happens here so errors become an envelope.
+        first = await run_in_threadpool(next, rows, None)
+        return with_etag(stream_json_envelope(first, rows, many=False), etag)
     except Exception as e:
         json_response.error = {"code": "101", "message": f"Error in listing of projects: {e}"}
-    return json_response.dict()
+    return json_response.render()
 
 
 @project_api.post("")
@@ -48,7 +62,7 @@ async def create(projectRequestSchema: ProjectRequestSchema, user: User = Depend
         json_response.success = True
     except Exception as e:
         json_response.error = {"code": "101", "message": f"Error in creating a project: {e}"}
-    return json_response.dict()
+    return json_response.render()
 
 
 @project_api.get("/{project_id}")
@@ -61,7 +75,7 @@ async def get(projectId: str, user: User = Depends(get_current_user)):
         json_response.success = True
     except Exception as e:
         json_response.error = {"code": "102", "message": f"Error in fetching the details of the project: {e}"}
-    return json_response.dict()
+    return json_response.render()
 
 
 @project_api.post("/{project_id}")
@@ -80,7 +94,7 @@ async def update(projectId: str, projectRequestSchema: ProjectRequestSchema, use
         json_response.success = True
     except Exception as e:
         json_response.error = {"code": "103", "message": f"Error in updating the details of the project: {e}"}
-    return json_response.dict()
+    return json_response.render()
 
 
 @project_api.post("/{project_id}/delete")
@@ -93,4 +107,4 @@ async def delete(projectId: str, user: User = Depends(get_current_user)):
         json_response.success = True
     except Exception as e:
         json_response.error = {"code": "104", "message": f"Error in deleting the the project: {e}"}
-    return json_response.dict()
+    return json_response.render()
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends
+from starlette.concurrency import run_in_threadpool
+
+from extracto.db.model import User
+from extracto.logger.log_utils import Logger
+from extracto.services.search_service import SearchService
+from extracto.utils.user_dependancy import get_current_user
+from extracto.utils.util import JsonResponse
+
+logger = Logger()
+
+search_api = APIRouter(tags=["Search APIs"])
+
+
+@search_api.get("")
+async def search(
+        q: str,
+        projectId: str = None,
+        limit: int = None,
+        cursor: str = None,
+        user: User = Depends(get_current_user)
+):
+    json_response = JsonResponse()
+    try:
+        response = await run_in_threadpool(
+            SearchService(user=user).search, query=q, projectId=projectId, limit=limit, cursor=cursor
+        )
+        json_response.result = response
+        json_response.success = True
+    except Exception as e:
+        json_response.error = {"code": "101", "message": f"Error in searching documents: {e}"}
+        logger.error(f'Exception in searching documents: {e}')
+    return json_response.render()
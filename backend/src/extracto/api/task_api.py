@@ -1,8 +1,16 @@
+import json
 import logging
-from fastapi import APIRouter, Depends
+from datetime import datetime
+from itertools import chain
 
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from extracto.services.export_service import MEDIA_TYPES, ExportService
 from extracto.services.task_service import TaskService
-from extracto.utils.util import JsonResponse
+from extracto.utils.util import IMMUTABLE, JsonResponse, etag_matches, not_modified, weak_etag, with_etag
+from extracto.schema.enums import TaskStatus
 from extracto.schema.objects import TaskRequestSchema
 from extracto.db.model import User
 from extracto.utils.user_dependancy import get_current_user
@@ -22,7 +30,7 @@ async def list(user: User = Depends(get_current_user)):
         json_response.success = True
     except Exception as e:
         json_response.error = {"code": "101", "message": f"Error in listing of tasks: {e}"}
-    return json_response.dict()
+    return json_response.render()
 
 
 @task_api.post("")
@@ -35,19 +43,90 @@ async def create(taskRequestSchema: TaskRequestSchema, user: User = Depends(get_
         print(f"Successfully uploaded task.")
         json_response.result = response
         json_response.success = True
+    except HTTPException:
+        # Admission control: 429 with Retry-After rather than an error envelope.
+        raise
     except Exception as e:
         json_response.error = {"code": "101", "message": f"Error in creating a task: {e}"}
-    return json_response.dict()
+    return json_response.render()
+
+
+@task_api.post("/bulk")
+async def bulk_create(request: Request, user: User = Depends(get_current_user)):
+    """
+    Create many tasks at once from a JSON array of task specs, or NDJSON (one spec per line)
+    with ``Content-Type: application/x-ndjson``. Returns the task ids in submission order and
+    how many of them were queued now or deferred by admission control.
+    """
+    json_response = JsonResponse()
+    try:
+        body = await request.body()
+        if "ndjson" in request.headers.get("content-type", ""):
+            specs = [json.loads(line) for line in body.splitlines() if line.strip()]
+        else:
+            specs = json.loads(body)
+            if not isinstance(specs, list):
+                raise ValueError("Expected a JSON array of tasks")
+
+        taskRequestSchemas = [TaskRequestSchema(**spec) for spec in specs]
+        json_response.result = TaskService(user=user).bulk_create(taskRequestSchemas=taskRequestSchemas)
+        json_response.success = True
+    except HTTPException:
+        raise
+    except Exception as e:
+        json_response.error = {"code": "101", "message": f"Error in creating tasks in bulk: {e}"}
+    return json_response.render()
+
+
+@task_api.get("/export")
+async def export(
+        projectId: str = None,
+        format: str = "parquet",
+        destination: str = "download",
+        createdAfter: datetime = None,
+        createdBefore: datetime = None,
+        user: User = Depends(get_current_user)
+):
+    """
+    Export the results of completed tasks as Parquet or Arrow IPC, flattened into typed columns
+    by the project's extraction schema. ``destination=s3`` writes the file to S3 and returns its
+    location; the default streams it as a download.
+    """
+    json_response = JsonResponse()
+    try:
+        service = ExportService(user=user)
+        filters = {"projectId": projectId, "createdAfter": createdAfter, "createdBefore": createdBefore}
+        if destination == "s3":
+            json_response.result = await run_in_threadpool(service.to_s3, format, **filters)
+            json_response.success = True
+        else:
+            chunks = service.stream(format, **filters)
+            # The first row group is written here so a failing query still becomes an envelope.
+            first = await run_in_threadpool(next, chunks, b"")
+            return StreamingResponse(
+                chain([first], chunks),
+                media_type=MEDIA_TYPES.get(format, "application/octet-stream"),
+                headers={"Content-Disposition": f'attachment; filename="tasks-{projectId or "all"}.{format}"'}
+            )
+    except Exception as e:
+        json_response.error = {"code": "103", "message": f"Error in exporting task results: {e}"}
+    return json_response.render()
 
 
 @task_api.get("/{taskId}")
-async def get(taskId: str, user: User = Depends(get_current_user)):
+async def get(request: Request, taskId: str, user: User = Depends(get_current_user)):
     json_response = JsonResponse()
     try:
         response = TaskService(user=user).get(taskId=taskId)
         print(f"Successfully retrieved the task with taskId: {taskId}.")
         json_response.result = response
         json_response.success = True
+        # Finished tasks never change again: cacheable outright, revalidated without re-encoding.
+        if response.status in (TaskStatus.SUCCESS.value, TaskStatus.FAILURE.value):
+            etag = weak_etag(response.taskId, response.status, response.modifiedTs)
+            if etag_matches(request, etag):
+                return not_modified(etag, IMMUTABLE)
+            return with_etag(json_response.render(), etag, IMMUTABLE)
     except Exception as e:
         json_response.error = {"code": "102", "message": f"Error in fetching the details of the task: {e}"}
-    return json_response.dict()
+    return json_response.render()
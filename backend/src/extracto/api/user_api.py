@@ -17,14 +17,14 @@ user_api = APIRouter(tags=["User Management APIs"])
 async def list_of_users(user: User = Depends(is_admin)):
     json_response = JsonResponse()
     try:
-        logger.info("Starting to list down the documents...")
+        logger.debug("Starting to list down the documents...")
         response = UserService(user=user).list()
         json_response.result = response
         json_response.success = True
     except Exception as e:
         json_response.error = {"code": "101", "message": f"Error in listing of users: {e}"}
         logger.error(f'Exception in listing of users: {e}')
-    return json_response.dict()
+    return json_response.render()
 
 
 @user_api.post("")
@@ -46,7 +46,7 @@ async def create_user(
     except Exception as e:
         json_response.error = {"code": "102", "message": f"Error in uploading of document: {e}"}
         logger.error(f'Exception in uploading document: {e}')
-    return json_response.dict()
+    return json_response.render()
 
 
 @user_api.get("/{userId}")
@@ -60,7 +60,7 @@ async def fetch_user(userId: str, user: User = Depends(is_admin)):
     except Exception as e:
         json_response.error = {"code": "103", "message": f"Error in fetching the details of the document: {e}"}
         logger.error(f'Exception in fetching the document: {e}')
-    return json_response.dict()
+    return json_response.render()
 
 
 @user_api.post("/{userId}")
@@ -74,7 +74,7 @@ async def update_user(userId: str, user: User = Depends(is_admin)):
     except Exception as e:
         json_response.error = {"code": "103", "message": f"Error in fetching the details of the document: {e}"}
         logger.error(f'Exception in fetching the document: {e}')
-    return json_response.dict()
+    return json_response.render()
 
 
 @user_api.post("/{userId}")
@@ -88,4 +88,4 @@ async def delete_user(userId: str, user: User = Depends(is_admin)):
     except Exception as e:
         json_response.error = {"code": "103", "message": f"Error in fetching the details of the document: {e}"}
         logger.error(f'Exception in fetching the document: {e}')
-    return json_response.dict()
+    return json_response.render()
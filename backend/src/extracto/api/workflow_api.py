@@ -24,7 +24,7 @@ async def list_of_workflows(projectId: str = None, user: User = Depends(get_curr
     except Exception as e:
         json_response.error = {"code": "101", "message": f"Error in listing of workflows: {e}"}
         print(f'Exception in listing of workflows: {e}')
-    return json_response.dict()
+    return json_response.render()
 
 
 @workflow_api.post("")
@@ -48,7 +48,7 @@ async def create(
     except Exception as e:
         json_response.error = {"code": "102", "message": f"Error in uploading of document: {e}"}
         print(f'Exception in uploading document: {e}')
-    return json_response.dict()
+    return json_response.render()
 
 
 @workflow_api.get("/{workflowId}")
@@ -62,7 +62,7 @@ async def get_workflow(workflowId: str, user: User = Depends(get_current_user)):
     except Exception as e:
         json_response.error = {"code": "103", "message": f"Error in fetching the details of the workflow: {e}"}
         print(f'Exception in fetching the document: {e}')
-    return json_response.dict()
+    return json_response.render()
 
 
 @workflow_api.get("/{workflowId}/download")
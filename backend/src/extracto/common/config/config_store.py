@@ -1,6 +1,13 @@
 import configparser
 import os
+import time
 from pathlib import Path
+from threading import Lock
+
+# Seconds between checks of the config file's mtime; 0 (the default) never reloads.
+CONFIG_RELOAD_INTERVAL = float(os.getenv("CONFIG_RELOAD_INTERVAL", 0))
+
+_TRUE = {"1", "true", "yes", "on"}
 
 
 class Section:
@@ -14,26 +21,98 @@ class Section:
         except KeyError:
             raise AttributeError(f"Key '{key}' not found in section '{self._section_name}'")
 
+    def get(self, key, default=None):
+        return self._config[self._section_name].get(key, default)
+
+    def get_int(self, key, default=None):
+        value = self.get(key)
+        return default if value in (None, "") else int(value)
+
+    def get_float(self, key, default=None):
+        value = self.get(key)
+        return default if value in (None, "") else float(value)
+
+    def get_bool(self, key, default=False):
+        value = self.get(key)
+        return default if value in (None, "") else value.strip().lower() in _TRUE
+
 
 class ConfigStore:
-    def __init__(self, config_dir_var='CONF_PATH', default_cfg='resource', env_var='ENV', default_env='dev'):
+    """
+    Process-wide view of ``config_{env}.cfg``.
+
+    The file is parsed once per path: constructing ``ConfigStore()`` again returns the same
+    instance, and lookups are dictionary reads. A key is overridden by the environment
+    variable of the same name (e.g. ``DB_PASSWORD``), resolved when the file is parsed.
+    """
+    _instances = {}
+    _lock = Lock()
+
+    def __new__(cls, config_dir_var='CONF_PATH', default_cfg='resource', env_var='ENV', default_env='dev'):
         # Determine the environment from the ENV variable or default to 'dev'
         env = os.getenv(env_var, default_env).lower()
         config_dir = os.getenv(config_dir_var, default_cfg)
-        config_file = f"config_{env}.cfg"
-        config_path = Path(config_dir) / config_file
+        config_path = Path(config_dir) / f"config_{env}.cfg"
 
-        # Initialize configparser and read the file
-        self._config = configparser.ConfigParser()
-        if not config_path.exists():
-            raise FileNotFoundError(f"Config file '{config_path}' not found")
-        self._config.read(config_path)
+        instance = cls._instances.get(config_path)
+        if instance is None:
+            with cls._lock:
+                instance = cls._instances.get(config_path)
+                if instance is None:
+                    instance = super().__new__(cls)
+                    instance._path = config_path
+                    instance._load()
+                    cls._instances[config_path] = instance
+        return instance
 
-    def __getattr__(self, section):
+    def __init__(self, *args, **kwargs):
+        # Everything happens once, in __new__.
+        pass
+
+    def _load(self):
+        if not self._path.exists():
+            raise FileNotFoundError(f"Config file '{self._path}' not found")
+        parser = configparser.ConfigParser()
+        # Keys keep their case so they match the environment variables overriding them.
+        parser.optionxform = str
+        parser.read(self._path)
+
+        self._config = {
+            section: {key: os.getenv(key, value) for key, value in parser[section].items()}
+            for section in parser.sections()
+        }
+        self._mtime = self._path.stat().st_mtime
+        self._checked_at = time.monotonic()
+
+    def _reload_if_changed(self):
+        if time.monotonic() - self._checked_at < CONFIG_RELOAD_INTERVAL:
+            return
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                changed = self._path.stat().st_mtime != self._mtime
+            except OSError:
+                return
+            if changed:
+                self._load()
+
+    def section(self, section) -> Section:
+        if CONFIG_RELOAD_INTERVAL:
+            self._reload_if_changed()
         if section in self._config:
             return Section(self._config, section)
         raise AttributeError(f"Section '{section}' not found in config")
 
+    def get(self, section, key, default=None):
+        if CONFIG_RELOAD_INTERVAL:
+            self._reload_if_changed()
+        return self._config.get(section, {}).get(key, default)
+
+    def __getattr__(self, section):
+        if section.startswith("_"):
+            raise AttributeError(section)
+        return self.section(section)
+
 
 # Example usage (for testing purposes, can be removed in production)
 if __name__ == "__main__":
@@ -41,4 +120,4 @@ if __name__ == "__main__":
     os.environ["CONF_PATH"] = r"D:\Projects\career\Extracto\backend\resource"
     config = ConfigStore()
     print(config.APP.ENV)
-    print(config.APP.NAME)
\ No newline at end of file
+    print(config.APP.NAME)
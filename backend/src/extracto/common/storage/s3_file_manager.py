@@ -1,7 +1,4 @@
-import boto3
-from botocore.exceptions import ClientError
 from extracto.common.config.config_store import ConfigStore
-import os
 import io
 
 
@@ -16,13 +13,16 @@ class S3FileManager:
         # Initialize ConfigStore if not provided
         self.config = config_store or ConfigStore()
 
-        # Get AWS credentials (prefer environment variables over config file)
-        self.access_key_id = os.getenv('AWS_ACCESS_KEY_ID', self.config.AWS.AWS_ACCESS_KEY_ID)
-        self.secret_access_key = os.getenv('AWS_SECRET_ACCESS_KEY', self.config.AWS.AWS_SECRET_ACCESS_KEY)
-        self.region = os.getenv('AWS_S3_REGION', self.config.AWS_S3.AWS_S3_REGION)
-        self.bucket = os.getenv('AWS_S3_BUCKET', self.config.AWS_S3.AWS_S3_BUCKET)
+        # Get AWS credentials (environment variables already override the config file in ConfigStore)
+        self.access_key_id = self.config.AWS.AWS_ACCESS_KEY_ID
+        self.secret_access_key = self.config.AWS.AWS_SECRET_ACCESS_KEY
+        self.region = self.config.AWS_S3.AWS_S3_REGION
+        self.bucket = self.config.AWS_S3.AWS_S3_BUCKET
+
+        # Initialize S3 client; boto3 and botocore are imported on first use, to keep imports of the app fast
+        import boto3
+        from botocore.exceptions import ClientError
 
-        # Initialize S3 client
         self.s3_client = boto3.client(
             's3',
             aws_access_key_id=self.access_key_id,
@@ -72,6 +72,35 @@ class S3FileManager:
         # Create a.py file-like object from bytes
         file_obj = io.BytesIO(file_data)
 
+        from botocore.exceptions import ClientError
+
+        try:
+            self.s3_client.upload_fileobj(
+                Fileobj=file_obj,
+                Bucket=self.bucket,
+                Key=remote_path,
+                ExtraArgs={'ServerSideEncryption': 'AES256'}
+            )
+            return {"bucket": self.bucket, "key": remote_path}
+        except ClientError as e:
+            raise Exception(f"Failed to upload data to S3 bucket {self.bucket} at {remote_path}: {str(e)}")
+
+    def upload(self, file_obj, remote_path):
+        """
+        Upload a file object to S3 without reading it into memory (multipart for large files).
+
+        Args:
+            file_obj: Readable binary file object, positioned at the start.
+            remote_path (str): Destination key in S3.
+
+        Returns:
+            dict: Details of the uploaded file (e.g., bucket, key).
+        """
+        if not remote_path:
+            raise ValueError("remote_path must be provided")
+
+        from botocore.exceptions import ClientError
+
         try:
             self.s3_client.upload_fileobj(
                 Fileobj=file_obj,
@@ -98,6 +127,8 @@ class S3FileManager:
         Raises:
             ClientError: For S3 API errors (e.g., file not found, permissions).
         """
+        from botocore.exceptions import ClientError
+
         try:
             if remote_path:
                 try:
@@ -139,6 +170,8 @@ class S3FileManager:
         if not (new_name or new_path):
             raise ValueError("Either new_name or new_path must be provided")
 
+        from botocore.exceptions import ClientError
+
         try:
             # Verify the source file exists
             self.s3_client.head_object(Bucket=self.bucket, Key=remote_path)
@@ -177,6 +210,8 @@ class S3FileManager:
         Raises:
             ClientError: For S3 API errors (e.g., file not found, permissions).
         """
+        from botocore.exceptions import ClientError
+
         try:
             self.s3_client.delete_object(Bucket=self.bucket, Key=remote_path)
             return True
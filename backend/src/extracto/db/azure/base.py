@@ -1,6 +1,6 @@
 from contextlib import contextmanager
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.exc import SQLAlchemyError
 from threading import Lock
 from typing import Optional
@@ -22,8 +22,9 @@ class DBConnection:
         if cls._instance is None:
             with cls._lock:
                 if cls._instance is None:
-                    cls._instance = super().__name__(cls)
+                    cls._instance = super().__new__(cls)
                     cls._instance._initialized = False
+        return cls._instance
 
     def __init__(self, **kwargs):
         """
@@ -56,7 +57,7 @@ class DBConnection:
         self.engine = None
         self.Session = None
         self._connect()
-        self._initialized = None
+        self._initialized = True
 
     def _connect(self):
         """
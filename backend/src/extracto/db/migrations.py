@@ -0,0 +1,99 @@
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import String, cast, delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from extracto.db.azure.base import DBConnection
+from extracto.db.model import Task, TaskQueueStats
+from extracto.logger.log_utils import Logger
+from extracto.schema.enums import TaskStatus
+from extracto.services.task_service import global_scope
+
+logger = Logger()
+
+# TASK.STATUS values written before TaskStatus took the daemon's spelling.
+LEGACY_TASK_STATUS = {
+    "Not Started": TaskStatus.NOT_STARTED,
+    "In Progress": TaskStatus.IN_PROGRESS,
+    "Success": TaskStatus.SUCCESS,
+    "Failure": TaskStatus.FAILURE,
+}
+
+
+def migrate_task_status(session: Session) -> int:
+    """
+    Rewrite legacy TASK.STATUS values to the TaskStatus spelling shared with the daemon.
+
+    Older rows hold the status either as a bare JSON string (``"Not Started"``) or under
+    ``status`` of the status object; both become ``{"status": "NOT_STARTED", ...}``, which
+    the status filters and the daemon's queue predicates match. Does not commit.
+
+    Returns:
+        int: Rows rewritten.
+    """
+    rewritten = 0
+    for legacy, status in LEGACY_TASK_STATUS.items():
+        rewritten += session.execute(
+            update(Task)
+            .where(Task.STATUS == func.to_jsonb(cast(legacy, String)))
+            .values(STATUS={"status": status.value, "metadata": []})
+        ).rowcount
+        rewritten += session.execute(
+            update(Task)
+            .where(func.jsonb_typeof(Task.STATUS) == "object", Task.STATUS["status"].astext == legacy)
+            .values(STATUS=Task.STATUS.op("||")(func.jsonb_build_object("status", cast(status.value, String))))
+        ).rowcount
+    return rewritten
+
+
+def rebuild_queue_stats(session: Session) -> int:
+    """
+    Recount TASK_QUEUE_STATS from the tasks queued and running now. Does not commit.
+
+    The counters are kept up incrementally by the backend and the daemon, so tasks that
+    only match the queue predicates after ``migrate_task_status`` were never counted.
+
+    Returns:
+        int: Counter rows written.
+    """
+    queued, in_flight = Counter(), Counter()
+    rows = session.execute(
+        select(Task.ID, Task.OWNER, Task.STATUS["status"].astext)
+        .where(Task.STATUS["status"].astext.in_([TaskStatus.NOT_STARTED.value, TaskStatus.IN_PROGRESS.value])),
+        execution_options={"yield_per": 10000}
+    )
+    for task_id, owner, status in rows:
+        counters = queued if status == TaskStatus.NOT_STARTED.value else in_flight
+        counters[global_scope(task_id)] += 1
+        if owner:
+            counters[str(owner)] += 1
+
+    session.execute(delete(TaskQueueStats))
+    now = datetime.utcnow()
+    stats = [
+        {"SCOPE": scope, "QUEUED": queued[scope], "IN_FLIGHT": in_flight[scope], "MODIFIED_AT": now}
+        for scope in sorted(set(queued) | set(in_flight))
+    ]
+    if stats:
+        session.execute(insert(TaskQueueStats), stats)
+    return len(stats)
+
+
+# Run once, with the backend and the daemons stopped, before starting the release that
+# spells task statuses NOT_STARTED/IN_PROGRESS/SUCCESS/FAILURE:
+#   python -m extracto.db.migrations
+if __name__ == "__main__":
+    session = DBConnection().get_session()
+    try:
+        rewritten = migrate_task_status(session)
+        scopes = rebuild_queue_stats(session)
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        logger.error(f"Exception in migrating task statuses: {e}")
+        raise Exception(f"Exception in migrating task statuses: {e}")
+    finally:
+        session.close()
+    logger.info(f"Migrated the status of {rewritten} tasks, rebuilt {scopes} queue counters")
+    print(f"Migrated the status of {rewritten} tasks, rebuilt {scopes} queue counters.")
@@ -1,8 +1,11 @@
 import os
 import uuid
 
-from sqlalchemy import create_engine, MetaData, Column, String, DateTime, ForeignKey, Boolean, TEXT
-from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy import (
+    create_engine, MetaData, Column, String, DateTime, ForeignKey, Boolean, TEXT, UniqueConstraint, Integer, Float,
+    Index, text, Computed
+)
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR, UUID
 from sqlalchemy.orm import declarative_base, relationship
 
 from extracto.db.azure.base import DBConnection
@@ -74,19 +77,94 @@ class Document(Base):
     CREATED_AT = Column(DateTime(timezone=True))
     MODIFIED_AT = Column(DateTime(timezone=True))
 
+    # Serves the per-project, per-folder grouping of document listings.
+    __table_args__ = (
+        Index("IX_DOCUMENT_PROJECT_FOLDER", "PROJECT_ID", "FOLDER_NAME"),
+    )
+
     # Relationships
     project_ref = relationship("Project", back_populates="documents")
 
 
+class DocumentSearch(Base):
+    """
+    Full-text search rows of a document: one per page of parsed text, plus one with the flattened
+    values of its extraction result. Rows are replaced by the daemon whenever a task completes.
+    """
+    __tablename__ = "DOCUMENT_SEARCH"
+    __table_args__ = (
+        Index("IX_DOCUMENT_SEARCH_VECTOR", "SEARCH_VECTOR", postgresql_using="gin"),
+    )
+
+    ID = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    DOCUMENT_ID = Column(UUID(as_uuid=True), ForeignKey("DOCUMENT.ID", ondelete="CASCADE"), nullable=False, index=True)
+    PROJECT_ID = Column(UUID(as_uuid=True), ForeignKey("PROJECT.ID", ondelete="CASCADE"), nullable=False, index=True)
+    TASK_ID = Column(UUID(as_uuid=True), ForeignKey("TASK.ID", ondelete="SET NULL"))
+    # "text" (parsed text of PAGE) or "result" (extracted values, ranked above text matches).
+    KIND = Column(String(16), nullable=False)
+    PAGE = Column(Integer)
+    CONTENT = Column(TEXT, nullable=False)
+    SEARCH_VECTOR = Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('english', \"CONTENT\"), CASE WHEN \"KIND\" = 'result' THEN 'A' ELSE 'B' END::\"char\")",
+        persisted=True
+    ))
+    CREATED_AT = Column(DateTime(timezone=True))
+
+
 class Task(Base):
     __tablename__ = "TASK"
+    __table_args__ = (
+        # Partial indexes over queued tasks only, used by the daemon's claim queries.
+        Index(
+            "IX_TASK_QUEUE", text("\"PRIORITY\" DESC"), "CREATED_AT",
+            postgresql_where=text("\"STATUS\"->>'status' = 'NOT_STARTED'")
+        ),
+        Index(
+            "IX_TASK_QUEUE_OWNER", "OWNER", text("\"PRIORITY\" DESC"), "CREATED_AT",
+            postgresql_where=text("\"STATUS\"->>'status' = 'NOT_STARTED'")
+        ),
+        Index("IX_TASK_DEFERRED", "CREATED_AT", postgresql_where=text("\"STATUS\"->>'status' = 'DEFERRED'")),
+    )
 
     ID = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     DOCUMENT_IDS = Column(JSONB, default=[])
     STATUS = Column(JSONB, nullable=False)
     AI_RESULT = Column(JSONB, default={})
     OUTPUT = Column(JSONB, default={})
+    PRIORITY = Column(Integer, nullable=False, default=0, server_default="0")
+    OWNER = Column(UUID(as_uuid=True), ForeignKey("USER.ID"), nullable=True)
+    CREATED_AT = Column(DateTime(timezone=True))
+    MODIFIED_AT = Column(DateTime(timezone=True))
+
+
+class TaskShare(Base):
+    """Fair-share scheduling state per task owner (stride scheduling)."""
+    __tablename__ = "TASK_SHARE"
+
+    OWNER = Column(UUID(as_uuid=True), ForeignKey("USER.ID"), primary_key=True)
+    WEIGHT = Column(Float, nullable=False, default=1.0, server_default="1")
+    PASS = Column(Float, nullable=False, default=0.0, server_default="0")
+    MODIFIED_AT = Column(DateTime(timezone=True))
+
+
+class TaskCheckpoint(Base):
+    __tablename__ = "TASK_CHECKPOINT"
+    __table_args__ = (UniqueConstraint("TASK_ID", "STEP_KEY"),)
+
+    ID = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    TASK_ID = Column(UUID(as_uuid=True), ForeignKey("TASK.ID", ondelete="CASCADE"), nullable=False, index=True)
+    STEP_KEY = Column(String(4096), nullable=False)
+    OUTPUT = Column(JSONB, default={})
     CREATED_AT = Column(DateTime(timezone=True))
+
+
+class TaskQueueStats(Base):
+    """Maintained task counters per owner id and per global shard (``global:<n>``), read by admission control."""
+    __tablename__ = "TASK_QUEUE_STATS"
+
+    SCOPE = Column(String(64), primary_key=True)
+    QUEUED = Column(Integer, nullable=False, default=0, server_default="0")
+    IN_FLIGHT = Column(Integer, nullable=False, default=0, server_default="0")
     MODIFIED_AT = Column(DateTime(timezone=True))
 
 
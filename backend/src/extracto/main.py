@@ -1,6 +1,12 @@
 import os
+import uuid
+
+from extracto.utils.startup import StartupTimer
+
+startup = StartupTimer()
+
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
 from extracto.api.document_api import document_api
@@ -8,10 +14,13 @@ from extracto.api.project_api import project_api
 from extracto.api.task_api import task_api
 from extracto.api.user_api import user_api
 from extracto.api.auth_api import auth_api
+from extracto.api.search_api import search_api
 
-from extracto.logger.log_utils import Logger
+from extracto.logger.log_utils import Logger, bind
+from extracto.utils.util import FastJSONResponse
 
 logger = Logger()
+startup.mark("imports")
 
 base_url = "/extracto"
 
@@ -20,7 +29,8 @@ app = FastAPI(
     docs_url=base_url + "/swagger",
     title="Document Processing Application",
     description="LLM powered document intelligence platform",
-    version="0.0.1"
+    version="0.0.1",
+    default_response_class=FastJSONResponse
 )
 
 allowed_origins = os.getenv("ALLOWED_ORIGINS", "http://localhost:3000").split(",")
@@ -30,11 +40,24 @@ app.add_middleware(
     allow_origins=allowed_origins,
     allow_credentials=False,
     allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH"],
-    allow_headers=["Content-Type", "Authorization"],
+    allow_headers=["Content-Type", "Authorization", "If-None-Match", "X-Request-ID"],
+    expose_headers=["ETag", "X-Request-ID"],
     max_age=3600
 )
 
 
+@app.middleware("http")
+async def request_context(request: Request, call_next):
+    """
+    Tag every log record of a request with its id (X-Request-ID when the client sends one).
+    """
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    with bind(request_id=request_id):
+        response = await call_next(request)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
+
 @app.on_event("startup")
 def start():
     """
@@ -42,7 +65,8 @@ def start():
     """
     try:
         logger.info(f'Starting application...')
-        logger.info(f'Application Stated')
+        startup.mark("startup")
+        logger.info(f'Application Stated. {startup.report()}')
     except Exception as e:
         logger.error(f'Exception in startup of application: {e}')
 
@@ -61,6 +85,7 @@ app.include_router(user_api, prefix="/api/v1/user")
 app.include_router(document_api, prefix="/api/v1/document")
 app.include_router(project_api, prefix="/api/v1/project")
 app.include_router(task_api, prefix="/api/v1/task")
+app.include_router(search_api, prefix="/api/v1/search")
 
 
 if __name__ == '__main__':
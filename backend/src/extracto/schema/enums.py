@@ -2,9 +2,9 @@ from enum import  Enum
 
 
 class TaskStatus(str, Enum):
-    NOT_STARTED = "Not Started"
-    IN_PROGRESS = "In Progress"
-    SUCCESS = "Success"
-    FAILURE = "Failure"
-
-
+    # Same values as the daemon's TaskStatus: both sides read and write them in TASK.STATUS.
+    NOT_STARTED = "NOT_STARTED"
+    IN_PROGRESS = "IN_PROGRESS"
+    SUCCESS = "SUCCESS"
+    FAILURE = "FAILURE"
+    DEFERRED = "DEFERRED"
@@ -17,6 +17,7 @@ class ProjectRequestSchema(BaseModel):
 
 class TaskRequestSchema(BaseModel):
     documentIds: List
+    priority: Optional[int] = None
 
 
 class UserRequestModel(BaseModel):
@@ -14,6 +14,13 @@ class DocumentResponse(BaseModel):
     modifiedTs: datetime
 
 
+class WorkflowResponse(BaseModel):
+    workflowId: UUID
+    workflowName: str
+    createdTs: datetime
+    modifiedTs: datetime
+
+
 class ProjectResponse(BaseModel):
     projectId: UUID
     projectName: str
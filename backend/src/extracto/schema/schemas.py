@@ -14,7 +14,7 @@ class UserCreate(BaseModel):
     role: str = RoleEnum.USER
 
 
-    @field_validator
+    @field_validator("password")
     @classmethod
     def validate_password_strength(cls, value: str) -> str:
         """
@@ -40,8 +40,9 @@ class UserCreate(BaseModel):
         
         if not re.search(r'[!@#$%^&*(),.?":{}|<>]', value):
             raise ValueError('Password must contain at least one special letter.')
+        return value
 
-    @field_validator
+    @field_validator("firstName", "lastName")
     @classmethod
     def sanitize_name(cls, value: Optional[str]) -> Optional[str]:
         """
@@ -54,6 +55,8 @@ class UserCreate(BaseModel):
         :rtype: str | None
         """
 
+        if value is None:
+            return value
         value = re.sub(r'[<>\"\'`;]', '', value)
         return value.strip()[:256]
 
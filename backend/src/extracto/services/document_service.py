@@ -1,7 +1,11 @@
 import logging
+import os
+from typing import Iterator
 
 from fastapi import UploadFile
 import uuid
+from sqlalchemy import Text, cast, func, literal_column, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 
 from extracto.db.azure.base import DBConnection
 from extracto.common.storage.s3_file_manager import S3FileManager
@@ -14,6 +18,14 @@ from extracto.logger.log_utils import Logger
 
 logger = Logger()
 
+# Projects fetched per round trip while a listing streams from its server-side cursor.
+LISTING_FETCH_ROWS = int(os.getenv("LISTING_FETCH_ROWS", 100))
+
+
+def _key(name: str):
+    # json_build_object takes "any" arguments, so keys go in as SQL literals rather than untyped parameters.
+    return literal_column(f"'{name}'")
+
 
 class DocumentService:
 
@@ -30,8 +42,6 @@ class DocumentService:
         session = DBConnection().get_session()
         response = []
         try:
-            logger.info(f"Fetching documents for user {self.user.ID} with role {self.user.ROLE}...")
-
             # Check if user is admin
             if self.user.ROLE and self.user.ROLE.lower() == "admin":
                 projects = session.query(Project).all()
@@ -70,7 +80,7 @@ class DocumentService:
 
                 response.append(project_entry)
 
-            logger.info("Successfully fetched grouped documents.")
+            logger.debug("Fetched documents of %s projects for user %s", len(projects), self.user.ID)
 
         except Exception as e:
             session.rollback()
@@ -116,71 +126,123 @@ class DocumentService:
             session.close()
         return response
 
-    async def list_based_on_project(self, projectId: str):
-        """
-        Fetch documents grouped by project and folder.
-        - If user is Admin → fetch all projects/documents.
-        - Else → fetch only projects owned by the logged-in user.
+    def grouped_documents_query(self, projectId: str = None):
         """
-        session = DBConnection().get_session()
-        response = []
-        try:
-            logger.info(f"Fetching documents for user {self.user.ID} with role {self.user.ROLE}...")
+        Query for the projects visible to the user, each as one JSON text built by Postgres:
+        ``{"projectId", "projectName", "folders": [{"folderName", "documents": [...]}]}``.
 
-            # Check if user is admin
-            if self.user.ROLE and self.user.ROLE.lower() == "admin":
-                projects = session.query(Project).all()
-            else:
-                if projectId:
-                    projects = (session.query(Project).filter(Project.OWNER == self.user.ID).filter
-                                    (Project.ID == projectId).all())
-                else:
-                    projects = session.query(Project).filter(Project.OWNER == self.user.ID).all()
+        Documents are grouped by ``FOLDER_NAME`` ("root" when unset) with ``json_agg``, so no
+        ORM object is created per document.
 
-            for project in projects:
-                project_entry = {
-                    "projectId": str(project.ID),
-                    "projectName": project.NAME,
-                    "folders": {}
-                }
+        Args:
+            projectId (str, optional): Only this project.
 
-                # Fetch documents under this project
-                documents = (
-                    session.query(Document)
-                    .filter(Document.PROJECT_ID == project.ID)
-                    .all()
-                )
+        Returns:
+            Select: One text column, one row per project.
+        """
+        folder = func.coalesce(Document.FOLDER_NAME, literal_column("'root'"))
+        document = func.json_build_object(
+            _key("projectId"), Document.PROJECT_ID,
+            _key("folderName"), Document.FOLDER_NAME,
+            _key("documentId"), Document.ID,
+            _key("documentName"), Document.NAME,
+            _key("storagePath"), Document.STORAGE_PATH,
+            _key("createdTs"), Document.CREATED_AT,
+            _key("modifiedTs"), Document.MODIFIED_AT
+        )
+        by_folder = (
+            select(
+                folder.label("folder"),
+                func.json_agg(aggregate_order_by(document, Document.CREATED_AT)).label("documents")
+            )
+            .where(Document.PROJECT_ID == Project.ID)
+            .group_by(folder)
+            .correlate(Project)
+            .subquery()
+        )
+        folders = select(func.coalesce(
+            func.json_agg(aggregate_order_by(
+                func.json_build_object(_key("folderName"), by_folder.c.folder, _key("documents"), by_folder.c.documents),
+                by_folder.c.folder
+            )),
+            literal_column("'[]'::json")
+        )).scalar_subquery()
+
+        query = select(cast(func.json_build_object(
+            _key("projectId"), Project.ID,
+            _key("projectName"), Project.NAME,
+            _key("folders"), folders
+        ), Text)).order_by(Project.CREATED_AT)
+        return self._visible(query, projectId)
+
+    def _visible(self, query, projectId: str = None):
+        # Admins see every project, everybody else only their own.
+        if not (self.user.ROLE and self.user.ROLE.lower() == "admin"):
+            query = query.where(Project.OWNER == self.user.ID)
+        if projectId:
+            query = query.where(Project.ID == projectId)
+        return query
+
+    def listing_version(self, projectId: str = None) -> tuple:
+        """
+        Counts and latest modification times behind a grouped listing, for its ETag.
 
-                for doc in documents:
-                    folder_name = doc.FOLDER_NAME or "root"
+        Any upload, delete or project update changes one of them, and the query only reads
+        indexes and two aggregates instead of building the listing.
 
-                    if folder_name not in project_entry["folders"]:
-                        project_entry["folders"][folder_name] = []
+        Args:
+            projectId (str, optional): Only this project.
 
-                    project_entry["folders"][folder_name].append(self.response(document=doc))
+        Returns:
+            tuple: Project count, latest project MODIFIED_AT, document count, latest document MODIFIED_AT.
+        """
+        query = self._visible(
+            select(
+                func.count(Project.ID.distinct()),
+                func.max(Project.MODIFIED_AT),
+                func.count(Document.ID),
+                func.max(Document.MODIFIED_AT)
+            ).select_from(Project).outerjoin(Document, Document.PROJECT_ID == Project.ID),
+            projectId
+        )
+        session = DBConnection().get_session()
+        try:
+            return tuple(session.execute(query).one())
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Exception in reading the listing version: {e}")
+            raise Exception(f"Exception in reading the listing version: {e}")
+        finally:
+            session.close()
 
-                # Convert dict → list for folders
-                project_entry["folders"] = [
-                    {
-                        "folderName": fname,
-                        "documents": docs
-                    } for fname, docs in project_entry["folders"].items()
-                ]
+    def stream_based_on_project(self, projectId: str = None) -> Iterator[str]:
+        """
+        Fetch documents grouped by project and folder, as JSON texts ready to send.
 
-                response.append(project_entry)
+        Rows come from a server-side cursor, LISTING_FETCH_ROWS projects at a time; the
+        session stays open until the iterator is exhausted or closed.
 
-            logger.info("Successfully fetched grouped documents.")
+        Args:
+            projectId (str, optional): Only this project.
 
+        Returns:
+            Iterator[str]: One JSON object per project.
+        """
+        session = DBConnection().get_session()
+        try:
+            rows = session.execute(
+                self.grouped_documents_query(projectId),
+                execution_options={"stream_results": True, "yield_per": LISTING_FETCH_ROWS}
+            ).scalars()
+            yield from rows
+            session.commit()
         except Exception as e:
             session.rollback()
             logger.error(f"Exception in listing documents: {e}")
             raise Exception(f"Exception in listing documents: {e}")
         finally:
-            session.commit()
             session.close()
 
-        return response
-
     async def get(self, documentId: str):
         response = None
         session = DBConnection().get_session()
@@ -229,7 +291,7 @@ class DocumentService:
             session.close()
 
     def response(self, document: Document):
-        return DocumentResponse(
+        return DocumentResponse.model_construct(
             projectId=document.PROJECT_ID,
             folderName=document.FOLDER_NAME,
             documentId=document.ID,
@@ -0,0 +1,270 @@
+import json
+import os
+import tempfile
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import String, cast, select
+
+from extracto.common.storage.s3_file_manager import S3FileManager
+from extracto.db.azure.base import DBConnection
+from extracto.db.model import Document, Project, Task, User
+from extracto.logger.log_utils import Logger
+from extracto.schema.enums import TaskStatus
+
+logger = Logger()
+
+# Rows per row group (Parquet) or record batch (Arrow), and per fetch from the server-side cursor.
+EXPORT_ROW_GROUP_ROWS = int(os.getenv("EXPORT_ROW_GROUP_ROWS", 50000))
+PARQUET, ARROW = "parquet", "arrow"
+MEDIA_TYPES = {PARQUET: "application/vnd.apache.parquet", ARROW: "application/vnd.apache.arrow.file"}
+
+# Columns of every export, before the columns of the extraction schema.
+BASE_COLUMNS = ["taskId", "documentId", "documentIds", "createdAt", "modifiedAt"]
+# Export of results that no single extraction schema describes.
+RESULT_COLUMN = "result"
+
+
+def schema_fields(schema: dict, prefix: str = "") -> List[Tuple[str, List[str], str]]:
+    """
+    Leaf fields of a JSON schema, nested objects flattened into dotted column names.
+
+    Returns:
+        list: ``(column, path, json type)``; arrays and untyped values are exported as JSON text.
+    """
+    fields = []
+    for name, spec in (schema.get("properties") or {}).items():
+        spec_type = spec.get("type")
+        if isinstance(spec_type, list):
+            spec_type = next((item for item in spec_type if item != "null"), None)
+        if spec_type == "object" and spec.get("properties"):
+            for column, path, leaf_type in schema_fields(spec, f"{prefix}{name}."):
+                fields.append((column, [name] + path, leaf_type))
+        else:
+            fields.append((f"{prefix}{name}", [name], spec_type))
+    return fields
+
+
+def _arrow_type(json_type: Optional[str]):
+    import pyarrow as pa
+
+    return {"integer": pa.int64(), "number": pa.float64(), "boolean": pa.bool_()}.get(json_type, pa.string())
+
+
+def _coerce(value, json_type: Optional[str]):
+    # Values not matching the schema become nulls rather than failing the export.
+    if value is None:
+        return None
+    try:
+        if json_type == "integer":
+            return int(value)
+        if json_type == "number":
+            return float(value)
+        if json_type == "boolean":
+            return value if isinstance(value, bool) else str(value).lower() in ("true", "1", "yes")
+    except (TypeError, ValueError):
+        return None
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    return str(value)
+
+
+def _lookup(result, path: List[str]):
+    for key in path:
+        if not isinstance(result, dict):
+            return None
+        result = result.get(key)
+    return result
+
+
+class _ChunkSink:
+    """Write-only file for pyarrow writers; what was written is taken out chunk by chunk."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self) -> bytes:
+        data, self.chunks = b"".join(self.chunks), []
+        return data
+
+
+class ExportService:
+
+    def __init__(self, user: User):
+        self.user = user
+
+    def extraction_step(self, projectId: str) -> Optional[dict]:
+        """The project's extraction step when there is exactly one, whose results follow its schema."""
+        session = DBConnection().get_session()
+        try:
+            project = session.query(Project).filter(Project.ID == projectId, Project.OWNER == self.user.ID).first()
+            if not project:
+                raise Exception("Project not found.")
+            steps = [
+                step for step in (project.WORKFLOW or {}).get("steps", [])
+                if step.get("method") == "EXTRACTING" and step.get("enabled", True)
+            ]
+        finally:
+            session.close()
+        return steps[0] if len(steps) == 1 and (steps[0].get("config") or {}).get("schema") else None
+
+    def query(self, projectId: str = None, createdAfter: datetime = None, createdBefore: datetime = None):
+        """Completed tasks whose documents belong to the user's projects, oldest first."""
+        documents = (
+            select(Document.ID)
+            .join(Project, Project.ID == Document.PROJECT_ID)
+            .where(Project.OWNER == self.user.ID, Task.DOCUMENT_IDS.op("?")(cast(Document.ID, String)))
+        )
+        if projectId:
+            documents = documents.where(Project.ID == projectId)
+
+        query = (
+            select(Task.ID, Task.DOCUMENT_IDS, Task.AI_RESULT, Task.CREATED_AT, Task.MODIFIED_AT)
+            .where(Task.STATUS["status"].astext == TaskStatus.SUCCESS.value, documents.exists())
+            .order_by(Task.CREATED_AT, Task.ID)
+        )
+        if createdAfter:
+            query = query.where(Task.CREATED_AT >= createdAfter)
+        if createdBefore:
+            query = query.where(Task.CREATED_AT < createdBefore)
+        return query
+
+    def record_batches(self, projectId: str = None, createdAfter: datetime = None,
+                       createdBefore: datetime = None) -> Tuple["pyarrow.Schema", Iterator["pyarrow.RecordBatch"]]:
+        """
+        Arrow schema of the export and its record batches, read with a server-side cursor.
+
+        Results are flattened against the schema of the project's extraction step into typed
+        columns; a per-document extraction (``forEach`` or ``config.per_document``) gives one
+        row per document. Without a project or a single extraction schema, each result is one
+        JSON text column.
+        Memory holds one batch of EXPORT_ROW_GROUP_ROWS rows at a time.
+        """
+        import pyarrow as pa
+
+        step = self.extraction_step(projectId) if projectId else None
+        fields = schema_fields(step["config"]["schema"]) if step else []
+        # Fanned-out steps and ``config.per_document`` extractions both key results by document.
+        per_document = bool(step and (step.get("forEach") or (step.get("config") or {}).get("per_document")))
+
+        schema = pa.schema(
+            [
+                ("taskId", pa.string()),
+                ("documentId", pa.string()),
+                ("documentIds", pa.list_(pa.string())),
+                ("createdAt", pa.timestamp("us", tz="UTC")),
+                ("modifiedAt", pa.timestamp("us", tz="UTC")),
+            ]
+            + ([(column, _arrow_type(json_type)) for column, _, json_type in fields] if step
+               else [(RESULT_COLUMN, pa.string())])
+        )
+        statement = self.query(projectId, createdAfter, createdBefore)
+
+        def to_batch(rows) -> "pa.RecordBatch":
+            columns = {name: [] for name in schema.names}
+            for task_id, document_ids, result, created_at, modified_at in rows:
+                document_ids = [str(document_id) for document_id in document_ids or []]
+                if per_document and isinstance(result, dict):
+                    entries = list(result.items())
+                else:
+                    entries = [(document_ids[0] if len(document_ids) == 1 else None, result)]
+                for document_id, entry in entries:
+                    columns["taskId"].append(str(task_id))
+                    columns["documentId"].append(document_id)
+                    columns["documentIds"].append(document_ids)
+                    columns["createdAt"].append(created_at)
+                    columns["modifiedAt"].append(modified_at)
+                    if step:
+                        for column, path, json_type in fields:
+                            columns[column].append(_coerce(_lookup(entry, path), json_type))
+                    else:
+                        columns[RESULT_COLUMN].append(json.dumps(entry, default=str))
+            return pa.RecordBatch.from_pydict(columns, schema=schema)
+
+        def batches():
+            session = DBConnection().get_session()
+            try:
+                result = session.execute(
+                    statement, execution_options={"stream_results": True, "yield_per": EXPORT_ROW_GROUP_ROWS}
+                )
+                for rows in result.partitions():
+                    yield to_batch(rows)
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                logger.error(f"Exception in exporting task results: {e}")
+                raise Exception(f"Exception in exporting task results: {e}")
+            finally:
+                session.close()
+
+        return schema, batches()
+
+    @staticmethod
+    def _writer(sink, schema, format: str):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if format == PARQUET:
+            return pq.ParquetWriter(sink, schema, compression="zstd")
+        if format == ARROW:
+            return pa.ipc.new_file(sink, schema)
+        raise Exception(f"Unsupported export format '{format}', use '{PARQUET}' or '{ARROW}'")
+
+    def stream(self, format: str = PARQUET, **filters) -> Iterator[bytes]:
+        """
+        The export file, in chunks of one row group each, for a streamed download.
+
+        Args:
+            format (str): ``parquet`` or ``arrow`` (Arrow IPC file).
+            **filters: ``projectId``, ``createdAfter``, ``createdBefore``.
+        """
+        import pyarrow as pa
+
+        schema, batches = self.record_batches(**filters)
+        sink = _ChunkSink()
+        writer = self._writer(pa.PythonFile(sink, mode="w"), schema, format)
+        for batch in batches:
+            writer.write_batch(batch)
+            yield sink.take()
+        writer.close()
+        yield sink.take()
+
+    def to_s3(self, format: str = PARQUET, **filters) -> dict:
+        """
+        Write the export to S3 under ``Extracto/exports/``.
+
+        The file is spooled to a temporary file on disk and uploaded in parts, so memory stays
+        bounded by one row group whatever the size of the export.
+
+        Returns:
+            dict: ``bucket``, ``key`` and ``rows`` of the uploaded export.
+        """
+        schema, batches = self.record_batches(**filters)
+        key = f"Extracto/exports/{self.user.ID}/{datetime.utcnow():%Y%m%dT%H%M%S}-{filters.get('projectId') or 'all'}.{format}"
+        rows = 0
+        with tempfile.TemporaryFile() as spool:
+            writer = self._writer(spool, schema, format)
+            for batch in batches:
+                writer.write_batch(batch)
+                rows += batch.num_rows
+            writer.close()
+            spool.seek(0)
+            location = S3FileManager().upload(spool, key)
+        logger.info(f"Exported {rows} task results to {key}")
+        return {**location, "rows": rows}
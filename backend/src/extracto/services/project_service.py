@@ -1,10 +1,13 @@
 import logging
 from typing import List
 
+from sqlalchemy import func
+
 from extracto.db.azure.base import DBConnection
 from extracto.schema.objects import ProjectWorkflow
 from extracto.db.model import Document, Project, User
 from extracto.schema.response import ProjectResponse, DocumentResponse
+from extracto.services.document_service import DocumentService
 from extracto.utils.util import get_unique_number, get_current_datetime
 
 logger = logging.getLogger(__name__)
@@ -36,70 +39,32 @@ class ProjectService:
         logger.info(f"Successfully fetched the list of projects.")
         return response
 
-    async def list_based_on_project(self, projectId: str):
+    def list_version(self) -> tuple:
         """
-        Fetch documents grouped by project and folder.
-        - If user is Admin → fetch all projects/documents.
-        - Else → fetch only projects owned by the logged-in user.
+        Count and latest MODIFIED_AT of the user's projects, the ETag source of ``list``.
         """
         session = DBConnection().get_session()
-        response = {}
         try:
-            logger.info(f"Fetching documents for user {self.user.ID} with role {self.user.ROLE}...")
-
-            # Check if user is admin
-            if self.user.ROLE and self.user.ROLE.lower() == "admin":
-                projects = session.query(Project).all()
-            else:
-                if projectId:
-                    projects = (session.query(Project).filter(Project.OWNER == self.user.ID).filter
-                                    (Project.ID == projectId).all())
-                else:
-                    projects = session.query(Project).filter(Project.OWNER == self.user.ID).all()
-
-            for project in projects:
-                project_entry = {
-                    "projectId": str(project.ID),
-                    "projectName": project.NAME,
-                    "folders": {}
-                }
-
-                # Fetch documents under this project
-                documents = (
-                    session.query(Document)
-                    .filter(Document.PROJECT_ID == project.ID)
-                    .all()
-                )
-
-                for doc in documents:
-                    folder_name = doc.FOLDER_NAME or "root"
-
-                    if folder_name not in project_entry["folders"]:
-                        project_entry["folders"][folder_name] = []
-
-                    project_entry["folders"][folder_name].append(self.document_response(document=doc))
-
-                # Convert dict → list for folders
-                project_entry["folders"] = [
-                    {
-                        "folderName": fname,
-                        "documents": docs
-                    } for fname, docs in project_entry["folders"].items()
-                ]
-
-                response = project_entry
-
-            logger.info("Successfully fetched grouped documents.")
-
+            return tuple(
+                session.query(func.count(Project.ID), func.max(Project.MODIFIED_AT))
+                .filter(Project.OWNER == self.user.ID)
+                .one()
+            )
         except Exception as e:
             session.rollback()
-            logger.error(f"Exception in listing documents: {e}")
-            raise Exception(f"Exception in listing documents: {e}")
+            logger.error(f"Exception in reading the projects version: {e}")
+            raise Exception(f"Exception in reading the projects version: {e}")
         finally:
-            session.commit()
             session.close()
 
-        return response
+    def stream_based_on_project(self, projectId: str):
+        """
+        The project with its documents grouped by folder, as one JSON text built by Postgres.
+
+        Returns:
+            Iterator[str]: The project's JSON object, nothing when it is not visible to the user.
+        """
+        return DocumentService(user=self.user).stream_based_on_project(projectId=projectId)
 
     async def create(self, projectName: str, tags: List, description: str, workflow: [ProjectWorkflow] = None):
         response = {}
@@ -173,6 +138,8 @@ class ProjectService:
                 update_dict[Project.DESCRIPTION] = description
             if workflow:
                 update_dict[Project.WORKFLOW]= workflow
+            # Listing ETags are derived from MODIFIED_AT, so every update moves it.
+            update_dict[Project.MODIFIED_AT] = self.modified_at
             is_project_updated = session.query(Project).filter(
                 Project.OWNER == self.user.ID
             ).filter(Project.ID == projectId).update(update_dict)
@@ -211,7 +178,7 @@ class ProjectService:
         return response
 
     def response(self, project: Project):
-        return ProjectResponse(
+        return ProjectResponse.model_construct(
             projectId=project.ID,
             projectName=project.NAME,
             tags=project.TAGS,
@@ -219,10 +186,10 @@ class ProjectService:
             owner=project.OWNER,
             createdTs=project.CREATED_AT,
             modifiedTs=project.MODIFIED_AT
-        ).dict()
+        )
 
     def document_response(self, document: Document):
-        return DocumentResponse(
+        return DocumentResponse.model_construct(
             projectId=document.PROJECT_ID,
             folderName=document.FOLDER_NAME,
             documentId=document.ID,
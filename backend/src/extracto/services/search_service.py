@@ -0,0 +1,144 @@
+import base64
+import json
+import os
+import uuid
+
+from sqlalchemy import Float, and_, cast, func, literal_column, or_, select
+
+from extracto.db.azure.base import DBConnection
+from extracto.db.model import Document, DocumentSearch, Project, User
+from extracto.logger.log_utils import Logger
+
+logger = Logger()
+
+SEARCH_PAGE_SIZE = int(os.getenv("SEARCH_PAGE_SIZE", 20))
+SEARCH_MAX_PAGE_SIZE = int(os.getenv("SEARCH_MAX_PAGE_SIZE", 100))
+# Matches ranked per query, taken in id order. Bounds the cost of very common terms.
+SEARCH_MAX_CANDIDATES = int(os.getenv("SEARCH_MAX_CANDIDATES", 2000))
+SEARCH_HEADLINE_OPTIONS = os.getenv(
+    "SEARCH_HEADLINE_OPTIONS", "MaxFragments=2, MaxWords=20, MinWords=5, StartSel=<mark>, StopSel=</mark>"
+)
+
+# Same text search configuration as the generated SEARCH_VECTOR column.
+ENGLISH = literal_column("'english'::regconfig")
+
+
+class SearchService:
+
+    def __init__(self, user: User):
+        self.user = user
+
+    @staticmethod
+    def encode_cursor(rank: float, row_id) -> str:
+        return base64.urlsafe_b64encode(json.dumps([rank, str(row_id)]).encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> tuple:
+        try:
+            rank, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return float(rank), uuid.UUID(row_id)
+        except Exception:
+            raise Exception("Invalid cursor")
+
+    def search(self, query: str, projectId: str = None, limit: int = None, cursor: str = None) -> dict:
+        """
+        Full-text search over the parsed text and extraction results of the user's documents.
+
+        Matches come from the GIN index on ``DOCUMENT_SEARCH.SEARCH_VECTOR``. The first
+        SEARCH_MAX_CANDIDATES of them in id order are ranked (extracted values weigh more than
+        page text), and only the returned page is highlighted. Pages follow each other by
+        keyset ``(rank, id)`` cursors over that order, so no hit is skipped or repeated
+        between pages.
+
+        The cap trades recall for latency: when a query matches more rows than that, matches
+        outside the candidate set are never returned, however well they would rank. Rarer
+        terms, or a search narrowed to one project, stay under the cap and rank every match.
+        Taking candidates by id keeps the set the same from one page to the next, and the
+        primary key can serve it without ranking every match first.
+
+        Args:
+            query (str): Web search syntax: words, "quoted phrases", OR, -excluded.
+            projectId (str, optional): Only this project.
+            limit (int, optional): Hits per page, at most SEARCH_MAX_PAGE_SIZE.
+            cursor (str, optional): ``nextCursor`` of the previous page.
+
+        Returns:
+            dict: ``{"hits": [...], "nextCursor": str | None}``.
+        """
+        if not query or not query.strip():
+            raise Exception("Search query is empty")
+        limit = max(1, min(int(limit or SEARCH_PAGE_SIZE), SEARCH_MAX_PAGE_SIZE))
+        tsquery = func.websearch_to_tsquery(ENGLISH, query)
+
+        candidates = (
+            select(DocumentSearch.ID)
+            .join(Project, Project.ID == DocumentSearch.PROJECT_ID)
+            .where(DocumentSearch.SEARCH_VECTOR.op("@@")(tsquery))
+        )
+        # Admins search every project, everybody else only their own.
+        if not (self.user.ROLE and self.user.ROLE.lower() == "admin"):
+            candidates = candidates.where(Project.OWNER == self.user.ID)
+        if projectId:
+            candidates = candidates.where(DocumentSearch.PROJECT_ID == projectId)
+        candidates = candidates.order_by(DocumentSearch.ID).limit(SEARCH_MAX_CANDIDATES).subquery()
+
+        # Ranked outside the capped subquery, so ts_rank_cd runs on the candidates only.
+        matches = (
+            select(
+                DocumentSearch.ID,
+                # float8 so the rank in a cursor compares equal to the one computed again.
+                cast(func.ts_rank_cd(DocumentSearch.SEARCH_VECTOR, tsquery), Float).label("rank")
+            )
+            .join(candidates, candidates.c.ID == DocumentSearch.ID)
+            .subquery()
+        )
+
+        page = select(matches).order_by(matches.c.rank.desc(), matches.c.ID)
+        if cursor:
+            rank, row_id = self.decode_cursor(cursor)
+            page = page.where(or_(
+                matches.c.rank < rank,
+                and_(matches.c.rank == rank, matches.c.ID > row_id)
+            ))
+        page = page.limit(limit + 1).subquery()
+
+        statement = (
+            select(
+                DocumentSearch.ID,
+                DocumentSearch.DOCUMENT_ID,
+                DocumentSearch.PROJECT_ID,
+                DocumentSearch.KIND,
+                DocumentSearch.PAGE,
+                Document.NAME,
+                page.c.rank,
+                func.ts_headline(ENGLISH, DocumentSearch.CONTENT, tsquery, SEARCH_HEADLINE_OPTIONS).label("highlight")
+            )
+            .join(page, page.c.ID == DocumentSearch.ID)
+            .join(Document, Document.ID == DocumentSearch.DOCUMENT_ID)
+            .order_by(page.c.rank.desc(), DocumentSearch.ID)
+        )
+
+        session = DBConnection().get_session()
+        try:
+            rows = session.execute(statement).all()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Exception in searching documents: {e}")
+            raise Exception(f"Exception in searching documents: {e}")
+        finally:
+            session.close()
+
+        hits = [
+            {
+                "documentId": row.DOCUMENT_ID,
+                "documentName": row.NAME,
+                "projectId": row.PROJECT_ID,
+                "kind": row.KIND,
+                "page": row.PAGE,
+                "rank": row.rank,
+                "highlight": row.highlight
+            }
+            for row in rows[:limit]
+        ]
+        next_cursor = self.encode_cursor(rows[limit - 1].rank, rows[limit - 1].ID) if len(rows) > limit else None
+        return {"hits": hits, "nextCursor": next_cursor}
@@ -1,7 +1,14 @@
-from sqlalchemy import String
+import os
+import uuid
+from collections import Counter
+from typing import List
+
+from fastapi import HTTPException
+from sqlalchemy import String, func, select, text
+from sqlalchemy.dialects.postgresql import insert
 
 from extracto.db.azure.base import DBConnection
-from extracto.db.model import Document, Project, Task, User
+from extracto.db.model import Document, Project, Task, TaskQueueStats, TaskShare, User
 from extracto.logger.log_utils import Logger
 from extracto.schema.objects import TaskRequestSchema
 from extracto.schema.response import TaskResponse
@@ -10,6 +17,34 @@ from extracto.schema.enums import TaskStatus
 
 logger = Logger()
 
+# Single-document tasks go to the daemon's fast lane; user priorities stay below it.
+TASK_INTERACTIVE_PRIORITY = int(os.getenv("TASK_INTERACTIVE_PRIORITY", 10))
+TASK_MAX_USER_PRIORITY = int(os.getenv("TASK_MAX_USER_PRIORITY", 5))
+TASK_BULK_MAX = int(os.getenv("TASK_BULK_MAX", 50000))
+# Rows per INSERT statement; keeps bound parameters under the PostgreSQL limit of 65535.
+TASK_BULK_INSERT_ROWS = int(os.getenv("TASK_BULK_INSERT_ROWS", 5000))
+# Channel the daemons LISTEN on to claim new tasks without waiting for their next poll.
+TASK_QUEUE_CHANNEL = "task_queue"
+
+# Admission limits on queued and running tasks, per owner and across owners (0 = no limit).
+TASK_MAX_QUEUED_PER_OWNER = int(os.getenv("TASK_MAX_QUEUED_PER_OWNER", 1000))
+TASK_MAX_QUEUED_GLOBAL = int(os.getenv("TASK_MAX_QUEUED_GLOBAL", 100000))
+TASK_MAX_IN_FLIGHT_PER_OWNER = int(os.getenv("TASK_MAX_IN_FLIGHT_PER_OWNER", 0))
+TASK_MAX_IN_FLIGHT_GLOBAL = int(os.getenv("TASK_MAX_IN_FLIGHT_GLOBAL", 0))
+# Over a limit, "reject" answers 429 with Retry-After; "defer" queues what fits and defers the rest.
+TASK_ADMISSION_POLICY = os.getenv("TASK_ADMISSION_POLICY", "reject")
+TASK_RETRY_AFTER = int(os.getenv("TASK_RETRY_AFTER", 30))
+# The global counters are spread over this many rows (same setting as the daemon), so
+# concurrent submitters do not all wait on one row lock; readers sum the shards.
+TASK_STATS_SHARDS = int(os.getenv("TASK_STATS_SHARDS", 16))
+GLOBAL_SCOPE = "global"
+GLOBAL_SCOPES = [f"{GLOBAL_SCOPE}:{shard}" for shard in range(TASK_STATS_SHARDS)]
+
+
+def global_scope(task_id) -> str:
+    """Global counter shard of a task, picked by its id so the daemon updates the same row."""
+    return GLOBAL_SCOPES[uuid.UUID(str(task_id)).int % TASK_STATS_SHARDS]
+
 
 class TaskService:
 
@@ -68,19 +103,140 @@ class TaskService:
             session.close()
         return response
 
+    @staticmethod
+    def task_priority(taskRequestSchema: TaskRequestSchema) -> int:
+        if taskRequestSchema.priority is not None:
+            return max(0, min(taskRequestSchema.priority, TASK_MAX_USER_PRIORITY))
+        if len(taskRequestSchema.documentIds) == 1:
+            return TASK_INTERACTIVE_PRIORITY
+        return 0
+
+    def join_fair_share(self, session):
+        """
+        Make sure the owner takes part in fair-share scheduling.
+
+        An owner (re)joining starts at the lowest pass of the owners with queued work, so
+        time spent idle does not turn into a burst that starves everyone else.
+        """
+        queued = (
+            select(Task.ID)
+            .where(Task.OWNER == TaskShare.OWNER, text(f"\"STATUS\"->>'status' = '{TaskStatus.NOT_STARTED.value}'"))
+            .exists()
+        )
+        floor = select(func.coalesce(func.min(TaskShare.PASS), 0)).where(queued).scalar_subquery()
+        statement = insert(TaskShare).values(OWNER=self.user.ID, PASS=floor, MODIFIED_AT=self.modified_at)
+        session.execute(statement.on_conflict_do_update(
+            index_elements=[TaskShare.OWNER],
+            set_={"PASS": func.greatest(TaskShare.PASS, statement.excluded.PASS)}
+        ))
+
+    def admit(self, session, count: int) -> int:
+        """
+        Admission control for ``count`` new tasks of the user.
+
+        Reads the counters maintained on every status change (one primary key lookup per
+        scope) instead of counting tasks, so the check costs the same however long the queue is.
+
+        Within the limits every task is queued. Over a limit, the policy "defer" queues the
+        part that fits and defers the rest, and "reject" answers 429. A batch larger than a
+        queue limit could never be admitted whole, so it is always queued in part and
+        deferred for the rest, whatever the policy.
+
+        Args:
+            session: Session of the creating transaction.
+            count (int): Number of tasks to create.
+
+        Returns:
+            int: Number of tasks to queue now (NOT_STARTED); the others are created DEFERRED.
+
+        Raises:
+            HTTPException: 429 with a Retry-After header when over a limit and the policy is "reject".
+        """
+        owner = str(self.user.ID)
+        queued, in_flight = Counter(), Counter()
+        for row in session.query(TaskQueueStats).filter(TaskQueueStats.SCOPE.in_([owner, *GLOBAL_SCOPES])):
+            scope = owner if row.SCOPE == owner else GLOBAL_SCOPE
+            queued[scope] += row.QUEUED
+            in_flight[scope] += row.IN_FLIGHT
+
+        limits = [
+            ("queued tasks per user", TASK_MAX_QUEUED_PER_OWNER, queued[owner], count),
+            ("queued tasks", TASK_MAX_QUEUED_GLOBAL, queued[GLOBAL_SCOPE], count),
+            ("running tasks per user", TASK_MAX_IN_FLIGHT_PER_OWNER, in_flight[owner], 0),
+            ("running tasks", TASK_MAX_IN_FLIGHT_GLOBAL, in_flight[GLOBAL_SCOPE], 0),
+        ]
+        room, exceeded = count, []
+        for name, limit, current, adding in limits:
+            if limit and current + adding > limit:
+                exceeded.append(f"{name} ({limit})")
+                # Over a running limit nothing is queued until running tasks finish.
+                room = min(room, max(0, limit - current) if adding else 0)
+        if not exceeded:
+            return count
+
+        capacity = min([limit for limit in (TASK_MAX_QUEUED_PER_OWNER, TASK_MAX_QUEUED_GLOBAL) if limit], default=0)
+        if TASK_ADMISSION_POLICY == "defer" or (capacity and count > capacity):
+            logger.info(
+                f"Queueing {room} and deferring {count - room} of {count} tasks of user {owner}, "
+                f"limit reached: {', '.join(exceeded)}"
+            )
+            return room
+        raise HTTPException(
+            status_code=429,
+            detail=f"Task limit reached: {', '.join(exceeded)}",
+            headers={"Retry-After": str(TASK_RETRY_AFTER)}
+        )
+
+    def count_queued(self, session, task_ids: list):
+        # Upserts the owner's counter and the global shards of the tasks; the daemon moves them along as tasks run.
+        scopes = Counter(global_scope(task_id) for task_id in task_ids)
+        scopes[str(self.user.ID)] = len(task_ids)
+        statement = insert(TaskQueueStats).values([
+            {"SCOPE": scope, "QUEUED": n, "MODIFIED_AT": self.modified_at} for scope, n in sorted(scopes.items())
+        ])
+        session.execute(statement.on_conflict_do_update(
+            index_elements=[TaskQueueStats.SCOPE],
+            set_={
+                "QUEUED": TaskQueueStats.QUEUED + statement.excluded.QUEUED,
+                "MODIFIED_AT": statement.excluded.MODIFIED_AT
+            }
+        ))
+
+    def enqueue(self, session, task_ids: list):
+        """Count the tasks created NOT_STARTED as queued and wake the daemons."""
+        if task_ids:
+            self.count_queued(session, task_ids)
+            self.notify_task_queue(session, len(task_ids))
+
+    @staticmethod
+    def notify_task_queue(session, count: int):
+        # Delivered to listening daemons when the transaction commits.
+        session.execute(select(func.pg_notify(TASK_QUEUE_CHANNEL, str(count))))
+
     def create(self, taskRequestSchema: TaskRequestSchema):
         response = None
         session = DBConnection().get_session()
         try:
+            queued = self.admit(session, 1)
+            status = TaskStatus.NOT_STARTED.value if queued else TaskStatus.DEFERRED.value
+            self.join_fair_share(session)
             task: Task = Task(
+                ID=uuid.uuid4(),
                 DOCUMENT_IDS=taskRequestSchema.documentIds,
-                STATUS=TaskStatus.NOT_STARTED,
+                # Same shape the daemon reads and updates: {"status", "metadata": [steps]}.
+                STATUS={"status": status, "metadata": []},
+                PRIORITY=self.task_priority(taskRequestSchema),
+                OWNER=self.user.ID,
                 CREATED_AT=self.created_at,
                 MODIFIED_AT=self.modified_at
             )
             session.add(task)
+            self.enqueue(session, [task.ID] if queued else [])
             session.commit()
             response = self.response(task=task)
+        except HTTPException:
+            session.rollback()
+            raise
         except Exception as e:
             session.rollback()
             logger.error(f"Exception in task listing: {e}")
@@ -89,6 +245,86 @@ class TaskService:
             session.close()
         return response
 
+    def bulk_create(self, taskRequestSchemas: List[TaskRequestSchema]):
+        """
+        Create many tasks in one transaction.
+
+        Document ids of every task are validated with one query against the user's projects,
+        rows are inserted with multi-row INSERT statements and the daemons get one notification.
+        Admission control queues the tasks that fit under the limits, in spec order, and
+        defers (or, for a batch that could fit later, rejects) the rest; see ``admit``.
+        Bulk tasks are batch work: they never enter the interactive fast lane.
+
+        Args:
+            taskRequestSchemas (list[TaskRequestSchema]): Task specs.
+
+        Returns:
+            dict: ``taskIds`` of the created tasks in the order of the specs, their ``count``,
+            and how many were ``queued`` now and ``deferred``.
+        """
+        if not taskRequestSchemas:
+            raise Exception("No tasks to create")
+        if len(taskRequestSchemas) > TASK_BULK_MAX:
+            raise Exception(f"At most {TASK_BULK_MAX} tasks can be created at once")
+
+        for position, spec in enumerate(taskRequestSchemas):
+            if not spec.documentIds:
+                raise Exception(f"Task {position} has no document ids")
+        document_ids = {str(document_id) for spec in taskRequestSchemas for document_id in spec.documentIds}
+        try:
+            document_uuids = {uuid.UUID(document_id) for document_id in document_ids}
+        except ValueError as e:
+            raise Exception(f"Invalid document id: {e}")
+
+        session = DBConnection().get_session()
+        try:
+            owned = {
+                str(document_id) for (document_id,) in session.query(Document.ID)
+                .join(Project, Document.PROJECT_ID == Project.ID)
+                .filter(Document.ID.in_(document_uuids), Project.OWNER == self.user.ID)
+            }
+            missing = sorted(document_ids - owned)
+            if missing:
+                raise Exception(f"{len(missing)} documents not found: {', '.join(missing[:10])}")
+
+            queued = self.admit(session, len(taskRequestSchemas))
+            self.join_fair_share(session)
+            rows = [
+                {
+                    "ID": uuid.uuid4(),
+                    "DOCUMENT_IDS": [str(document_id) for document_id in spec.documentIds],
+                    "STATUS": {
+                        "status": TaskStatus.NOT_STARTED.value if position < queued else TaskStatus.DEFERRED.value,
+                        "metadata": []
+                    },
+                    "PRIORITY": max(0, min(spec.priority or 0, TASK_MAX_USER_PRIORITY)),
+                    "OWNER": self.user.ID,
+                    "CREATED_AT": self.created_at,
+                    "MODIFIED_AT": self.modified_at
+                }
+                for position, spec in enumerate(taskRequestSchemas)
+            ]
+            for start in range(0, len(rows), TASK_BULK_INSERT_ROWS):
+                session.execute(insert(Task).values(rows[start:start + TASK_BULK_INSERT_ROWS]))
+            self.enqueue(session, [row["ID"] for row in rows[:queued]])
+            session.commit()
+            response = {
+                "taskIds": [str(row["ID"]) for row in rows],
+                "count": len(rows),
+                "queued": queued,
+                "deferred": len(rows) - queued
+            }
+        except HTTPException:
+            session.rollback()
+            raise
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Exception in bulk task creation: {e}")
+            raise Exception(e)
+        finally:
+            session.close()
+        return response
+
     def get(self, taskId: str):
         response = None
         session = DBConnection().get_session()
@@ -105,10 +341,10 @@ class TaskService:
         return response
 
     def response(self, task: Task):
-        return TaskResponse(
+        return TaskResponse.model_construct(
             taskId=task.ID,
             documentIds=task.DOCUMENT_IDS,
-            status=task.STATUS,
+            status=task.STATUS.get("status") if isinstance(task.STATUS, dict) else task.STATUS,
             output=task.OUTPUT,
             createdTs=task.CREATED_AT,
             modifiedTs=task.MODIFIED_AT
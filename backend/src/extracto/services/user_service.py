@@ -112,7 +112,7 @@ class UserService:
         return response
 
     def response(self, user: User):
-        return UserResponse(
+        return UserResponse.model_construct(
             userId=user.ID,
             firstName=user.FIRST_NAME,
             lastName=user.LAST_NAME,
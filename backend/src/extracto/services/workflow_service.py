@@ -7,7 +7,7 @@ from extracto.db.azure.base import DBConnection
 from extracto.common.storage.s3_file_manager import S3FileManager
 from extracto.common.storage.schema import S3Location
 from extracto.db.model import WorkflowConfig, WorkflowConfig, User
-from extracto.schema.response import DocumentResponse
+from extracto.schema.response import WorkflowResponse
 from extracto.utils.util import get_storage_absolute_path
 from extracto.utils.util import get_unique_number, get_current_datetime
 
@@ -165,7 +165,7 @@ class WorkflowService:
             session.close()
 
     def response(self, workflow: WorkflowConfig):
-        return DocumentResponse(
+        return WorkflowResponse.model_construct(
             workflowId=workflow.ID,
             workflowName=workflow.NAME,
             createdTs=workflow.CREATED_AT,
@@ -1,6 +1,6 @@
 from datetime import datetime, timedelta
+from functools import lru_cache
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 import os
 from fastapi import HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordBearer
@@ -11,17 +11,24 @@ ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 15))
 REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 7))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")  # used by FastAPI Swagger UI
 
 
 # --- Password utils ---
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    # passlib and its bcrypt backend load on the first password hashed or verified.
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 
 # --- Token utils ---
@@ -38,7 +45,7 @@ def create_refresh_token(user_id: str) -> str:
 
 
 def hash_token(token: str) -> str:
-    return pwd_context.hash(token)
+    return get_pwd_context().hash(token)
 
 
 # --- JWT verification ---
@@ -1,10 +1,16 @@
+import hashlib
 import os
 from datetime import datetime
+from decimal import Decimal
 from enum import Enum
-from typing import Any
+from typing import Any, Generator, Optional
 from uuid import uuid4
 
+import orjson
+from fastapi import Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 
 
 class RoleEnum(str, Enum):
@@ -12,11 +18,122 @@ class RoleEnum(str, Enum):
     USER = "User"
 
 
+def json_default(value):
+    """orjson fallback for the types it does not encode natively."""
+    if isinstance(value, BaseModel):
+        # Response models are built with model_construct from ORM rows, their fields are final.
+        return value.__dict__
+    if isinstance(value, (set, tuple)):
+        return list(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class FastJSONResponse(ORJSONResponse):
+    """Default response class of the app: orjson, with response models encoded as they are."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=json_default, option=orjson.OPT_NON_STR_KEYS)
+
+
 class JsonResponse(BaseModel):
     success: bool = False
     error: dict = {}
     result: Any = {}
 
+    def render(self) -> FastJSONResponse:
+        """
+        The envelope as a response, encoded by orjson in one pass.
+
+        Returning a Response skips FastAPI's jsonable_encoder, which would walk (and copy)
+        the whole result before it is encoded.
+        """
+        return FastJSONResponse({"success": self.success, "error": self.error, "result": self.result})
+
+
+class ClosingStreamingResponse(StreamingResponse):
+    """
+    Streaming response that closes the generator its rows come from once the response ends.
+
+    A generator reading a server-side cursor holds its DB session until it is exhausted or
+    closed. Closing it here, whether the body was sent in full, cut short or never started
+    because the client went away, returns the session without waiting for garbage collection.
+    """
+
+    def __init__(self, content, rows: Generator, **kwargs):
+        super().__init__(content, **kwargs)
+        self.rows = rows
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            # The body's thread has returned by now, so the generator is not running.
+            await run_in_threadpool(self.rows.close)
+
+
+def stream_json_envelope(first: Optional[str], rows: Generator[str, None, None], many: bool = True) -> StreamingResponse:
+    """
+    Stream a success envelope around JSON texts built by the database.
+
+    The caller fetches ``first`` itself, so a failing query still becomes an error envelope
+    instead of a broken stream. ``rows`` is closed when the response ends, see
+    ``ClosingStreamingResponse``.
+
+    Args:
+        first (str, optional): First JSON text, None when there are no rows.
+        rows (Generator[str]): The remaining JSON texts.
+        many (bool): Send ``result`` as an array of every row, else as the first row (``{}`` if none).
+
+    Returns:
+        StreamingResponse: The envelope, written row by row.
+    """
+    def body():
+        yield '{"success":true,"error":{},"result":' + ("[" if many else "")
+        if first is not None:
+            yield first
+        if many:
+            for row in rows:
+                yield "," + row
+        else:
+            if first is None:
+                yield "{}"
+            rows.close()
+        yield ("]" if many else "") + "}"
+
+    return ClosingStreamingResponse(body(), rows, media_type="application/json")
+
+
+# Listings change at any time: clients keep them but revalidate with If-None-Match.
+REVALIDATE = "private, no-cache"
+# Finished tasks never change again.
+IMMUTABLE = "private, max-age=31536000, immutable"
+
+
+def weak_etag(*parts) -> str:
+    """Weak ETag of the values a response is derived from (ids, counts, MODIFIED_AT maxima)."""
+    return f'W/"{hashlib.sha1(repr(parts).encode()).hexdigest()[:20]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison of ``etag`` with the request's If-None-Match header."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def with_etag(response: Response, etag: str, cache_control: str = REVALIDATE) -> Response:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+    return response
+
+
+def not_modified(etag: str, cache_control: str = REVALIDATE) -> Response:
+    return with_etag(Response(status_code=304), etag, cache_control)
+
 
 def get_unique_number():
     return str(uuid4()).lower()
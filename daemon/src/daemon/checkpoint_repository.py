@@ -0,0 +1,40 @@
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from daemon.db.model import Task, TaskCheckpoint
+
+
+class CheckpointRepository:
+
+    @staticmethod
+    def load(session: Session, task: Task) -> dict:
+        checkpoints = (
+            session.query(TaskCheckpoint)
+            .filter(TaskCheckpoint.TASK_ID == task.ID)
+            .all()
+        )
+        return {checkpoint.STEP_KEY: checkpoint.OUTPUT for checkpoint in checkpoints}
+
+    @staticmethod
+    def save(session: Session, task: Task, key: str, output: dict):
+        checkpoint = (
+            session.query(TaskCheckpoint)
+            .filter(TaskCheckpoint.TASK_ID == task.ID, TaskCheckpoint.STEP_KEY == key)
+            .first()
+        )
+        if checkpoint is None:
+            checkpoint = TaskCheckpoint(TASK_ID=task.ID, STEP_KEY=key)
+            session.add(checkpoint)
+        checkpoint.OUTPUT = output
+        checkpoint.CREATED_AT = datetime.utcnow()
+        # Committed right away so the step survives a failure of any later step.
+        session.commit()
+
+    @staticmethod
+    def clear(session: Session, task: Task):
+        (
+            session.query(TaskCheckpoint)
+            .filter(TaskCheckpoint.TASK_ID == task.ID)
+            .delete(synchronize_session=False)
+        )
@@ -0,0 +1,248 @@
+import asyncio
+import atexit
+import base64
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+from daemon.logger.log_utils import Logger
+from daemon.utils.util import data_path
+
+logger = Logger()
+
+OFF = "off"
+RECORD = "record"
+REPLAY = "replay"
+
+CASSETTE_MODE = os.getenv("CASSETTE_MODE", OFF).lower()
+CASSETTE_PATH = data_path(os.getenv("CASSETTE_PATH", "cassettes/daemon.jsonl.gz"))
+# Replayed calls wait their recorded duration times this factor (0 replays without delay).
+CASSETTE_LATENCY_SCALE = float(os.getenv("CASSETTE_LATENCY_SCALE", 1.0))
+
+
+def _key_default(value: Any) -> str:
+    if isinstance(value, (bytes, bytearray)):
+        return f"sha256:{hashlib.sha256(value).hexdigest()}"
+    return str(value)
+
+
+def request_key(*parts: Any) -> str:
+    """Stable key of a request from its JSON-serialisable parts; bytes are hashed."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(json.dumps(part, sort_keys=True, default=_key_default).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, (bytes, bytearray)):
+        return {"__bytes__": base64.b64encode(value).decode("ascii")}
+    return value
+
+
+def _decode(value: Any) -> Any:
+    if isinstance(value, dict) and set(value) == {"__bytes__"}:
+        return base64.b64decode(value["__bytes__"])
+    return value
+
+
+class Cassette:
+    def __init__(
+        self,
+        path: str = CASSETTE_PATH,
+        mode: str = CASSETTE_MODE,
+        latency_scale: float = CASSETTE_LATENCY_SCALE
+    ):
+        """
+        Record/replay archive of external calls (LLM completions, S3 operations).
+
+        Interactions are kept as gzipped JSONL, one ``{"kind", "key", "response", "error",
+        "elapsed"}`` line per call. Identical requests replay their recordings in order.
+        Recordings are appended to the archive by ``save``, so memory only holds the calls
+        recorded since the last save.
+
+        Args:
+            path (str): Archive location. Defaults to CASSETTE_PATH env var or
+                ``cassettes/daemon.jsonl.gz``, under DAEMON_DATA_DIR when relative.
+            mode (str): ``off``, ``record`` or ``replay``. Defaults to CASSETTE_MODE env var.
+            latency_scale (float): Factor applied to recorded durations on replay.
+        """
+        if mode not in (OFF, RECORD, REPLAY):
+            raise ValueError(f"Unknown cassette mode '{mode}'")
+        self.path = Path(path)
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self._entries = []
+        self._saved = False
+        self._recorded = defaultdict(deque)
+        self._lock = threading.Lock()
+
+        if mode == REPLAY:
+            self.load()
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != OFF
+
+    def load(self):
+        if not self.path.exists():
+            raise FileNotFoundError(f"Cassette not found: {self.path}")
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as fp:
+                for line in fp:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._recorded[(entry["kind"], entry["key"])].append(entry)
+        except EOFError:
+            # A recording stopped in the middle of an append; the complete lines are kept.
+            logger.warning(f"Cassette {self.path} ends in a truncated append")
+        logger.info(f"Loaded {sum(len(v) for v in self._recorded.values())} recorded calls from {self.path}")
+
+    def save(self):
+        """
+        Append the calls recorded since the previous save, as one more gzip member.
+
+        The first save of a recording run replaces the archive; each later save writes only
+        the new calls, so saving after every task costs the size of that task's calls.
+        """
+        with self._lock:
+            entries, self._entries = self._entries, []
+            if not entries and self._saved:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with gzip.open(self.path, "at" if self._saved else "wt", encoding="utf-8") as fp:
+                for entry in entries:
+                    fp.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            self._saved = True
+
+    def record(self, kind: str, key: str, response: Any = None, error: str = None, elapsed: float = 0.0):
+        entry = {
+            "kind": kind,
+            "key": key,
+            "response": _encode(response),
+            "error": error,
+            "elapsed": round(elapsed, 4)
+        }
+        with self._lock:
+            self._entries.append(entry)
+
+    def next(self, kind: str, key: str) -> dict:
+        with self._lock:
+            recorded = self._recorded.get((kind, key))
+            if not recorded:
+                raise Exception(f"No recorded {kind} call for key {key} in {self.path}")
+            # The last recording keeps answering once a key's recordings are used up.
+            return recorded.popleft() if len(recorded) > 1 else recorded[0]
+
+    def replay_delay(self, entry: dict) -> float:
+        return entry["elapsed"] * self.latency_scale
+
+    def replay_response(self, entry: dict) -> Any:
+        if entry.get("error"):
+            raise Exception(entry["error"])
+        return _decode(entry["response"])
+
+    def call(self, kind: str, key: str, func: Callable[[], Any]) -> Any:
+        """Run a blocking call through the cassette: record it, or replay it with its recorded delay."""
+        if self.mode == REPLAY:
+            entry = self.next(kind, key)
+            time.sleep(self.replay_delay(entry))
+            return self.replay_response(entry)
+
+        started = time.perf_counter()
+        try:
+            response = func()
+        except Exception as e:
+            if self.mode == RECORD:
+                self.record(kind, key, error=str(e), elapsed=time.perf_counter() - started)
+            raise
+        if self.mode == RECORD:
+            self.record(kind, key, response=response, elapsed=time.perf_counter() - started)
+        return response
+
+    async def acall(self, kind: str, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Async variant of :meth:`call`; replay delays do not block the event loop."""
+        if self.mode == REPLAY:
+            entry = self.next(kind, key)
+            await asyncio.sleep(self.replay_delay(entry))
+            return self.replay_response(entry)
+
+        started = time.perf_counter()
+        try:
+            response = await func()
+        except Exception as e:
+            if self.mode == RECORD:
+                self.record(kind, key, error=str(e), elapsed=time.perf_counter() - started)
+            raise
+        if self.mode == RECORD:
+            self.record(kind, key, response=response, elapsed=time.perf_counter() - started)
+        return response
+
+
+_cassette = None
+_cassette_lock = threading.Lock()
+
+
+def get_cassette() -> Cassette:
+    """Process-wide cassette configured from the CASSETTE_* env vars."""
+    global _cassette
+    with _cassette_lock:
+        if _cassette is None:
+            _cassette = Cassette()
+            if _cassette.mode == RECORD:
+                atexit.register(_cassette.save)
+        return _cassette
+
+
+class CassetteS3FileManager:
+    def __init__(self, cassette: Cassette = None, file_manager=None):
+        """
+        S3FileManager wrapper recording or replaying every call through a cassette.
+
+        Used by ingestion to fetch documents stored in S3 (see ``get_file_manager``). In
+        replay mode no S3 client is created, so runs need neither network nor credentials.
+
+        Args:
+            cassette (Cassette): Defaults to the process-wide cassette.
+            file_manager (S3FileManager): Wrapped manager, created on demand when recording.
+        """
+        self.cassette = cassette or get_cassette()
+        self.file_manager = file_manager
+        if self.file_manager is None and self.cassette.mode != REPLAY:
+            from daemon.common.storage.s3_file_manager import S3FileManager
+
+            self.file_manager = S3FileManager()
+
+    def _call(self, method: str, *args, **kwargs):
+        key = request_key(method, list(args), kwargs)
+        return self.cassette.call(
+            "s3", key, lambda: getattr(self.file_manager, method)(*args, **kwargs)
+        )
+
+    def create(self, file_data, remote_path):
+        return self._call("create", file_data, remote_path)
+
+    def read(self, remote_path=None):
+        return self._call("read", remote_path)
+
+    def update(self, remote_path, new_name=None, new_path=None):
+        return self._call("update", remote_path, new_name=new_name, new_path=new_path)
+
+    def delete(self, remote_path):
+        return self._call("delete", remote_path)
+
+
+def get_file_manager():
+    """S3FileManager, wrapped in the cassette when CASSETTE_MODE is ``record`` or ``replay``."""
+    if get_cassette().enabled:
+        return CassetteS3FileManager()
+    from daemon.common.storage.s3_file_manager import S3FileManager
+
+    return S3FileManager()
@@ -1,14 +1,7 @@
-import boto3
-from botocore.exceptions import ClientError
 from daemon.common.config.config_store import ConfigStore
-import os
 import io
 
 
-os.environ['ENV'] = 'PREDEV'
-os.environ['CONF_PATH'] = r'D:\Projects\career\Extracto\backend\resource'
-
-
 class S3FileManager:
     def __init__(self, config_store=None):
         """
@@ -20,13 +13,16 @@ class S3FileManager:
         # Initialize ConfigStore if not provided
         self.config = config_store or ConfigStore()
 
-        # Get AWS credentials (prefer environment variables over config file)
-        self.access_key_id = os.getenv('AWS_ACCESS_KEY_ID', self.config.AWS.AWS_ACCESS_KEY_ID)
-        self.secret_access_key = os.getenv('AWS_SECRET_ACCESS_KEY', self.config.AWS.AWS_SECRET_ACCESS_KEY)
-        self.region = os.getenv('AWS_S3_REGION', self.config.AWS_S3.AWS_S3_REGION)
-        self.bucket = os.getenv('AWS_S3_BUCKET', self.config.AWS_S3.AWS_S3_BUCKET)
+        # Get AWS credentials (environment variables already override the config file in ConfigStore)
+        self.access_key_id = self.config.AWS.AWS_ACCESS_KEY_ID
+        self.secret_access_key = self.config.AWS.AWS_SECRET_ACCESS_KEY
+        self.region = self.config.AWS_S3.AWS_S3_REGION
+        self.bucket = self.config.AWS_S3.AWS_S3_BUCKET
+
+        # Initialize S3 client; boto3 and botocore are imported on first use, to keep imports of the app fast
+        import boto3
+        from botocore.exceptions import ClientError
 
-        # Initialize S3 client
         self.s3_client = boto3.client(
             's3',
             aws_access_key_id=self.access_key_id,
@@ -76,6 +72,8 @@ class S3FileManager:
         # Create a.py file-like object from bytes
         file_obj = io.BytesIO(file_data)
 
+        from botocore.exceptions import ClientError
+
         try:
             self.s3_client.upload_fileobj(
                 Fileobj=file_obj,
@@ -102,6 +100,8 @@ class S3FileManager:
         Raises:
             ClientError: For S3 API errors (e.g., file not found, permissions).
         """
+        from botocore.exceptions import ClientError
+
         try:
             if remote_path:
                 try:
@@ -143,6 +143,8 @@ class S3FileManager:
         if not (new_name or new_path):
             raise ValueError("Either new_name or new_path must be provided")
 
+        from botocore.exceptions import ClientError
+
         try:
             # Verify the source file exists
             self.s3_client.head_object(Bucket=self.bucket, Key=remote_path)
@@ -181,6 +183,8 @@ class S3FileManager:
         Raises:
             ClientError: For S3 API errors (e.g., file not found, permissions).
         """
+        from botocore.exceptions import ClientError
+
         try:
             self.s3_client.delete_object(Bucket=self.bucket, Key=remote_path)
             return True
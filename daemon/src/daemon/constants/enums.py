@@ -6,6 +6,7 @@ class TaskStatus(str, Enum):
     IN_PROGRESS = "IN_PROGRESS"
     SUCCESS = "SUCCESS"
     FAILURE = "FAILURE"
+    DEFERRED = "DEFERRED"
 
 
 class StepMethod(str, Enum):
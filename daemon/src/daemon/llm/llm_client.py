@@ -1,25 +1,65 @@
+import json
 import os
+from typing import Any, Callable
 
-from langchain_openai import ChatOpenAI
+from langchain_core.language_models import BaseChatModel
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 
+from daemon.llm.streaming import IncrementalJSONParser
+from daemon.logger.log_utils import Logger
+from daemon.utils.util import extract_json, schema_errors
+
+logger = Logger()
+
+# Follow-up requests allowed when an extraction does not parse or match its schema.
+MAX_REASKS = int(os.getenv("LLM_MAX_REASKS", 1))
+
+
+def is_error_result(result: Any) -> bool:
+    """Whether an extraction is the error envelope ``validate`` returns instead of the output."""
+    return isinstance(result, dict) and "error" in result and "raw_response" in result
+
 
 class LLMClient:
     def __init__(
         self,
-        api_key: str = os.getenv("API_KEY"),
+        api_key: str = None,
         model: str = "gpt-4o-mini",
-        temperature: float = 0
+        temperature: float = 0,
+        max_reasks: int = MAX_REASKS,
+        llm: BaseChatModel = None,
+        identity: str = None
     ):
-        self.llm = ChatOpenAI(
-            api_key=api_key,
-            model=model,
-            temperature=temperature
-        )
+        """
+        Extraction and summarisation chains over a LangChain chat model.
 
-    async def extract(self, text: str, schema: dict) -> dict:
-        prompt = ChatPromptTemplate.from_messages([
+        Args:
+            api_key (str): OpenAI API key. Defaults to the API_KEY env var at construction time.
+            model (str): OpenAI model name, used when no ``llm`` is given.
+            temperature (float): Sampling temperature, used when no ``llm`` is given.
+            max_reasks (int): Follow-up requests allowed for invalid extractions.
+            llm (BaseChatModel): Chat model to use instead of a hosted OpenAI one, see
+                ``daemon.llm.providers``.
+            identity (str): Provider and model the outputs come from, keying caches of them.
+                Defaults to the OpenAI model and temperature when no ``llm`` is given.
+        """
+        self.max_reasks = max_reasks
+        self.identity = identity or (f"openai:{model}:{temperature}" if llm is None else type(llm).__name__)
+        if llm is None:
+            # Imported on first use: langchain_openai pulls in the openai SDK and tiktoken.
+            from langchain_openai import ChatOpenAI
+
+            llm = ChatOpenAI(
+                api_key=api_key or os.getenv("API_KEY"),
+                model=model,
+                temperature=temperature
+            )
+        self.llm = llm
+
+    @staticmethod
+    def _extract_prompt():
+        return ChatPromptTemplate.from_messages([
             (
                 "system",
                 "You are a strict information extraction engine. "
@@ -31,11 +71,144 @@ class LLMClient:
             )
         ])
 
+    async def extract(self, text: str, schema: dict) -> dict:
+        """
+        Extract JSON matching the schema from the text.
+
+        Returns:
+            dict: The validated extraction (see :meth:`validate`).
+        """
+        chain = self._extract_prompt() | self.llm | StrOutputParser()
+
+        raw = await chain.ainvoke({
+            "schema": schema,
+            "text": text
+        })
+        return await self.validate(raw, schema)
+
+    async def extract_stream(
+        self,
+        text: str,
+        schema: dict,
+        on_field: Callable[[str, Any, dict], None] = None,
+        stop_on_required: bool = True
+    ) -> dict:
+        """
+        Extract like :meth:`extract`, streaming the completion through an incremental JSON parser.
+
+        Args:
+            text (str): Document text.
+            schema (dict): JSON schema of the extraction.
+            on_field (callable): Called with ``(field, value, fields so far)`` as each top-level
+                field closes.
+            stop_on_required (bool): Stop generating once every required field of the schema
+                is filled. Schemas without required fields always run to completion.
+
+        Returns:
+            dict: The validated extraction (see :meth:`validate`).
+        """
+        chain = self._extract_prompt() | self.llm | StrOutputParser()
+        parser = IncrementalJSONParser()
+        required = set(schema.get("required", [])) if stop_on_required else set()
+
+        stream = chain.astream({"schema": schema, "text": text})
+        try:
+            async for chunk in stream:
+                for field, value in parser.feed(chunk):
+                    if on_field:
+                        on_field(field, value, dict(parser.fields))
+                if parser.done or (required and required.issubset(parser.fields)):
+                    break
+        finally:
+            # Closing the stream cancels the rest of the generation.
+            await stream.aclose()
+
+        if not parser.done and required and required.issubset(parser.fields):
+            logger.info(f"Stopped extraction early, required fields {sorted(required)} are filled")
+            raw = json.dumps(parser.fields)
+        else:
+            raw = parser.buffer
+        return await self.validate(raw, schema)
+
+    async def validate(self, raw: str, schema: dict) -> dict:
+        """
+        Parse an extraction and validate it with the cached validator of its schema.
+
+        Invalid output is re-asked with only the previous answer and its validation errors,
+        up to ``max_reasks`` times. When it still fails, an error envelope is returned instead
+        of the output: ``{"raw_response", "error": "invalid_json"}`` when the last answer is
+        not JSON, ``{"raw_response", "error": "schema_validation", "validation_errors"}``
+        when it does not match the schema.
+        """
+        for attempt in range(self.max_reasks + 1):
+            # Reset per attempt, so an earlier answer is never taken for the last one.
+            parsed = None
+            try:
+                parsed = extract_json(raw)
+                errors = schema_errors(parsed, schema)
+            except json.JSONDecodeError as e:
+                errors = [f"$: output is not valid JSON ({e.msg})"]
+
+            if not errors:
+                return parsed
+            logger.warning(f"Extraction failed validation (attempt {attempt + 1}): {errors}")
+            if attempt < self.max_reasks:
+                raw = await self.reask(raw, errors)
+
+        if parsed is None:
+            return {"raw_response": raw, "error": "invalid_json"}
+        return {"raw_response": raw, "error": "schema_validation", "validation_errors": errors}
+
+    async def reask(self, raw: str, errors: list) -> str:
+        prompt = ChatPromptTemplate.from_messages([
+            (
+                "system",
+                "You are a strict information extraction engine. "
+                "Fix the JSON below so the listed validation errors are resolved. "
+                "Return ONLY the corrected JSON."
+            ),
+            (
+                "human",
+                "JSON:\n{output}\n\nValidation errors:\n{errors}"
+            )
+        ])
+
+        chain = prompt | self.llm | StrOutputParser()
+
+        return await chain.ainvoke({"output": raw, "errors": "\n".join(errors)})
+
+    async def extract_batch(self, documents: dict, schema: dict) -> str:
+        """
+        Extract several short documents against the same schema in one request.
+
+        Args:
+            documents (dict): Document text keyed by document key.
+            schema (dict): JSON schema every document result must match.
+
+        Returns:
+            str: Raw model output, expected to be a JSON array of ``{"key", "data"}`` objects.
+        """
+        prompt = ChatPromptTemplate.from_messages([
+            (
+                "system",
+                "You are a strict information extraction engine. "
+                "Extract every document independently. Return ONLY a valid JSON array with "
+                "one object per document: {{\"key\": <document key>, \"data\": <JSON strictly "
+                "matching the provided schema>}}."
+            ),
+            (
+                "human",
+                "Schema:\n{schema}\n\n{documents}"
+            )
+        ])
+
         chain = prompt | self.llm | StrOutputParser()
 
         return await chain.ainvoke({
             "schema": schema,
-            "text": text
+            "documents": "\n\n".join(
+                f"<document key=\"{key}\">\n{text}\n</document>" for key, text in documents.items()
+            )
         })
 
     async def summarize(self, text: str, style: str = "concise") -> str:
@@ -53,3 +226,39 @@ class LLMClient:
         chain = prompt | self.llm | StrOutputParser()
 
         return await chain.ainvoke({"text": text})
+
+    async def summarize_section(self, text: str) -> str:
+        """Summary of one section, meant to be combined with others by :meth:`reduce_summaries`."""
+        prompt = ChatPromptTemplate.from_messages([
+            (
+                "system",
+                "Summarize this section of a longer document. Keep every fact, figure, name and "
+                "date needed to summarize the whole document later. Do not add an introduction."
+            ),
+            ("human", "{text}")
+        ])
+
+        chain = prompt | self.llm | StrOutputParser()
+
+        return await chain.ainvoke({"text": text})
+
+    async def reduce_summaries(self, summaries: list, style: str = "concise") -> str:
+        """Combine section summaries, in document order, into one summary of the given style."""
+        system_prompt = (
+            "Combine the section summaries of a document into one concise, factual summary."
+            if style == "concise"
+            else "Combine the section summaries of a document into one detailed, structured summary."
+        )
+
+        prompt = ChatPromptTemplate.from_messages([
+            ("system", system_prompt),
+            ("human", "{summaries}")
+        ])
+
+        chain = prompt | self.llm | StrOutputParser()
+
+        return await chain.ainvoke({
+            "summaries": "\n\n".join(
+                f"Section {position}:\n{summary}" for position, summary in enumerate(summaries, start=1)
+            )
+        })
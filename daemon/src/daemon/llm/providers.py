@@ -0,0 +1,240 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import ConfigDict
+
+from daemon.common.cassette import RECORD, REPLAY, Cassette, get_cassette, request_key
+from daemon.llm.llm_client import LLMClient
+from daemon.logger.log_utils import Logger
+from daemon.utils.util import data_path
+
+logger = Logger()
+
+DEFAULT_PROVIDER = os.getenv("LLM_PROVIDER", "openai")
+DEFAULT_MODEL = os.getenv("LLM_MODEL", "gpt-4o-mini")
+LOCAL_LLM_BASE_URL = os.getenv("LOCAL_LLM_BASE_URL", "http://localhost:8000/v1")
+LOCAL_LLM_MODEL = os.getenv("LOCAL_LLM_MODEL", "local-model")
+LLM_FIXTURE_PATH = data_path(os.getenv("LLM_FIXTURE_PATH", "fixtures/llm_responses.json"))
+# Connections per endpoint of the shared HTTP client pool.
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", 20))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", 120))
+
+
+def prompt_key(messages: List[BaseMessage]) -> str:
+    """Stable key of a prompt: sha256 over the role and content of every message."""
+    digest = hashlib.sha256()
+    for message in messages:
+        digest.update(message.type.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(str(message.content).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class FixtureChatModel(BaseChatModel):
+    """
+    Deterministic chat model answering from canned responses, for benchmarks and offline runs.
+
+    Responses are looked up by :func:`prompt_key`; prompts without a response get ``default``,
+    or raise when there is none. ``latency`` (seconds) simulates the round-trip of a hosted model.
+    """
+
+    responses: Dict[str, str] = {}
+    default: Optional[str] = None
+    latency: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fixture"
+
+    def _respond(self, messages: List[BaseMessage]) -> ChatResult:
+        key = prompt_key(messages)
+        text = self.responses.get(key, self.default)
+        if text is None:
+            raise Exception(f"No fixture response for prompt {key}")
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if self.latency:
+            threading.Event().wait(self.latency)
+        return self._respond(messages)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._respond(messages)
+
+
+class CassetteChatModel(BaseChatModel):
+    """
+    Chat model wrapper recording completions (with their duration) to a cassette, or replaying them.
+
+    Completions are keyed by ``source`` (the provider config) and :func:`prompt_key`. Replayed
+    ones wait the recorded duration scaled by the cassette's latency factor; no wrapped
+    ``model`` is needed then.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    model: Optional[BaseChatModel] = None
+    cassette: Cassette
+    source: str
+
+    @property
+    def _llm_type(self) -> str:
+        return "cassette"
+
+    def _key(self, messages: List[BaseMessage]) -> str:
+        return request_key(self.source, prompt_key(messages))
+
+    @staticmethod
+    def _result(text: str) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        return self._result(self.cassette.call(
+            "llm", self._key(messages), lambda: self.model.invoke(messages, stop=stop).content
+        ))
+
+    async def _agenerate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        async def complete():
+            return (await self.model.ainvoke(messages, stop=stop)).content
+
+        return self._result(await self.cassette.acall("llm", self._key(messages), complete))
+
+
+def load_fixture_responses(path: str) -> dict:
+    """Read a fixture file: ``{"responses": {<prompt key>: <text>}, "default": <text>}``."""
+    if not os.path.exists(path):
+        logger.warning(f"LLM fixture file {path} not found, only the default response is available")
+        return {}
+    with open(path, "r", encoding="utf-8") as fp:
+        return json.load(fp)
+
+
+# Async HTTP clients shared by every chat model talking to the same endpoint.
+_http_clients: Dict[str, httpx.AsyncClient] = {}
+_http_clients_lock = threading.Lock()
+
+
+def get_http_client(base_url: str = None) -> httpx.AsyncClient:
+    key = base_url or "openai"
+    with _http_clients_lock:
+        if key not in _http_clients:
+            _http_clients[key] = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=LLM_MAX_CONNECTIONS,
+                    max_keepalive_connections=LLM_MAX_CONNECTIONS
+                ),
+                timeout=LLM_TIMEOUT
+            )
+        return _http_clients[key]
+
+
+async def close_http_clients():
+    with _http_clients_lock:
+        clients = list(_http_clients.values())
+        _http_clients.clear()
+    for client in clients:
+        await client.aclose()
+
+
+def _openai_model(config: dict) -> BaseChatModel:
+    # Imported on first use: langchain_openai pulls in the openai SDK and tiktoken.
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(
+        api_key=config.get("api_key") or os.getenv("API_KEY"),
+        model=config.get("model", DEFAULT_MODEL),
+        temperature=config.get("temperature", 0),
+        http_async_client=get_http_client()
+    )
+
+
+def _local_model(config: dict) -> BaseChatModel:
+    # Any OpenAI-compatible server (vLLM, llama.cpp server, Ollama, LM Studio).
+    from langchain_openai import ChatOpenAI
+
+    base_url = config.get("base_url", LOCAL_LLM_BASE_URL)
+    return ChatOpenAI(
+        base_url=base_url,
+        api_key=config.get("api_key") or os.getenv("LOCAL_LLM_API_KEY", "local"),
+        model=config.get("model", LOCAL_LLM_MODEL),
+        temperature=config.get("temperature", 0),
+        http_async_client=get_http_client(base_url)
+    )
+
+
+def _fixture_model(config: dict) -> BaseChatModel:
+    fixtures = load_fixture_responses(data_path(config.get("path", LLM_FIXTURE_PATH)))
+    return FixtureChatModel(
+        responses=fixtures.get("responses", {}),
+        default=config.get("default", fixtures.get("default")),
+        latency=float(config.get("latency", 0))
+    )
+
+
+PROVIDERS: Dict[str, Callable[[dict], BaseChatModel]] = {
+    "openai": _openai_model,
+    "local": _local_model,
+    "fixture": _fixture_model,
+}
+
+
+def register_provider(name: str, factory: Callable[[dict], BaseChatModel]):
+    """Register a chat model factory, selectable with ``{"llm": {"provider": name}}`` in a step config."""
+    PROVIDERS[name] = factory
+
+
+_clients: Dict[str, LLMClient] = {}
+_clients_lock = threading.Lock()
+
+
+def _client_key(config: Dict[str, Any]) -> str:
+    return json.dumps(config, sort_keys=True, default=str)
+
+
+def get_llm_client(config: dict = None) -> LLMClient:
+    """
+    Shared LLM client for a provider config, built once per process.
+
+    Args:
+        config (dict): ``provider`` (openai|local|fixture or a registered name) plus the provider
+            options (``model``, ``temperature``, ``base_url``, ``api_key``, ``path``, ``default``,
+            ``latency``, ``max_reasks``). Defaults to the LLM_PROVIDER env var.
+
+    Returns:
+        LLMClient: The pooled client; processors with the same config share it. With CASSETTE_MODE
+        set its completions are recorded to, or replayed from, the process-wide cassette.
+    """
+    config = dict(config or {})
+    config.setdefault("provider", DEFAULT_PROVIDER)
+    key = _client_key(config)
+
+    with _clients_lock:
+        if key not in _clients:
+            factory = PROVIDERS.get(config["provider"])
+            if factory is None:
+                raise ValueError(f"Unknown LLM provider '{config['provider']}'")
+            kwargs = {"max_reasks": int(config["max_reasks"])} if "max_reasks" in config else {}
+            cassette = get_cassette()
+            # Outputs are cached per provider config; replayed ones are kept apart from live ones.
+            identity = _client_key({name: value for name, value in config.items() if name != "api_key"})
+            if cassette.mode == REPLAY:
+                llm = CassetteChatModel(cassette=cassette, source=key)
+                identity = f"replay:{identity}"
+            elif cassette.mode == RECORD:
+                llm = CassetteChatModel(model=factory(config), cassette=cassette, source=key)
+            else:
+                llm = factory(config)
+            _clients[key] = LLMClient(llm=llm, identity=identity, **kwargs)
+            logger.info(f"Created {config['provider']} LLM client")
+        return _clients[key]
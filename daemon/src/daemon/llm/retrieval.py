@@ -0,0 +1,135 @@
+import math
+import re
+from collections import Counter
+from typing import List
+
+from daemon.processors.parsed_document import Block
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+_CAMEL_CASE = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    def __init__(self, texts: List[str], k1: float = 1.5, b: float = 0.75):
+        """
+        In-memory Okapi BM25 lexical index.
+
+        Args:
+            texts (list[str]): Indexed passages; search results refer to their positions.
+            k1 (float): Term frequency saturation.
+            b (float): Length normalisation.
+        """
+        self.k1 = k1
+        self.b = b
+        self.term_freqs = [Counter(tokenize(text)) for text in texts]
+        self.lengths = [sum(freqs.values()) for freqs in self.term_freqs]
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+
+        doc_freqs = Counter()
+        for freqs in self.term_freqs:
+            doc_freqs.update(freqs.keys())
+        total = len(texts)
+        self.idf = {
+            term: math.log(1 + (total - freq + 0.5) / (freq + 0.5)) for term, freq in doc_freqs.items()
+        }
+
+    def search(self, query: str, top_k: int) -> List[int]:
+        terms = [term for term in set(tokenize(query)) if term in self.idf]
+        scores = []
+        for position, freqs in enumerate(self.term_freqs):
+            score = 0.0
+            norm = self.k1 * (1 - self.b + self.b * self.lengths[position] / (self.avg_length or 1))
+            for term in terms:
+                freq = freqs.get(term)
+                if freq:
+                    score += self.idf[term] * freq * (self.k1 + 1) / (freq + norm)
+            if score > 0:
+                scores.append((score, position))
+        scores.sort(key=lambda item: (-item[0], item[1]))
+        return [position for _, position in scores[:top_k]]
+
+
+class EmbeddingIndex:
+    def __init__(self, texts: List[str], model_name: str = "all-MiniLM-L6-v2"):
+        """
+        Dense index over a local sentence-transformers model (optional dependency).
+
+        Args:
+            texts (list[str]): Indexed passages; search results refer to their positions.
+            model_name (str): Local sentence-transformers model name or path.
+        """
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            raise ImportError("Embedding retrieval requires the 'sentence-transformers' package.")
+
+        self.model = _get_embedding_model(model_name, SentenceTransformer)
+        self.vectors = self.model.encode(texts, normalize_embeddings=True)
+
+    def search(self, query: str, top_k: int) -> List[int]:
+        query_vector = self.model.encode([query], normalize_embeddings=True)[0]
+        scores = self.vectors @ query_vector
+        ranked = sorted(range(len(scores)), key=lambda position: -float(scores[position]))
+        return ranked[:top_k]
+
+
+_embedding_models = {}
+
+
+def _get_embedding_model(model_name, model_cls):
+    if model_name not in _embedding_models:
+        _embedding_models[model_name] = model_cls(model_name)
+    return _embedding_models[model_name]
+
+
+def build_index(texts: List[str], method: str = "bm25", model_name: str = None):
+    if method == "bm25":
+        return BM25Index(texts)
+    if method == "embedding":
+        return EmbeddingIndex(texts, model_name) if model_name else EmbeddingIndex(texts)
+    raise ValueError(f"Unknown retrieval method '{method}'")
+
+
+def field_groups(schema: dict, group_size: int) -> List[dict]:
+    """
+    Split the top-level properties of a JSON schema into groups with a retrieval query each.
+
+    The query is built from the field names (snake/camel case split into words) and their
+    descriptions. Schemas without properties form a single group over the whole schema.
+    """
+    properties = schema.get("properties") or {}
+    if not properties:
+        return [{"fields": [], "query": " ".join(tokenize(str(schema))), "schema": schema}]
+
+    names = list(properties)
+    groups = []
+    for start in range(0, len(names), group_size):
+        fields = names[start:start + group_size]
+        words = []
+        for name in fields:
+            words.append(_CAMEL_CASE.sub(" ", name).replace("_", " "))
+            if isinstance(properties[name], dict):
+                words.append(properties[name].get("description", ""))
+                words.append(properties[name].get("title", ""))
+        groups.append({"fields": fields, "query": " ".join(word for word in words if word), "schema": sub_schema(schema, fields)})
+    return groups
+
+
+def sub_schema(schema: dict, fields: List[str]) -> dict:
+    """Copy of an object schema restricted to ``fields``."""
+    restricted = {key: value for key, value in schema.items() if key not in ("properties", "required")}
+    restricted["properties"] = {name: schema["properties"][name] for name in fields}
+    required = [name for name in schema.get("required", []) if name in fields]
+    if required:
+        restricted["required"] = required
+    return restricted
+
+
+def retrieve_blocks(index, blocks: List[Block], query: str, top_k: int) -> List[Block]:
+    """Top-k blocks for the query, returned in reading order so the context stays coherent."""
+    positions = sorted(index.search(query, top_k))
+    return [blocks[position] for position in positions]
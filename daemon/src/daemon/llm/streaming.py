@@ -0,0 +1,113 @@
+from typing import Any, Dict, List, Tuple
+
+from daemon.utils.util import loads_json
+
+_KEY = "key"
+_COLON = "colon"
+_VALUE = "value"
+_COMMA = "comma"
+
+
+class IncrementalJSONParser:
+    def __init__(self):
+        """
+        Incremental parser for a streamed JSON object that reports top-level fields as they close.
+
+        Text before the first ``{`` (prose, code fences) is skipped. Strings, objects and arrays
+        are emitted on their closing character; numbers, booleans and null once the following
+        ``,`` or ``}`` arrives.
+        """
+        self.buffer = ""
+        self.fields: Dict[str, Any] = {}
+        self.done = False
+        self._position = 0
+        self._depth = 0
+        self._started = False
+        self._in_string = False
+        self._escape = False
+        self._state = _KEY
+        self._key = None
+        self._key_start = None
+        self._value_start = None
+
+    @property
+    def text(self) -> str:
+        """The JSON object received so far, without any leading text."""
+        start = self.buffer.find("{")
+        return self.buffer[start:self._position] if start >= 0 else ""
+
+    def _emit(self, end: int, emitted: List[Tuple[str, Any]]):
+        value = loads_json(self.buffer[self._value_start:end].strip())
+        self.fields[self._key] = value
+        emitted.append((self._key, value))
+        self._value_start = None
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """
+        Consume the next chunk of output.
+
+        Returns:
+            list[tuple]: ``(field, value)`` pairs completed by this chunk, in order.
+        """
+        self.buffer += chunk
+        emitted = []
+
+        while self._position < len(self.buffer) and not self.done:
+            index = self._position
+            char = self.buffer[index]
+            self._position += 1
+
+            if not self._started:
+                if char == "{":
+                    self._started = True
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._state == _KEY:
+                        self._key = loads_json(self.buffer[self._key_start:index + 1])
+                        self._state = _COLON
+                    elif self._depth == 1 and self._state == _VALUE:
+                        self._emit(index + 1, emitted)
+                        self._state = _COMMA
+                continue
+
+            if char.isspace():
+                continue
+
+            if char == '"':
+                self._in_string = True
+                if self._depth == 1 and self._state == _KEY:
+                    self._key_start = index
+                elif self._depth == 1 and self._state == _VALUE:
+                    self._value_start = index
+            elif char in "{[":
+                if self._depth == 1 and self._state == _VALUE and self._value_start is None:
+                    self._value_start = index
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 1 and self._state == _VALUE:
+                    self._emit(index + 1, emitted)
+                    self._state = _COMMA
+                elif self._depth == 0:
+                    if self._state == _VALUE and self._value_start is not None:
+                        self._emit(index, emitted)
+                    self.done = True
+            elif self._depth == 1:
+                if char == ":" and self._state == _COLON:
+                    self._state = _VALUE
+                elif char == ",":
+                    if self._state == _VALUE and self._value_start is not None:
+                        self._emit(index, emitted)
+                    self._state = _KEY
+                elif self._state == _VALUE and self._value_start is None:
+                    self._value_start = index
+
+        return emitted
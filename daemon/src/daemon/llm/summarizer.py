@@ -0,0 +1,147 @@
+import asyncio
+import hashlib
+import os
+from pathlib import Path
+from typing import List, Optional
+
+from daemon.llm.llm_client import LLMClient
+from daemon.logger.log_utils import Logger
+from daemon.processors.parsed_document import HEADING, ParsedDocument
+from daemon.utils.util import count_tokens, data_path
+
+logger = Logger()
+
+SUMMARY_CACHE_DIR = data_path(os.getenv("SUMMARY_CACHE_DIR", "cache/summaries"))
+# Token budget of one section summarised in a single call.
+SUMMARY_SECTION_TOKENS = int(os.getenv("SUMMARY_SECTION_TOKENS", 3000))
+SUMMARY_CONCURRENCY = int(os.getenv("SUMMARY_CONCURRENCY", 8))
+# Bump when the section prompt changes, so cached summaries of the old prompt are not reused.
+SECTION_PROMPT_VERSION = "1"
+
+
+def split_sections(documents: List[ParsedDocument], max_tokens: int) -> List[str]:
+    """
+    Split documents into sections at headings, in reading order.
+
+    Sections longer than ``max_tokens`` are cut between blocks. Boundaries only depend on the
+    section's own blocks, so an edit inside one section leaves the others unchanged.
+    """
+    sections = []
+    for document in documents:
+        current, current_tokens = [], 0
+        for block in document.blocks:
+            starts_section = block.type == HEADING and current
+            if starts_section or (current and current_tokens + block.tokens > max_tokens):
+                sections.append("\n\n".join(current))
+                current, current_tokens = [], 0
+            current.append(block.text)
+            current_tokens += block.tokens
+        if current:
+            sections.append("\n\n".join(current))
+    return sections
+
+
+class SummaryCache:
+    def __init__(self, root: str = SUMMARY_CACHE_DIR):
+        """
+        File cache of section summaries keyed by the sha256 of the section text and of the
+        model identity (``LLMClient.identity``), so summaries of one provider or model are
+        never served for another.
+
+        Args:
+            root (str): Directory of the cache. Defaults to SUMMARY_CACHE_DIR env var or
+                ``cache/summaries``, under DAEMON_DATA_DIR when relative.
+        """
+        self.root = Path(root)
+
+    @staticmethod
+    def key(text: str, model: str = "") -> str:
+        return hashlib.sha256(f"{SECTION_PROMPT_VERSION}\0{model}\0{text}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.txt"
+
+    def get(self, text: str, model: str = "") -> Optional[str]:
+        path = self._path(self.key(text, model))
+        return path.read_text(encoding="utf-8") if path.exists() else None
+
+    def set(self, text: str, summary: str, model: str = ""):
+        path = self._path(self.key(text, model))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(summary, encoding="utf-8")
+        os.replace(tmp_path, path)
+
+
+class HierarchicalSummarizer:
+    def __init__(
+        self,
+        llm: LLMClient,
+        cache: SummaryCache = None,
+        section_tokens: int = SUMMARY_SECTION_TOKENS,
+        concurrency: int = SUMMARY_CONCURRENCY
+    ):
+        """
+        Map-reduce summariser: sections are summarised in parallel and cached, then reduced.
+
+        Args:
+            llm (LLMClient): Client used for every call.
+            cache (SummaryCache): Section summary cache.
+            section_tokens (int): Token budget of one section, and of one reduce call.
+            concurrency (int): Section summaries requested at the same time.
+        """
+        self.llm = llm
+        self.cache = cache or SummaryCache()
+        self.section_tokens = section_tokens
+        self.concurrency = concurrency
+
+    async def _summarize_sections(self, sections: List[str]) -> List[str]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        misses = 0
+
+        async def summarize(section):
+            nonlocal misses
+            cached = self.cache.get(section, self.llm.identity)
+            if cached is not None:
+                return cached
+            misses += 1
+            async with semaphore:
+                summary = await self.llm.summarize_section(section)
+            self.cache.set(section, summary, self.llm.identity)
+            return summary
+
+        summaries = await asyncio.gather(*(summarize(section) for section in sections))
+        logger.info(f"Summarized {misses} of {len(sections)} sections, {len(sections) - misses} from cache")
+        return list(summaries)
+
+    def _group(self, summaries: List[str]) -> List[str]:
+        groups, current, current_tokens = [], [], 0
+        for summary in summaries:
+            tokens = count_tokens(summary)
+            if current and current_tokens + tokens > self.section_tokens:
+                groups.append("\n\n".join(current))
+                current, current_tokens = [], 0
+            current.append(summary)
+            current_tokens += tokens
+        if current:
+            groups.append("\n\n".join(current))
+        return groups
+
+    async def summarize(self, documents: List[ParsedDocument], style: str = "concise") -> str:
+        """
+        Summarise documents in the given style.
+
+        Documents within one section budget are summarised in a single call. Otherwise the
+        section summaries are grouped and summarised again until they fit one reduce call.
+        """
+        if sum(document.tokens for document in documents) <= self.section_tokens:
+            return await self.llm.summarize("\n\n".join(document.text for document in documents), style)
+
+        summaries = await self._summarize_sections(split_sections(documents, self.section_tokens))
+        while len(summaries) > 1 and sum(count_tokens(summary) for summary in summaries) > self.section_tokens:
+            groups = self._group(summaries)
+            if len(groups) == len(summaries):
+                break
+            summaries = await self._summarize_sections(groups)
+
+        return await self.llm.reduce_summaries(summaries, style)
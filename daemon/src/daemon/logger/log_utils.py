@@ -1,69 +1,199 @@
+import atexit
+import contextvars
+import json
 import logging
+import multiprocessing
 import os
+import queue
+import random
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+# "json" writes one JSON object per line, "text" the classic single line format.
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+# Share of debug records kept (1 keeps all); sampled before anything is formatted or queued.
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", 1.0))
+# Records waiting for the writer thread; when full, new records are dropped instead of blocking.
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+
+# Ids of the request, task and step being handled, attached to every record logged meanwhile.
+log_context = contextvars.ContextVar("log_context", default={})
+
+_listener = None
+_file_handler = None
+# Queue of the records of worker processes, drained into the same file by the main process.
+_worker_records = None
+_worker_lock = threading.Lock()
+
+
+@contextmanager
+def bind(**fields):
+    """
+    Attach fields (e.g. ``request_id``, ``task_id``, ``step``) to the records logged inside the block.
+
+    Args:
+        **fields: Context fields; ``None`` values are ignored.
+    """
+    token = log_context.set({**log_context.get(), **{k: v for k, v in fields.items() if v is not None}})
+    try:
+        yield
+    finally:
+        log_context.reset(token)
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **getattr(record, "context", {}),
+            **getattr(record, "fields", {})
+        }
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class ContextQueueHandler(QueueHandler):
+    """Queues records with their context captured on the logging thread, where the context lives."""
+
+    def prepare(self, record):
+        record.context = log_context.get()
+        # The message is rendered here; args may not be safe to touch from the writer thread.
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+
+def _start(logger, log_path, log_level):
+    global _listener, _file_handler
+    if LOG_FORMAT == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        )
+
+    # Create rotating file handler (max 5MB per file, keep 5 backups), written by the listener thread
+    file_handler = RotatingFileHandler(
+        log_path,
+        maxBytes=5 * 1024 * 1024,  # 5MB
+        backupCount=5
+    )
+    file_handler.setFormatter(formatter)
+    file_handler.setLevel(log_level)
+
+    records = queue.Queue(LOG_QUEUE_SIZE)
+    logger.addHandler(ContextQueueHandler(records))
+    logger.propagate = False
+    _file_handler = file_handler
+    _listener = QueueListener(records, file_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+def worker_queue():
+    """
+    Queue for the records of spawned worker processes, passed to them with ``init_worker``.
+
+    Only the main process writes the log file: rotating it from several processes at once
+    loses lines. A listener thread here drains the queue into the same file handler.
+    """
+    global _worker_records
+    with _worker_lock:
+        if _worker_records is None:
+            if _file_handler is None:
+                Logger()
+            _worker_records = multiprocessing.get_context("spawn").Queue(LOG_QUEUE_SIZE)
+            listener = QueueListener(_worker_records, _file_handler, respect_handler_level=True)
+            listener.start()
+            atexit.register(listener.stop)
+        return _worker_records
+
+
+def init_worker(records, log_level):
+    """Process pool initializer: records of the worker go to the main process through ``records``."""
+    logger = logging.getLogger('ExtractoLogger')
+    logger.handlers.clear()
+    logger.setLevel(log_level)
+    logger.addHandler(ContextQueueHandler(records))
+    logger.propagate = False
 
 
 class Logger:
-    def __init__(self, log_path=None, default_log_path='logs/daemon.log', log_level=logging.INFO):
+    def __init__(self, log_path=None, default_log_path='logs/daemon.log', log_level=None):
         """
-        Initialize the logger with a.py file handler based on LOG_PATH environment variable.
+        Initialize the logger with a file handler based on LOG_PATH environment variable.
+
+        Records are put on a queue and written by a background listener thread, so logging
+        from a request handler never waits on the disk.
 
         Args:
             log_path (str, optional): Path to the log file. Defaults to LOG_PATH env var or default_log_path.
             default_log_path (str): Fallback log file path if LOG_PATH is not set.
-            log_level (int): Logging level (e.g., logging.INFO, logging.DEBUG).
+            log_level (int, optional): Logging level. Defaults to LOG_LEVEL env var.
         """
         # Determine log file path from environment variable or default
         self.log_path = os.getenv('LOG_PATH', default_log_path) if log_path is None else log_path
-
-        # Ensure the log directory exists
-        log_dir = Path(self.log_path).parent
-        log_dir.mkdir(parents=True, exist_ok=True)
+        log_level = log_level or logging.getLevelName(LOG_LEVEL.upper())
 
         # Create logger
         self.logger = logging.getLogger('ExtractoLogger')
-        self.logger.setLevel(log_level)
-
-        # Avoid adding multiple handlers if logger is already configured
-        if not self.logger.handlers:
-            # Create formatter
-            formatter = logging.Formatter(
-                '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-                datefmt='%Y-%m-%d %H:%M:%S'
-            )
-
-            # Create rotating file handler (max 5MB per file, keep 5 backups)
-            file_handler = RotatingFileHandler(
-                self.log_path,
-                maxBytes=5 * 1024 * 1024,  # 5MB
-                backupCount=5
-            )
-            file_handler.setFormatter(formatter)
-            file_handler.setLevel(log_level)
-
-            # Add handler to logger
-            self.logger.addHandler(file_handler)
-
-    def debug(self, message):
-        """Log a.py debug message."""
-        self.logger.debug(message)
-
-    def info(self, message):
-        """Log an info message."""
-        self.logger.info(message)
-
-    def warning(self, message):
-        """Log a.py warning message."""
-        self.logger.warning(message)
-
-    def error(self, message):
+
+        # The first Logger of the main process sets up the queue and its listener; the others
+        # share them. Worker processes log through ``init_worker`` instead of opening the file.
+        if not self.logger.handlers and multiprocessing.parent_process() is None:
+            Path(self.log_path).parent.mkdir(parents=True, exist_ok=True)
+            self.logger.setLevel(log_level)
+            _start(self.logger, self.log_path, log_level)
+
+    def _log(self, level, message, args, fields):
+        exc_info = fields.pop("exc_info", None)
+        self.logger.log(level, message, *args, exc_info=exc_info, extra={"fields": fields} if fields else None)
+
+    def debug(self, message, *args, **fields):
+        """
+        Log a debug message, for hot paths.
+
+        Level gated and sampled (LOG_DEBUG_SAMPLE_RATE) before the message is formatted;
+        pass values as ``args`` (``%s`` style) so disabled records cost no formatting.
+        """
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
+        if LOG_DEBUG_SAMPLE_RATE < 1 and random.random() >= LOG_DEBUG_SAMPLE_RATE:
+            return
+        self._log(logging.DEBUG, message, args, fields)
+
+    def info(self, message, *args, **fields):
+        """Log an info message; keyword arguments become fields of the JSON record."""
+        self._log(logging.INFO, message, args, fields)
+
+    def warning(self, message, *args, **fields):
+        """Log a warning message."""
+        self._log(logging.WARNING, message, args, fields)
+
+    def error(self, message, *args, **fields):
         """Log an error message."""
-        self.logger.error(message)
+        self._log(logging.ERROR, message, args, fields)
 
-    def critical(self, message):
-        """Log a.py critical message."""
-        self.logger.critical(message)
+    def critical(self, message, *args, **fields):
+        """Log a critical message."""
+        self._log(logging.CRITICAL, message, args, fields)
 
 
 # Example usage (for testing, can be removed in production)
@@ -71,4 +201,4 @@ class Logger:
 #     logger = Logger()
 #     logger.info("Logger initialized successfully")
 #     logger.debug("This is a.py debug message")
-#     logger.error("This is an error message")
\ No newline at end of file
+#     logger.error("This is an error message")
@@ -1,12 +1,43 @@
 import asyncio
+import os
+import signal
+
+from daemon.utils.startup import StartupTimer
+
+startup = StartupTimer()
 
 from daemon.worker import ExtractoWorker
 from daemon.logger.log_utils import Logger
 
 logger = Logger()
+startup.mark("imports")
+
+
+def stop(signum, frame):
+    # SIGTERM (docker stop) unwinds like Ctrl+C, so the cleanup on the way out runs.
+    raise SystemExit(0)
 
 
 if __name__ == "__main__":
     logger.info("Starting Extracto Daemon...")
+
+    # Load the Docling models before the first task is claimed instead of inside it.
+    if os.getenv("PARSER_WARMUP", "true").lower() == "true":
+        from daemon.processors.converter_registry import warm_up
+
+        warm_up(ocr=os.getenv("PARSER_WARMUP_OCR", "true").lower() == "true")
+        logger.info("Parser models warmed up, daemon is ready.")
+        startup.mark("parser warm-up")
+
+    logger.info(startup.report())
+
+    signal.signal(signal.SIGTERM, stop)
+
     worker = ExtractoWorker()
-    asyncio.run(worker.run_forever())
+    try:
+        asyncio.run(worker.run_forever())
+    finally:
+        from daemon.processors.parse import shutdown_page_range_pool
+
+        shutdown_page_range_pool()
+        logger.info("Extracto Daemon stopped.")
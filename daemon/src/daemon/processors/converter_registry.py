@@ -0,0 +1,87 @@
+import os
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from daemon.logger.log_utils import Logger
+
+if TYPE_CHECKING:
+    from docling.document_converter import DocumentConverter
+
+logger = Logger()
+
+# Docling (and the torch stack under it) is imported by the first converter built, not with
+# this module, so importing the daemon stays fast.
+ALLOWED_FORMATS = ["pdf", "docx", "pptx", "md"]
+
+# Process-wide converters keyed by their pipeline options. Building a converter is cheap,
+# but each one loads its own layout/OCR models on first use, so they must be shared.
+_converters = {}
+_lock = threading.Lock()
+_ready = threading.Event()
+
+
+def _options_key(**pipeline_options) -> tuple:
+    return tuple(sorted(pipeline_options.items()))
+
+
+def get_converter(do_ocr: bool = False, do_table_structure: bool = True) -> "DocumentConverter":
+    """
+    Return the process-wide converter for the given PDF pipeline options, building it once.
+
+    Args:
+        do_ocr (bool): Run OCR on PDF pages.
+        do_table_structure (bool): Run the table structure model.
+
+    Returns:
+        DocumentConverter: Converter shared by every parser of this process.
+    """
+    key = _options_key(do_ocr=do_ocr, do_table_structure=do_table_structure)
+    converter = _converters.get(key)
+    if converter is not None:
+        return converter
+
+    with _lock:
+        if key not in _converters:
+            from docling.datamodel.base_models import InputFormat
+            from docling.datamodel.pipeline_options import PdfPipelineOptions
+            from docling.document_converter import DocumentConverter, PdfFormatOption
+
+            pdf_options = PdfPipelineOptions(
+                do_ocr=do_ocr,
+                do_table_structure=do_table_structure,
+                generate_picture_images=False
+            )
+            _converters[key] = DocumentConverter(
+                allowed_formats=[InputFormat(value) for value in ALLOWED_FORMATS],
+                format_options={InputFormat.PDF: PdfFormatOption(pipeline_options=pdf_options)}
+            )
+        return _converters[key]
+
+
+def warm_up(ocr: bool = True):
+    """
+    Eagerly load the PDF pipeline models of the text-layer and (optionally) OCR converters.
+
+    Marks the registry as ready and, when ``DAEMON_READY_FILE`` is set, touches that file
+    so container readiness probes can watch it.
+    """
+    from docling.datamodel.base_models import InputFormat
+
+    for do_ocr in ([False, True] if ocr else [False]):
+        get_converter(do_ocr=do_ocr).initialize_pipeline(InputFormat.PDF)
+        logger.info(f"Docling PDF pipeline loaded (do_ocr={do_ocr}).")
+
+    _ready.set()
+    ready_file = os.getenv("DAEMON_READY_FILE")
+    if ready_file:
+        Path(ready_file).parent.mkdir(parents=True, exist_ok=True)
+        Path(ready_file).touch()
+
+
+def is_ready() -> bool:
+    return _ready.is_set()
+
+
+def wait_until_ready(timeout: float = None) -> bool:
+    return _ready.wait(timeout)
@@ -1,25 +1,248 @@
-from daemon.constants.enums import StepMethod
-from daemon.status_utils import start_step, complete_step, fail_step
-from daemon.llm.llm_client import LLMClient
+import asyncio
+import json
+import os
+from typing import Callable, Dict, List
+
+from daemon.llm.llm_client import LLMClient, is_error_result
+from daemon.llm.providers import get_llm_client
+from daemon.llm.retrieval import build_index, field_groups, retrieve_blocks
+from daemon.logger.log_utils import Logger
+from daemon.processors.parsed_document import ParsedDocument
+from daemon.utils.util import extract_json, schema_errors
+
+logger = Logger()
+
+# Defaults of the optional ``retrieval`` section of the extracting step config.
+RETRIEVAL_TOP_K = int(os.getenv("EXTRACT_RETRIEVAL_TOP_K", 8))
+RETRIEVAL_GROUP_SIZE = int(os.getenv("EXTRACT_RETRIEVAL_GROUP_SIZE", 4))
+# Documents under this many tokens are sent whole; retrieval would not save anything.
+RETRIEVAL_MIN_TOKENS = int(os.getenv("EXTRACT_RETRIEVAL_MIN_TOKENS", 4000))
+
+# Defaults of the optional ``batching`` section, used when extracting per document.
+BATCH_MAX_DOCUMENTS = int(os.getenv("EXTRACT_BATCH_MAX_DOCUMENTS", 10))
+BATCH_MAX_TOKENS = int(os.getenv("EXTRACT_BATCH_MAX_TOKENS", 6000))
+BATCH_MAX_DOCUMENT_TOKENS = int(os.getenv("EXTRACT_BATCH_MAX_DOCUMENT_TOKENS", 1000))
+
+
+def document_key(document: ParsedDocument, position: int) -> str:
+    return document.documentId or f"document-{position}"
+
+
+def plan_batches(documents: List[ParsedDocument], batching: dict) -> tuple:
+    """
+    Pack short documents into batches bounded by document count and total tokens.
+
+    Returns:
+        tuple: ``(batches, singles)`` — lists of ``(key, document)`` pairs per batch, and the
+        pairs too long to batch.
+    """
+    max_documents = int(batching.get("max_documents", BATCH_MAX_DOCUMENTS))
+    max_tokens = int(batching.get("max_tokens", BATCH_MAX_TOKENS))
+    max_document_tokens = int(batching.get("max_document_tokens", BATCH_MAX_DOCUMENT_TOKENS))
+
+    batches, singles = [], []
+    current, current_tokens = [], 0
+    for position, document in enumerate(documents):
+        entry = (document_key(document, position), document)
+        if document.tokens > max_document_tokens:
+            singles.append(entry)
+            continue
+        if current and (len(current) >= max_documents or current_tokens + document.tokens > max_tokens):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(entry)
+        current_tokens += document.tokens
+    if current:
+        batches.append(current)
+
+    # A batch of one document is just an individual call.
+    singles.extend(batch[0] for batch in batches if len(batch) == 1)
+    return [batch for batch in batches if len(batch) > 1], singles
+
+
+def split_batch_result(raw: str, keys: List[str], schema: dict) -> Dict[str, dict]:
+    """
+    Split a batched extraction into per-document results, keeping only those matching the schema.
+
+    Unknown keys, duplicates and invalid entries are dropped so the caller retries them alone.
+    """
+    try:
+        entries = extract_json(raw)
+    except json.JSONDecodeError:
+        return {}
+
+    results = {}
+    for entry in entries if isinstance(entries, list) else []:
+        if not isinstance(entry, dict):
+            continue
+        key = str(entry.get("key"))
+        if key not in keys or key in results:
+            continue
+        errors = schema_errors(entry.get("data"), schema)
+        if errors:
+            logger.warning(f"Batched result of {key} failed validation: {errors}")
+            continue
+        results[key] = entry["data"]
+    return results
 
 
 class ExtractingProcessor:
     def __init__(self):
-        self.llm = LLMClient()
+        # Clients come from the shared pool, so every processor reuses the same connections.
+        self.llm = get_llm_client()
+
+    async def _extract_with_retrieval(
+        self, llm: LLMClient, documents: List[ParsedDocument], schema: dict, retrieval: dict
+    ) -> dict:
+        """
+        Extract each group of schema fields from only the blocks most relevant to it.
+
+        Blocks of every document are indexed together, the top-k blocks per field group are
+        sent to the LLM with the matching part of the schema, and the partial results merged.
+        A group whose retrieved blocks give no valid result is extracted again from the full
+        text. The merged result is validated against the whole schema; when a group still
+        fails, or the merged result does not match, an error envelope is returned instead.
+        """
+        blocks = [block for document in documents for block in document.blocks]
+        index = build_index(
+            [block.text for block in blocks],
+            method=retrieval.get("method", "bm25"),
+            model_name=retrieval.get("model")
+        )
+        top_k = int(retrieval.get("top_k", RETRIEVAL_TOP_K))
+        groups = field_groups(schema, int(retrieval.get("group_size", RETRIEVAL_GROUP_SIZE)))
+
+        async def extract_group(group):
+            selected = retrieve_blocks(index, blocks, group["query"], top_k)
+            context = "\n\n".join(block.text for block in selected)
+            result = await llm.extract(context, group["schema"])
+            tokens = sum(block.tokens for block in selected)
+            if is_error_result(result):
+                # The retrieved blocks may miss the fields; the whole text is the fallback.
+                logger.warning(f"Retrieval extraction of {group['fields']} failed ({result['error']}), using the full text")
+                result = await llm.extract("\n\n".join(document.text for document in documents), group["schema"])
+                tokens += sum(document.tokens for document in documents)
+            return result, tokens
+
+        results = await asyncio.gather(*(extract_group(group) for group in groups))
+        logger.info(
+            f"Retrieval extraction sent {sum(tokens for _, tokens in results)} of "
+            f"{sum(block.tokens for block in blocks)} document tokens over {len(groups)} field groups"
+        )
+
+        merged = {}
+        for partial, _ in results:
+            if is_error_result(partial):
+                return partial
+            merged.update(partial)
+        errors = schema_errors(merged, schema)
+        if errors:
+            logger.warning(f"Merged retrieval extraction failed validation: {errors}")
+            return {"raw_response": json.dumps(merged, default=str), "error": "schema_validation",
+                    "validation_errors": errors}
+        return merged
+
+    async def _extract_document(self, llm: LLMClient, document: ParsedDocument, schema: dict, retrieval: dict) -> dict:
+        min_tokens = int(retrieval.get("min_tokens", RETRIEVAL_MIN_TOKENS))
+        if retrieval.get("enabled") and document.tokens > min_tokens:
+            return await self._extract_with_retrieval(llm, [document], schema, retrieval)
+        return await llm.extract(document.text, schema)
+
+    async def _extract_per_document(
+        self, llm: LLMClient, documents: List[ParsedDocument], schema: dict, config: dict
+    ) -> dict:
+        """
+        Extract every document separately, packing short ones several to an LLM call.
+
+        Batched results are validated per document; documents whose result is missing or
+        invalid fall back to an individual call.
+
+        Returns:
+            dict: Extraction result per document key (document id), in document order.
+        """
+        retrieval = config.get("retrieval") or {}
+        batching = config.get("batching") or {}
+        keys = [document_key(document, position) for position, document in enumerate(documents)]
+        by_key = dict(zip(keys, documents))
+
+        if batching.get("enabled"):
+            batches, singles = plan_batches(documents, batching)
+        else:
+            batches, singles = [], list(zip(keys, documents))
+
+        async def run_batch(batch):
+            batch_keys = [key for key, _ in batch]
+            try:
+                raw = await llm.extract_batch({key: document.text for key, document in batch}, schema)
+                return split_batch_result(raw, batch_keys, schema)
+            except Exception as e:
+                logger.warning(f"Batched extraction of {len(batch)} documents failed: {e}")
+                return {}
+
+        results = {}
+        for batch_result in await asyncio.gather(*(run_batch(batch) for batch in batches)):
+            results.update(batch_result)
+
+        pending = [key for key, _ in singles] + [
+            key for batch in batches for key, _ in batch if key not in results
+        ]
+        if batches:
+            logger.info(
+                f"Batched {sum(len(batch) for batch in batches)} documents into {len(batches)} calls, "
+                f"{len(pending) - len(singles)} fell back to individual calls"
+            )
 
-    async def run(self, task, text: str, config: dict) -> dict:
-        try:
-            start_step(task, StepMethod.EXTRACTING)
+        individual = await asyncio.gather(
+            *(self._extract_document(llm, by_key[key], schema, retrieval) for key in pending)
+        )
+        results.update(zip(pending, individual))
+        return {key: results[key] for key in keys}
 
-            schema = config.get("schema")
-            if not schema:
-                raise ValueError("Extraction schema missing in workflow config")
+    async def run(
+        self,
+        task,
+        text: str,
+        config: dict,
+        documents: List[ParsedDocument] = None,
+        on_partial: Callable[[dict], None] = None
+    ) -> dict:
+        """
+        Extract structured data matching the schema of the step config.
 
-            result = await self.llm.extract(text, schema)
+        Args:
+            task: The task being processed.
+            text (str): Full text of the parsed documents.
+            config (dict): Step config with ``schema`` and an optional ``retrieval`` section
+                (``enabled``, ``method`` bm25|embedding, ``model``, ``top_k``, ``group_size``,
+                ``min_tokens``). With ``per_document`` every document is extracted on its own,
+                and an optional ``batching`` section (``enabled``, ``max_documents``,
+                ``max_tokens``, ``max_document_tokens``) packs short documents into one call.
+                An optional ``llm`` section selects the provider (see ``daemon.llm.providers``).
+                With ``streaming`` (``enabled``, ``stop_on_required``) the single-call path
+                streams the completion and reports fields as they close.
+            documents (list[ParsedDocument]): Parsed documents, required for retrieval.
+            on_partial (callable): Receives the fields extracted so far while streaming.
+        """
+        schema = config.get("schema")
+        if not schema:
+            raise ValueError("Extraction schema missing in workflow config")
 
-            complete_step(task, StepMethod.EXTRACTING)
-            return result
+        llm = get_llm_client(config["llm"]) if config.get("llm") else self.llm
+        retrieval = config.get("retrieval") or {}
+        streaming = config.get("streaming") or {}
+        min_tokens = int(retrieval.get("min_tokens", RETRIEVAL_MIN_TOKENS))
+        if config.get("per_document") and documents:
+            result = await self._extract_per_document(llm, documents, schema, config)
+        elif retrieval.get("enabled") and documents and sum(doc.tokens for doc in documents) > min_tokens:
+            result = await self._extract_with_retrieval(llm, documents, schema, retrieval)
+        elif streaming.get("enabled"):
+            result = await llm.extract_stream(
+                text,
+                schema,
+                on_field=(lambda field, value, fields: on_partial(fields)) if on_partial else None,
+                stop_on_required=streaming.get("stop_on_required", True)
+            )
+        else:
+            result = await llm.extract(text, schema)
 
-        except Exception as e:
-            fail_step(task, StepMethod.EXTRACTING, str(e))
-            raise
+        return result
@@ -1,46 +1,80 @@
+import os
 from typing import List
 from pathlib import Path
 
 from sqlalchemy.orm import Session
 
-from daemon.constants.enums import StepMethod
-from daemon.utils.status_utils import start_step, complete_step, fail_step
+from daemon.common.cassette import get_cassette, get_file_manager
+from daemon.utils.util import data_path
 from daemon.db.model import Document
 
+# Local copies of documents stored in S3, one directory per document id.
+INGEST_CACHE_DIR = data_path(os.getenv("INGEST_CACHE_DIR", "documents"))
+
 
 class IngestingProcessor:
+    def __init__(self, file_manager=None):
+        # Created on first download, through the cassette when recording or replaying.
+        self.file_manager = file_manager
+
+    def _download(self, document: Document, key: str) -> Path:
+        """Local copy of a document stored in S3 under ``key``, downloaded once."""
+        target = INGEST_CACHE_DIR / str(document.ID) / Path(key).name
+        # Recorded and replayed runs always fetch, so they see the S3 latency of every task.
+        if target.exists() and not get_cassette().enabled:
+            return target
+
+        if self.file_manager is None:
+            self.file_manager = get_file_manager()
+        data = self.file_manager.read(key)
+        if not isinstance(data, (bytes, bytearray)):
+            raise FileNotFoundError(f"Document {document.ID} not found in S3 at {key}")
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_suffix(target.suffix + ".tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, target)
+        return target
+
     def ingest(self, task, session: Session) -> List[str]:
         """
         Resolves document IDs to local file paths.
         """
-        try:
-            start_step(task, StepMethod.INGESTING)
+        return [document["path"] for document in self.ingest_documents(task, session)]
+
+    def ingest_documents(self, task, session: Session) -> List[dict]:
+        """
+        Resolves document IDs to ``{"documentId", "path"}`` entries, in the task's document order.
 
-            document_paths = []
+        Documents with a local ``path`` are used in place; documents uploaded to S3
+        (``storage_type`` s3 with an ``absolute_path`` key) are downloaded to INGEST_CACHE_DIR.
+        """
+        ingested = []
 
-            documents = (
-                session.query(Document)
-                .filter(Document.ID.in_(task.DOCUMENT_IDS))
-                .all()
-            )
+        documents = (
+            session.query(Document)
+            .filter(Document.ID.in_(task.DOCUMENT_IDS))
+            .all()
+        )
 
-            if not documents:
-                raise ValueError("No documents found for ingestion")
+        if not documents:
+            raise ValueError("No documents found for ingestion")
 
-            for doc in documents:
-                path = doc.STORAGE_PATH.get("path")
-                if not path:
-                    raise ValueError(f"Missing storage path for document {doc.ID}")
+        order = {str(document_id): index for index, document_id in enumerate(task.DOCUMENT_IDS)}
+        documents.sort(key=lambda doc: order.get(str(doc.ID), len(order)))
 
-                file_path = Path(path)
-                if not file_path.exists():
-                    raise FileNotFoundError(f"File not found: {file_path}")
+        for doc in documents:
+            storage = doc.STORAGE_PATH or {}
+            path = storage.get("path")
+            if not path and storage.get("storage_type") == "s3" and storage.get("absolute_path"):
+                path = self._download(doc, storage["absolute_path"])
+            if not path:
+                raise ValueError(f"Missing storage path for document {doc.ID}")
 
-                document_paths.append(str(file_path))
+            file_path = Path(path)
+            if not file_path.exists():
+                raise FileNotFoundError(f"File not found: {file_path}")
 
-            complete_step(task, StepMethod.INGESTING)
-            return document_paths
+            ingested.append({"documentId": str(doc.ID), "path": str(file_path)})
 
-        except Exception as e:
-            fail_step(task, StepMethod.INGESTING, str(e))
-            raise
+        return ingested
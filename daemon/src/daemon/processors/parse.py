@@ -1,46 +1,207 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import List
+from typing import List, Tuple, Union
 
-from docling.document_converter import DocumentConverter
-from docling.datamodel.pipeline_options import PdfPipelineOptions
-from docling.datamodel.base_models import InputFormat
+from daemon.logger.log_utils import Logger, init_worker, worker_queue
+from daemon.processors.converter_registry import get_converter
+from daemon.processors.parsed_document import ParsedDocument, ParsedDocumentStore, document_to_blocks
+from daemon.utils.pdf_utils import detect_ocr_pages, group_page_runs, is_pdf, split_page_runs
+from daemon.utils.util import data_path
 
-from daemon.constants.enums import StepMethod
-from daemon.utils.status_utils import start_step, complete_step, fail_step
+logger = Logger()
+
+# PDFs with at least this many pages are split into page ranges parsed in parallel.
+PARALLEL_MIN_PAGES = int(os.getenv("PARSER_PARALLEL_MIN_PAGES", 40))
+PAGE_CHUNK_SIZE = int(os.getenv("PARSER_PAGE_CHUNK_SIZE", 20))
+MAX_WORKERS = int(os.getenv("PARSER_MAX_WORKERS", os.cpu_count() or 1))
+CHECKPOINT_DIR = data_path(os.getenv("PARSER_CHECKPOINT_DIR", "checkpoints/parse"))
+
+
+def convert_to_blocks(path: str, do_ocr: bool, page_range: tuple = None) -> List[dict]:
+    converter = get_converter(do_ocr=do_ocr)
+    if page_range:
+        result = converter.convert(Path(path), page_range=page_range)
+    else:
+        result = converter.convert(Path(path))
+    return document_to_blocks(result.document)
+
+
+def convert_page_range(path: str, start: int, end: int, do_ocr: bool) -> List[dict]:
+    """Convert pages ``start``..``end`` (1-based, inclusive) of a PDF inside a worker process."""
+    return convert_to_blocks(path, do_ocr, page_range=(start, end))
+
+
+# Page-range worker pool shared by every parser of the process.
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_page_range_pool() -> ProcessPoolExecutor:
+    # Spawned workers keep their converters, so models load once per worker, not per range.
+    # Their records are written by this process, the only one holding the log file.
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=MAX_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_worker,
+                initargs=(worker_queue(), logger.logger.level)
+            )
+        return _pool
+
+
+def shutdown_page_range_pool():
+    """Stop the page-range workers; called on the daemon's way out."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fp:
+        for chunk in iter(lambda: fp.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
 
 
 class DoclingParser:
-    def __init__(self):
-        pdf_options = PdfPipelineOptions(
-            do_ocr=True,
-            extract_tables=True,
-            extract_images=False
-        )
-
-        self.converter = DocumentConverter(
-            allowed_formats=[
-                InputFormat.PDF,
-                InputFormat.DOCX,
-                InputFormat.PPTX,
-                InputFormat.TXT
-            ],
-            pdf_pipeline_options=pdf_options
-        )
+    def __init__(self, store: ParsedDocumentStore = None):
+        # Converters come from the process-wide registry, so a parser is cheap to build.
+        self.store = store or ParsedDocumentStore()
+        self.stats = []
 
-    def parse_documents(self, task, document_paths: List[str]) -> str:
-        try:
-            start_step(task, StepMethod.PARSING)
+    def _parse_page_ranges(self, path: str, ranges) -> List[dict]:
+        """
+        Parse page ranges of a large PDF in parallel processes and stitch them in page order.
+
+        Every finished range is checkpointed under ``PARSER_CHECKPOINT_DIR/<sha256 of file>``
+        (relative to DAEMON_DATA_DIR), so when one range fails a retry only converts the
+        ranges without a checkpoint.
+        """
+        checkpoint_dir = CHECKPOINT_DIR / file_digest(path)
+        checkpoint_dir.mkdir(parents=True, exist_ok=True)
+
+        def checkpoint_path(start, end, do_ocr):
+            return checkpoint_dir / f"{start:05d}-{end:05d}-{'ocr' if do_ocr else 'text'}.json"
+
+        pending = [run for run in ranges if not checkpoint_path(*run).exists()]
+        if len(pending) < len(ranges):
+            logger.info(f"Reusing {len(ranges) - len(pending)} checkpointed page ranges of {path}")
 
-            parsed_texts = []
+        errors = []
+        if pending:
+            pool = get_page_range_pool()
+            futures = {pool.submit(convert_page_range, path, *run): run for run in pending}
+            for future in as_completed(futures):
+                start, end, do_ocr = futures[future]
+                try:
+                    blocks = future.result()
+                except Exception as e:
+                    errors.append(f"pages {start}-{end}: {e}")
+                    continue
+                target = checkpoint_path(start, end, do_ocr)
+                tmp_path = target.with_suffix(".tmp")
+                tmp_path.write_text(json.dumps(blocks), encoding="utf-8")
+                os.replace(tmp_path, target)
 
-            for path in document_paths:
-                result = self.converter.convert(Path(path))
-                doc = result.document
-                parsed_texts.append(doc.export_to_markdown())
+        if errors:
+            raise Exception(f"Failed to parse {len(errors)} page ranges of {path}: {'; '.join(errors)}")
 
-            complete_step(task, StepMethod.PARSING)
-            return "\n\n".join(parsed_texts)
+        blocks = []
+        for run in ranges:
+            blocks.extend(json.loads(checkpoint_path(*run).read_text(encoding="utf-8")))
+        shutil.rmtree(checkpoint_dir, ignore_errors=True)
+        return blocks
 
+    def _parse_pdf(self, path: str, stats: List[dict]) -> List[dict]:
+        """
+        Convert a PDF, running OCR only on the pages without a usable text layer.
+
+        Born-digital page ranges go through the converter with OCR disabled, scanned
+        ranges through the OCR converter, and the blocks are stitched back in page order.
+        The OCR stats of the file are appended to ``stats``.
+        """
+        try:
+            ocr_flags = detect_ocr_pages(path)
         except Exception as e:
-            fail_step(task, StepMethod.PARSING, str(e))
-            raise
+            logger.warning(f"Text-layer detection failed for {path}, falling back to full OCR: {e}")
+            stats.append({"path": path, "pages": None, "ocrPages": None})
+            return convert_to_blocks(path, do_ocr=True)
+
+        runs = group_page_runs(ocr_flags)
+        stats.append({
+            "path": path,
+            "pages": len(ocr_flags),
+            "ocrPages": sum(ocr_flags),
+            "ocrRanges": [[start, end] for start, end, do_ocr in runs if do_ocr]
+        })
+
+        if len(ocr_flags) >= PARALLEL_MIN_PAGES and MAX_WORKERS > 1:
+            return self._parse_page_ranges(path, split_page_runs(runs, PAGE_CHUNK_SIZE))
+
+        if len(runs) <= 1:
+            do_ocr = runs[0][2] if runs else True
+            return convert_to_blocks(path, do_ocr=do_ocr)
+
+        blocks = []
+        for start, end, do_ocr in runs:
+            blocks.extend(convert_to_blocks(path, do_ocr=do_ocr, page_range=(start, end)))
+        return blocks
+
+    def convert(self, documents: List[Union[dict, str]]) -> Tuple[List[ParsedDocument], List[dict]]:
+        """
+        Parse documents into per-document, per-page typed blocks.
+
+        Touches neither a task nor a database session, so it can run in a worker thread
+        while other workflow steps run on the event loop.
+
+        Args:
+            documents (list): ``{"documentId", "path"}`` entries, or plain local paths.
+
+        Returns:
+            tuple: The structured documents, one per input in input order, and the OCR stats
+            of the PDFs among them. Documents with an id are also stored in the parsed
+            document store.
+        """
+        parsed_documents = []
+        stats = []
+
+        for document in documents:
+            if isinstance(document, str):
+                document = {"documentId": None, "path": document}
+            path = document["path"]
+
+            if is_pdf(path):
+                blocks = self._parse_pdf(path, stats)
+                pages = stats[-1]["pages"]
+            else:
+                blocks = convert_to_blocks(path, do_ocr=False)
+                pages = None
+
+            parsed = ParsedDocument.from_blocks(
+                path=path, blocks=blocks, documentId=document["documentId"], pages=pages
+            )
+            if parsed.documentId:
+                self.store.save(parsed)
+            parsed_documents.append(parsed)
+
+        logger.info(f"Parsed {len(documents)} documents, OCR stats: {stats}")
+        return parsed_documents, stats
+
+    def parse(self, task, documents: List[Union[dict, str]]) -> List[ParsedDocument]:
+        """Parse documents (see ``convert``), keeping the OCR stats in ``self.stats``."""
+        parsed_documents, self.stats = self.convert(documents)
+        return parsed_documents
+
+    def parse_documents(self, task, document_paths: List[str]) -> str:
+        return "\n\n".join(document.text for document in self.parse(task, document_paths))
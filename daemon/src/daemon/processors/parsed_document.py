@@ -0,0 +1,151 @@
+import gzip
+import json
+import os
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from pydantic import BaseModel, Field
+
+from daemon.utils.util import count_tokens, data_path
+
+PARSED_STORE_DIR = data_path(os.getenv("PARSED_STORE_DIR", "parsed"))
+
+HEADING = "heading"
+PARAGRAPH = "paragraph"
+TABLE = "table"
+LIST = "list"
+
+# Docling item labels mapped to block types; labels not listed here become paragraphs.
+_LABEL_TYPES = {
+    "title": HEADING,
+    "section_header": HEADING,
+    "table": TABLE,
+    "list_item": LIST,
+}
+_SKIPPED_LABELS = {"picture", "page_header", "page_footer"}
+
+
+class Block(BaseModel):
+    type: str
+    page: Optional[int] = None
+    text: str
+    start: int = 0
+    end: int = 0
+    tokens: int = 0
+
+
+class ParsedDocument(BaseModel):
+    documentId: Optional[str] = None
+    path: str
+    pages: Optional[int] = None
+    blocks: List[Block] = Field(default_factory=list)
+
+    @classmethod
+    def from_blocks(cls, path: str, blocks: Iterable[dict], documentId: str = None, pages: int = None):
+        """
+        Build a document from raw ``{"type", "page", "text"}`` blocks, computing offsets and token counts.
+
+        Offsets index into :attr:`text`, where blocks are separated by a blank line.
+        """
+        document = cls(documentId=documentId, path=path, pages=pages)
+        offset = 0
+        for raw in blocks:
+            text = raw["text"]
+            document.blocks.append(Block(
+                type=raw["type"],
+                page=raw.get("page"),
+                text=text,
+                start=offset,
+                end=offset + len(text),
+                tokens=count_tokens(text)
+            ))
+            offset += len(text) + 2
+        return document
+
+    @property
+    def text(self) -> str:
+        return "\n\n".join(block.text for block in self.blocks)
+
+    @property
+    def tokens(self) -> int:
+        return sum(block.tokens for block in self.blocks)
+
+    def to_jsonl(self) -> str:
+        """One header line with the document fields, then one compact line per block."""
+        header = {"documentId": self.documentId, "path": self.path, "pages": self.pages}
+        lines = [json.dumps(header, separators=(",", ":"))]
+        lines.extend(block.model_dump_json(exclude_none=True) for block in self.blocks)
+        return "\n".join(lines) + "\n"
+
+    @classmethod
+    def from_jsonl(cls, data: str):
+        lines = [line for line in data.splitlines() if line]
+        header = json.loads(lines[0])
+        return cls(**header, blocks=[Block.model_validate_json(line) for line in lines[1:]])
+
+
+def document_to_blocks(document) -> List[dict]:
+    """
+    Flatten a Docling document into typed blocks in reading order.
+
+    Consecutive list items of the same page are merged into one ``list`` block, and
+    tables are rendered as markdown so their structure survives.
+    """
+    blocks = []
+    for item, _ in document.iterate_items():
+        label = getattr(getattr(item, "label", None), "value", None)
+        if label in _SKIPPED_LABELS:
+            continue
+        block_type = _LABEL_TYPES.get(label, PARAGRAPH)
+        page = item.prov[0].page_no if getattr(item, "prov", None) else None
+
+        if block_type == TABLE:
+            text = item.export_to_markdown(doc=document)
+        elif block_type == HEADING:
+            level = 1 if label == "title" else getattr(item, "level", 1) + 1
+            text = f"{'#' * min(level, 6)} {item.text}"
+        elif block_type == LIST:
+            text = f"- {item.text}"
+        else:
+            text = getattr(item, "text", "")
+
+        if not text or not text.strip():
+            continue
+        if block_type == LIST and blocks and blocks[-1]["type"] == LIST and blocks[-1]["page"] == page:
+            blocks[-1]["text"] += f"\n{text}"
+            continue
+        blocks.append({"type": block_type, "page": page, "text": text})
+    return blocks
+
+
+class ParsedDocumentStore:
+    def __init__(self, root: str = PARSED_STORE_DIR):
+        """
+        Gzipped JSONL store of parsed documents, one file per document.
+
+        Args:
+            root (str): Directory of the store. Defaults to PARSED_STORE_DIR env var or ``parsed``,
+                under DAEMON_DATA_DIR when relative.
+        """
+        self.root = Path(root)
+
+    def _path(self, document_id: str) -> Path:
+        return self.root / f"{document_id}.jsonl.gz"
+
+    def save(self, document: ParsedDocument) -> Path:
+        if not document.documentId:
+            raise ValueError("documentId is required to store a parsed document")
+        self.root.mkdir(parents=True, exist_ok=True)
+        target = self._path(document.documentId)
+        tmp_path = target.with_suffix(".tmp")
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as fp:
+            fp.write(document.to_jsonl())
+        os.replace(tmp_path, target)
+        return target
+
+    def load(self, document_id: str) -> Optional[ParsedDocument]:
+        path = self._path(document_id)
+        if not path.exists():
+            return None
+        with gzip.open(path, "rt", encoding="utf-8") as fp:
+            return ParsedDocument.from_jsonl(fp.read())
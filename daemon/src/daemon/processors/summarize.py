@@ -1,22 +1,39 @@
-from daemon.constants.enums import StepMethod
-from daemon.status_utils import start_step, complete_step, fail_step
-from daemon.llm.llm_client import LLMClient
+from typing import List
+
+from daemon.llm.providers import get_llm_client
+from daemon.llm.summarizer import HierarchicalSummarizer, SUMMARY_CONCURRENCY, SUMMARY_SECTION_TOKENS
+from daemon.processors.parsed_document import ParsedDocument
 
 
 class SummarizingProcessor:
     def __init__(self):
-        self.llm = LLMClient()
+        self.llm = get_llm_client()
 
-    async def run(self, task, text: str, config: dict) -> str:
-        try:
-            start_step(task, StepMethod.SUMMARIZING)
+    async def run(self, task, text: str, config: dict, documents: List[ParsedDocument] = None) -> str:
+        """
+        Summarise the parsed documents in the style of the step config.
 
-            style = config.get("style", "concise")
-            summary = await self.llm.summarize(text, style)
+        Args:
+            task: The task being processed.
+            text (str): Full text of the parsed documents.
+            config (dict): Step config with ``style`` (concise|detailed), an optional ``llm``
+                provider section and an optional ``hierarchical`` section (``enabled``,
+                ``section_tokens``, ``concurrency``). Hierarchical summarisation is on by default
+                when parsed documents are available.
+            documents (list[ParsedDocument]): Parsed documents, split into sections.
+        """
+        llm = get_llm_client(config["llm"]) if config.get("llm") else self.llm
+        style = config.get("style", "concise")
+        hierarchical = config.get("hierarchical") or {}
 
-            complete_step(task, StepMethod.SUMMARIZING)
-            return summary
+        if documents and hierarchical.get("enabled", True):
+            summarizer = HierarchicalSummarizer(
+                llm,
+                section_tokens=int(hierarchical.get("section_tokens", SUMMARY_SECTION_TOKENS)),
+                concurrency=int(hierarchical.get("concurrency", SUMMARY_CONCURRENCY))
+            )
+            summary = await summarizer.summarize(documents, style)
+        else:
+            summary = await llm.summarize(text, style)
 
-        except Exception as e:
-            fail_step(task, StepMethod.SUMMARIZING, str(e))
-            raise
+        return summary
@@ -0,0 +1,60 @@
+import asyncio
+import select
+
+from daemon.logger.log_utils import Logger
+
+logger = Logger()
+
+# Channel the backend notifies (pg_notify) when it queues tasks.
+TASK_QUEUE_CHANNEL = "task_queue"
+
+
+class TaskQueueListener:
+    def __init__(self, engine):
+        """
+        LISTENs for task queue notifications on a dedicated connection.
+
+        Args:
+            engine: SQLAlchemy engine of the daemon database.
+        """
+        self.engine = engine
+        self.connection = None
+
+    def _connect(self):
+        raw = self.engine.raw_connection()
+        connection = raw.driver_connection
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {TASK_QUEUE_CHANNEL}")
+        self.connection = raw
+
+    def _wait(self, timeout: float) -> bool:
+        if self.connection is None:
+            self._connect()
+        connection = self.connection.driver_connection
+        if select.select([connection], [], [], timeout) == ([], [], []):
+            return False
+        connection.poll()
+        notified = bool(connection.notifies)
+        connection.notifies.clear()
+        return notified
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    async def wait(self, timeout: float) -> bool:
+        """
+        Wait until tasks are queued or ``timeout`` seconds pass; polling stays the fallback.
+
+        Returns:
+            bool: True when woken by a notification.
+        """
+        try:
+            return await asyncio.to_thread(self._wait, timeout)
+        except Exception as e:
+            logger.warning(f"Task queue listener failed, falling back to polling: {e}")
+            self.close()
+            await asyncio.sleep(timeout)
+            return False
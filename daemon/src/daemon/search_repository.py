@@ -0,0 +1,79 @@
+import os
+import uuid
+from datetime import datetime
+from typing import Any, List
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from daemon.db.model import Document, DocumentSearch, Task
+from daemon.processors.parsed_document import ParsedDocument
+
+# Characters kept per search row; to_tsvector refuses inputs over 1MB.
+SEARCH_MAX_CONTENT_CHARS = int(os.getenv("SEARCH_MAX_CONTENT_CHARS", 200000))
+TEXT, RESULT = "text", "result"
+
+
+def flatten_values(value: Any) -> List[str]:
+    """String, number and boolean leaves of an extraction result, depth first."""
+    if isinstance(value, dict):
+        return [leaf for item in value.values() for leaf in flatten_values(item)]
+    if isinstance(value, list):
+        return [leaf for item in value for leaf in flatten_values(item)]
+    if value is None or value == "":
+        return []
+    return [str(value)]
+
+
+def page_texts(document: ParsedDocument) -> dict:
+    """Parsed text per page (None for blocks without a page), pages in reading order."""
+    pages = {}
+    for block in document.blocks:
+        pages.setdefault(block.page, []).append(block.text)
+    return {page: "\n\n".join(texts) for page, texts in pages.items()}
+
+
+class SearchRepository:
+
+    @staticmethod
+    def index_task(session: Session, task: Task, documents: List[ParsedDocument], result: Any) -> int:
+        """
+        Replace the search rows of the task's documents: one per parsed page, and one with the
+        flattened extraction result. The tsvector is a generated column, Postgres keeps it.
+
+        A result keyed by document id (a fanned-out extraction) is split per document,
+        any other result is indexed with every document of the task. Does not commit.
+
+        Returns:
+            int: Rows written.
+        """
+        documents = [document for document in documents if document.documentId]
+        if not documents:
+            return 0
+        document_ids = [uuid.UUID(document.documentId) for document in documents]
+        projects = dict(session.query(Document.ID, Document.PROJECT_ID).filter(Document.ID.in_(document_ids)))
+
+        rows, now = [], datetime.utcnow()
+        for document, document_id in zip(documents, document_ids):
+            if document_id not in projects:
+                continue
+            row = {"DOCUMENT_ID": document_id, "PROJECT_ID": projects[document_id], "TASK_ID": task.ID, "CREATED_AT": now}
+            for page, content in page_texts(document).items():
+                if content.strip():
+                    rows.append({**row, "ID": uuid.uuid4(), "KIND": TEXT, "PAGE": page,
+                                 "CONTENT": content[:SEARCH_MAX_CONTENT_CHARS]})
+
+            own = result.get(document.documentId) if isinstance(result, dict) else None
+            values = flatten_values(own if own is not None else result)
+            if values:
+                rows.append({**row, "ID": uuid.uuid4(), "KIND": RESULT, "PAGE": None,
+                             "CONTENT": "\n".join(values)[:SEARCH_MAX_CONTENT_CHARS]})
+
+        (
+            session.query(DocumentSearch)
+            .filter(DocumentSearch.DOCUMENT_ID.in_(list(projects)))
+            .delete(synchronize_session=False)
+        )
+        if rows:
+            session.execute(insert(DocumentSearch), rows)
+        return len(rows)
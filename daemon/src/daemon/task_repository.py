@@ -1,38 +1,223 @@
+import os
+import uuid
 from datetime import datetime
-from sqlalchemy.orm import Session
+from collections import Counter
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Query, Session
 
-from daemon.db.model import Task, Project, WorkflowConfig
+from daemon.db.model import Task, TaskQueueStats, TaskShare, Project, WorkflowConfig
 from daemon.constants.enums import TaskStatus
 
+# Tasks at or above this priority (interactive, single-document ones) skip fair-share scheduling.
+FAST_LANE_PRIORITY = int(os.getenv("TASK_FAST_LANE_PRIORITY", 10))
+# Owners with queued work considered per claim, lowest pass first.
+FAIR_SHARE_CANDIDATES = int(os.getenv("TASK_FAIR_SHARE_CANDIDATES", 8))
+
+# Same limits as the backend's admission control; deferred tasks are promoted within them (0 = no limit).
+TASK_MAX_QUEUED_PER_OWNER = int(os.getenv("TASK_MAX_QUEUED_PER_OWNER", 1000))
+TASK_MAX_QUEUED_GLOBAL = int(os.getenv("TASK_MAX_QUEUED_GLOBAL", 100000))
+TASK_MAX_IN_FLIGHT_PER_OWNER = int(os.getenv("TASK_MAX_IN_FLIGHT_PER_OWNER", 0))
+TASK_MAX_IN_FLIGHT_GLOBAL = int(os.getenv("TASK_MAX_IN_FLIGHT_GLOBAL", 0))
+# Deferred tasks looked at per promotion, oldest first.
+TASK_PROMOTE_BATCH = int(os.getenv("TASK_PROMOTE_BATCH", 100))
+# Rows the global counters are spread over, picked by task id (same setting as the backend).
+TASK_STATS_SHARDS = int(os.getenv("TASK_STATS_SHARDS", 16))
+GLOBAL_SCOPE = "global"
+GLOBAL_SCOPES = [f"{GLOBAL_SCOPE}:{shard}" for shard in range(TASK_STATS_SHARDS)]
+
+# Literal predicates matching the partial queue indexes (a bound parameter would not match them).
+QUEUED = text(f"\"STATUS\"->>'status' = '{TaskStatus.NOT_STARTED.value}'")
+DEFERRED = text(f"\"STATUS\"->>'status' = '{TaskStatus.DEFERRED.value}'")
+
 
 class TaskRepository:
 
     @staticmethod
-    def fetch_next_task(session: Session) -> Task | None:
+    def _claim_head(query: Query) -> Task | None:
+        # SKIP LOCKED lets several daemons claim concurrently without blocking on each other.
         return (
-            session.query(Task)
-            .filter(Task.STATUS["status"].astext == TaskStatus.NOT_STARTED.value)
-            .order_by(Task.CREATED_AT)
+            query
+            .order_by(Task.PRIORITY.desc(), Task.CREATED_AT)
+            .with_for_update(skip_locked=True)
             .first()
         )
 
     @staticmethod
-    def mark_in_progress(session: Session, task: Task):
-        task.STATUS["status"] = TaskStatus.IN_PROGRESS.value
+    def _claim_fair_share(session: Session, queued: Query) -> Task | None:
+        # Stride scheduling: the owner with work in ``queued`` and the lowest pass is served,
+        # and its pass advances by 1 / WEIGHT.
+        shares = (
+            session.query(TaskShare)
+            .filter(queued.with_entities(Task.ID).filter(Task.OWNER == TaskShare.OWNER).exists())
+            .order_by(TaskShare.PASS)
+            .with_for_update(skip_locked=True)
+            .limit(FAIR_SHARE_CANDIDATES)
+            .all()
+        )
+        for share in shares:
+            task = TaskRepository._claim_head(queued.filter(Task.OWNER == share.OWNER))
+            if task:
+                share.PASS += 1.0 / max(share.WEIGHT, 1e-6)
+                share.MODIFIED_AT = datetime.utcnow()
+                return task
+        return None
+
+    @staticmethod
+    def fetch_next_task(session: Session) -> Task | None:
+        """
+        Claim the next task: fast lane first, each lane shared fairly across owners.
+
+        1. Fast lane: tasks at or above FAST_LANE_PRIORITY (interactive, single-document ones),
+           by stride scheduling across owners: the owner with fast-lane work and the lowest
+           pass gets its oldest such task, and its pass advances by ``1 / WEIGHT``. An owner
+           posting thousands of single-document tasks gets its share of the lane, not all of it.
+        2. The same stride scheduling over every queued task, so owners are served in
+           proportion to their weights however many tasks each one queued.
+        3. Any other queued task by priority and age: tasks without an owner, or whose owner's
+           share row is locked by another daemon.
+        4. With nothing queued, deferred tasks are promoted (``promote_deferred``) and claimed.
+
+        Both lanes advance the same pass, so fast-lane work counts against an owner's share.
+        Every lookup is an ordered scan of a partial queue index. The returned task stays
+        row-locked until the caller commits (``mark_in_progress``).
+        """
+        queued = session.query(Task).filter(QUEUED)
+
+        task = (
+            TaskRepository._claim_fair_share(session, queued.filter(Task.PRIORITY >= FAST_LANE_PRIORITY))
+            or TaskRepository._claim_fair_share(session, queued)
+            or TaskRepository._claim_head(queued)
+        )
+        if task is None and TaskRepository.promote_deferred(session):
+            task = TaskRepository._claim_head(queued)
+        return task
+
+    @staticmethod
+    def count(session: Session, scopes: Counter, queued: int = 0, in_flight: int = 0):
+        """
+        Adjust the maintained queue counters read by the backend's admission control.
+
+        Args:
+            session (Session): Session of the transaction making the status change.
+            scopes (Counter): Number of tasks per scope (owner id or global shard).
+            queued (int): Change of queued tasks per task.
+            in_flight (int): Change of running tasks per task.
+        """
+        # Sorted, so concurrent transactions lock the counter rows in the same order.
+        rows = [
+            {"SCOPE": scope, "QUEUED": queued * n, "IN_FLIGHT": in_flight * n, "MODIFIED_AT": datetime.utcnow()}
+            for scope, n in sorted(scopes.items())
+        ]
+        if not rows:
+            return
+        statement = insert(TaskQueueStats).values(rows)
+        session.execute(statement.on_conflict_do_update(
+            index_elements=[TaskQueueStats.SCOPE],
+            set_={
+                "QUEUED": TaskQueueStats.QUEUED + statement.excluded.QUEUED,
+                "IN_FLIGHT": TaskQueueStats.IN_FLIGHT + statement.excluded.IN_FLIGHT,
+                "MODIFIED_AT": statement.excluded.MODIFIED_AT
+            }
+        ))
+
+    @staticmethod
+    def _global_scope(task: Task) -> str:
+        return GLOBAL_SCOPES[uuid.UUID(str(task.ID)).int % TASK_STATS_SHARDS]
+
+    @staticmethod
+    def _scopes(*tasks: Task) -> Counter:
+        scopes = Counter(TaskRepository._global_scope(task) for task in tasks)
+        scopes.update(str(task.OWNER) for task in tasks if task.OWNER)
+        return scopes
+
+    @staticmethod
+    def _set_status(session: Session, task: Task, status: TaskStatus, **fields):
+        # Counters follow the status the task leaves; a task failing before it started is still queued.
+        previous = task.STATUS.get("status")
+        if previous == TaskStatus.NOT_STARTED.value:
+            TaskRepository.count(session, TaskRepository._scopes(task), queued=-1)
+        elif previous == TaskStatus.IN_PROGRESS.value:
+            TaskRepository.count(session, TaskRepository._scopes(task), in_flight=-1)
+        if status == TaskStatus.NOT_STARTED:
+            TaskRepository.count(session, TaskRepository._scopes(task), queued=1)
+        elif status == TaskStatus.IN_PROGRESS:
+            TaskRepository.count(session, TaskRepository._scopes(task), in_flight=1)
+
+        # A new dict: JSONB columns do not track changes made in place.
+        task.STATUS = {**task.STATUS, "status": status.value, **fields}
         task.MODIFIED_AT = datetime.utcnow()
         session.commit()
 
     @staticmethod
-    def mark_success(session: Session, task: Task):
-        task.STATUS["status"] = TaskStatus.SUCCESS.value
-        task.MODIFIED_AT = datetime.utcnow()
+    def promote_deferred(session: Session) -> int:
+        """
+        Queue the oldest deferred tasks that fit under the limits again.
+
+        Applies the backend's admission limits: a task is promoted while its owner and the
+        whole queue are under their queued limits and not over their running limits.
+
+        Called when nothing is claimable, so deferred work runs as soon as the queue drains.
+
+        Returns:
+            int: Number of tasks promoted.
+        """
+        tasks = (
+            session.query(Task)
+            .filter(DEFERRED)
+            .order_by(Task.CREATED_AT)
+            .with_for_update(skip_locked=True)
+            .limit(TASK_PROMOTE_BATCH)
+            .all()
+        )
+        if not tasks:
+            return 0
+
+        owners = {str(task.OWNER) for task in tasks if task.OWNER}
+        queued, in_flight = Counter(), Counter()
+        for stats in session.query(TaskQueueStats).filter(TaskQueueStats.SCOPE.in_([*owners, *GLOBAL_SCOPES])):
+            scope = stats.SCOPE if stats.SCOPE in owners else GLOBAL_SCOPE
+            queued[scope] += stats.QUEUED
+            in_flight[scope] += stats.IN_FLIGHT
+
+        if TASK_MAX_IN_FLIGHT_GLOBAL and in_flight[GLOBAL_SCOPE] > TASK_MAX_IN_FLIGHT_GLOBAL:
+            return 0
+        promoted = []
+        for task in tasks:
+            if TASK_MAX_QUEUED_GLOBAL and queued[GLOBAL_SCOPE] >= TASK_MAX_QUEUED_GLOBAL:
+                break
+            owner = str(task.OWNER) if task.OWNER else None
+            if owner and TASK_MAX_QUEUED_PER_OWNER and queued[owner] >= TASK_MAX_QUEUED_PER_OWNER:
+                continue
+            if owner and TASK_MAX_IN_FLIGHT_PER_OWNER and in_flight[owner] > TASK_MAX_IN_FLIGHT_PER_OWNER:
+                continue
+            queued.update([GLOBAL_SCOPE] + ([owner] if owner else []))
+            task.STATUS = {**task.STATUS, "status": TaskStatus.NOT_STARTED.value}
+            task.MODIFIED_AT = datetime.utcnow()
+            promoted.append(task)
+
+        TaskRepository.count(session, TaskRepository._scopes(*promoted), queued=1)
         session.commit()
+        return len(promoted)
+
+    @staticmethod
+    def mark_in_progress(session: Session, task: Task):
+        TaskRepository._set_status(session, task, TaskStatus.IN_PROGRESS)
+
+    @staticmethod
+    def mark_success(session: Session, task: Task):
+        TaskRepository._set_status(session, task, TaskStatus.SUCCESS)
 
     @staticmethod
     def mark_failure(session: Session, task: Task):
-        task.STATUS["status"] = TaskStatus.FAILURE.value
-        task.MODIFIED_AT = datetime.utcnow()
-        session.commit()
+        TaskRepository._set_status(session, task, TaskStatus.FAILURE)
+
+    @staticmethod
+    def requeue(session: Session, task: Task):
+        """Put a failed task back in the queue; its step checkpoints are kept for the retry."""
+        TaskRepository._set_status(
+            session, task, TaskStatus.NOT_STARTED, attempts=task.STATUS.get("attempts", 0) + 1
+        )
 
     @staticmethod
     def get_project_workflow(session: Session, task: Task) -> dict:
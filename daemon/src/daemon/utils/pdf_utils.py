@@ -0,0 +1,78 @@
+import os
+from pathlib import Path
+from typing import List, Tuple
+
+# Minimum number of non-whitespace characters for a page's text layer to be trusted.
+OCR_MIN_TEXT_CHARS = int(os.getenv("PARSER_OCR_MIN_TEXT_CHARS", 32))
+
+
+def is_pdf(path: str) -> bool:
+    return Path(path).suffix.lower() == ".pdf"
+
+
+def get_page_text_lengths(path: str) -> List[int]:
+    """
+    Count the non-whitespace characters of the embedded text layer of every page.
+
+    Args:
+        path (str): Local path of the PDF file.
+
+    Returns:
+        list[int]: One count per page, in page order. Scanned pages yield 0 (or close to it).
+    """
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(path)
+    try:
+        lengths = []
+        for page in pdf:
+            textpage = page.get_textpage()
+            try:
+                text = textpage.get_text_range()
+            finally:
+                textpage.close()
+                page.close()
+            lengths.append(sum(1 for char in text if not char.isspace()))
+        return lengths
+    finally:
+        pdf.close()
+
+
+def detect_ocr_pages(path: str, min_chars: int = OCR_MIN_TEXT_CHARS) -> List[bool]:
+    """
+    Flag the pages of a PDF that have no usable text layer and therefore need OCR.
+
+    Returns:
+        list[bool]: ``True`` for pages that need OCR, in page order.
+    """
+    return [length < min_chars for length in get_page_text_lengths(path)]
+
+
+def group_page_runs(flags: List[bool]) -> List[Tuple[int, int, bool]]:
+    """
+    Group consecutive pages sharing the same flag.
+
+    Returns:
+        list[tuple]: ``(first_page, last_page, flag)`` with 1-based, inclusive page numbers.
+    """
+    runs = []
+    for page_no, flag in enumerate(flags, start=1):
+        if runs and runs[-1][2] == flag:
+            runs[-1] = (runs[-1][0], page_no, flag)
+        else:
+            runs.append((page_no, page_no, flag))
+    return runs
+
+
+def split_page_runs(runs: List[Tuple[int, int, bool]], chunk_size: int) -> List[Tuple[int, int, bool]]:
+    """
+    Split page runs into ranges of at most ``chunk_size`` pages, keeping each run's flag.
+
+    Returns:
+        list[tuple]: ``(first_page, last_page, flag)`` ranges in page order.
+    """
+    ranges = []
+    for start, end, flag in runs:
+        for chunk_start in range(start, end + 1, chunk_size):
+            ranges.append((chunk_start, min(chunk_start + chunk_size - 1, end), flag))
+    return ranges
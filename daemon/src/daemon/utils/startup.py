@@ -0,0 +1,80 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, Tuple
+
+# Budget for importing an entry module in a fresh interpreter, see ``check_import_budget``.
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", 1500))
+
+
+class StartupTimer:
+    def __init__(self):
+        """Wall-clock phases of a process start, reported once the process is ready."""
+        self.started = time.perf_counter()
+        self.last = self.started
+        self.phases = []
+
+    def mark(self, phase: str):
+        """Close the phase that ran since the previous mark (or since the timer started)."""
+        now = time.perf_counter()
+        self.phases.append((phase, (now - self.last) * 1000))
+        self.last = now
+
+    def report(self) -> str:
+        phases = ", ".join(f"{phase} {elapsed:.0f} ms" for phase, elapsed in self.phases)
+        return f"Startup: {phases}; ready in {(self.last - self.started) * 1000:.0f} ms"
+
+
+def import_costs(module: str) -> Tuple[float, Dict[str, float]]:
+    """
+    Import ``module`` in a fresh interpreter with ``-X importtime``.
+
+    Args:
+        module (str): Module to import, e.g. ``daemon.worker``.
+
+    Returns:
+        tuple: Total import time in ms and the time spent per top-level package, in ms.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True
+    )
+    if result.returncode:
+        raise Exception(f"Importing {module} failed: {result.stderr.strip().splitlines()[-1]}")
+
+    packages = defaultdict(float)
+    for line in result.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, _, name = line[len("import time:"):].split("|")
+        packages[name.strip().split(".")[0]] += int(own) / 1000
+    return sum(packages.values()), dict(packages)
+
+
+def check_import_budget(module: str, budget_ms: float = IMPORT_BUDGET_MS, top: int = 15) -> bool:
+    """
+    Print the import cost of ``module`` per package, most expensive first.
+
+    Returns:
+        bool: True when the whole import stays within ``budget_ms``.
+    """
+    total, packages = import_costs(module)
+    for package, elapsed in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        print(f"{elapsed:10.1f} ms  {package}")
+    within = total <= budget_ms
+    print(f"{total:10.1f} ms  total for 'import {module}' (budget {budget_ms:.0f} ms){'' if within else ' OVER BUDGET'}")
+    return within
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report per-package import cost against a budget.")
+    parser.add_argument("module", nargs="?", default="daemon.worker")
+    parser.add_argument("--budget", type=float, default=IMPORT_BUDGET_MS, help="Budget in ms")
+    parser.add_argument("--top", type=int, default=15, help="Packages listed")
+    args = parser.parse_args()
+    sys.exit(0 if check_import_budget(args.module, args.budget, args.top) else 1)
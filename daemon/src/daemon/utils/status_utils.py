@@ -1,13 +1,14 @@
 
 from datetime import datetime
+from typing import Optional
 from pydantic import BaseModel, Field
 
 from daemon.constants.enums import TaskStatus, StepMethod
-from daemon.utils.util import get_current_datetime
 
 
 class StepModel(BaseModel):
     method: str
+    step: Optional[str] = None
     status: str
     started_at: datetime
     completed_at: datetime
@@ -25,51 +26,39 @@ def init_task_status():
     )
 
 
-def start_step(task, method: StepMethod):
-    task.STATUS["status"] = TaskStatus.IN_PROGRESS.value
-    task.STATUS["metadata"].append(
-        StepMethod(
-            method=method.value,
-            status=TaskStatus.IN_PROGRESS.value,
-            started_at=get_current_datetime(),
-            completed_at=None,
-            error=None
-        )
-    )
-
-
-    task.STATUS["metadata"].append({
-        "method": method.value,
-        "status": TaskStatus.IN_PROGRESS.value,
-        "started_at": datetime.utcnow().isoformat(),
-        "completed_at": None,
-        "error": None
-    })
-
-
-def complete_step(task, method: StepMethod):
-    for step in task.STATUS["metadata"]:
+def _update_step(task, method: StepMethod, step_id: str = None, **fields):
+    # Rebuild the STATUS dict: JSONB columns do not track changes made in place.
+    metadata = [dict(step) for step in task.STATUS.get("metadata", [])]
+    for step in metadata:
         if (
             step["method"] == method.value
+            and step.get("step") == step_id
             and step["status"] == TaskStatus.IN_PROGRESS.value
         ):
-            step["status"] = TaskStatus.SUCCESS.value
-            step["completed_at"] = datetime.utcnow().isoformat()
+            step.update(fields, completed_at=datetime.utcnow().isoformat())
             break
+    task.STATUS = {**task.STATUS, "metadata": metadata}
 
-    if all(s["status"] == TaskStatus.SUCCESS.value for s in task.STATUS["metadata"]):
-        task.STATUS["status"] = TaskStatus.SUCCESS.value
 
+def start_step(task, method: StepMethod, step_id: str = None):
+    """Record a running step; ``step_id`` (the workflow step id) tells apart steps of one method."""
+    task.STATUS = {
+        **task.STATUS,
+        "metadata": task.STATUS.get("metadata", []) + [{
+            "method": method.value,
+            "step": step_id,
+            "status": TaskStatus.IN_PROGRESS.value,
+            "started_at": datetime.utcnow().isoformat(),
+            "completed_at": None,
+            "error": None
+        }]
+    }
+
+
+def complete_step(task, method: StepMethod, step_id: str = None):
+    # The task's own status is left to TaskRepository, which keeps the queue counters with it.
+    _update_step(task, method, step_id, status=TaskStatus.SUCCESS.value)
 
-def fail_step(task, method: StepMethod, error: str):
-    for step in task.STATUS["metadata"]:
-        if (
-            step["method"] == method.value
-            and step["status"] == TaskStatus.IN_PROGRESS.value
-        ):
-            step["status"] = TaskStatus.FAILURE.value
-            step["completed_at"] = datetime.utcnow().isoformat()
-            step["error"] = error
-            break
 
-    task.STATUS["status"] = TaskStatus.FAILURE.value
+def fail_step(task, method: StepMethod, error: str, step_id: str = None):
+    _update_step(task, method, step_id, status=TaskStatus.FAILURE.value, error=error)
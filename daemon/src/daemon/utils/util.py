@@ -1,7 +1,12 @@
+import hashlib
 import json
+import os
+import threading
 import jsonschema
 from enum import Enum
-from typing import Dict, Any, Optional
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Any, List
 from datetime import datetime
 from uuid import uuid4
 
@@ -10,6 +15,11 @@ from daemon.logger.log_utils import Logger
 
 logger = Logger()
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 class TaskStatumEnum(str, Enum):
     NOT_STARTED = "Not Started"
@@ -22,33 +32,90 @@ class TaskStatumEnum(str, Enum):
     VALIDATING = "Validating"
 
 
+def loads_json(data):
+    """Parse JSON with orjson when installed, falling back to the standard library."""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError as e:
+            raise json.JSONDecodeError(str(e), data if isinstance(data, str) else "", 0)
+    return json.loads(data)
+
+
+# Root of the daemon's local working files; relative paths of other settings are resolved
+# against it, so they do not depend on the directory the daemon is started from.
+DAEMON_DATA_DIR = Path(os.getenv("DAEMON_DATA_DIR", Path(__file__).resolve().parents[3] / "data")).resolve()
+
+
+def data_path(path) -> Path:
+    """A configured local path, resolved against DAEMON_DATA_DIR unless it is absolute."""
+    return DAEMON_DATA_DIR / path
+
+
+def schema_hash(schema: Dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(schema, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+_validators = {}
+_validators_lock = threading.Lock()
+
+
+def get_schema_validator(schema: Dict[str, Any]):
+    """
+    Compiled validator for a schema, built once per process and keyed by the schema hash.
+
+    The schema itself is checked on first use, so an invalid schema fails loudly once
+    instead of on every document.
+    """
+    key = schema_hash(schema)
+    validator = _validators.get(key)
+    if validator is None:
+        with _validators_lock:
+            validator = _validators.get(key)
+            if validator is None:
+                validator_cls = jsonschema.validators.validator_for(schema)
+                validator_cls.check_schema(schema)
+                validator = validator_cls(schema)
+                _validators[key] = validator
+    return validator
+
+
+def schema_errors(instance: Any, schema: Dict[str, Any]) -> List[str]:
+    """Validation errors of an instance as ``<json path>: <message>`` strings, empty when valid."""
+    return [
+        f"{error.json_path}: {error.message}"
+        for error in get_schema_validator(schema).iter_errors(instance)
+    ]
+
+
+def extract_json(data: str) -> Any:
+    """Parse LLM output as JSON, falling back to the outermost object or array in the text."""
+    try:
+        return loads_json(data)
+    except json.JSONDecodeError:
+        pass
+    for opening, closing in (("{", "}"), ("[", "]")):
+        start, end = data.find(opening), data.rfind(closing) + 1
+        if start >= 0 and end > start:
+            try:
+                return loads_json(data[start:end])
+            except json.JSONDecodeError:
+                continue
+    raise json.JSONDecodeError("No JSON value found in LLM output", data, 0)
+
+
 def validate_json_against_schema(data: str, schema: Dict[str, Any]) -> Dict[str, Any]:
     """Validate LLM JSON output against schema with repair attempts."""
     try:
-        parsed = json.loads(data)
-        jsonschema.validate(instance=parsed, schema=schema)
-        return parsed
+        parsed = extract_json(data)
     except json.JSONDecodeError:
-        return _repair_json(data)
-    except jsonschema.ValidationError as e:
-        logger.warning(f"Schema validation failed: {e}")
-        return _repair_json(data, schema)
-
-
-def _repair_json(json_str: str, schema: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-    """Repair malformed JSON from LLM."""
-    # Simple repair: extract JSON-like content
-    start = json_str.find('{')
-    end = json_str.rfind('}') + 1
-    if start >= 0 and end > start:
-        try:
-            return json.loads(json_str[start:end])
-        except:
-            pass
-    
-    # Fallback: return as dict with warning
-    logger.warning("JSON repair failed, returning raw string")
-    return {"raw_response": json_str, "error": "invalid_json"}
+        logger.warning("JSON repair failed, returning raw string")
+        return {"raw_response": data, "error": "invalid_json"}
+
+    errors = schema_errors(parsed, schema)
+    if errors:
+        logger.warning(f"Schema validation failed: {errors}")
+    return parsed
 
 
 def get_unique_number():
@@ -58,3 +125,20 @@ def get_unique_number():
 def get_current_datetime():
     UTC_ISO_TIME_FORMAT = "%Y-%m-%dT%H:%M:%S.000Z"
     return datetime.utcnow().strftime(UTC_ISO_TIME_FORMAT)
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens with tiktoken when installed, otherwise estimate ~4 characters per token."""
+    encoder = _get_token_encoder()
+    if encoder is None:
+        return (len(text) + 3) // 4
+    return len(encoder.encode(text, disallowed_special=()))
+
+
+@lru_cache(maxsize=1)
+def _get_token_encoder():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
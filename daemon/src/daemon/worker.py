@@ -1,53 +1,60 @@
-import asyncio
+import os
 
+from daemon.common.cassette import RECORD, get_cassette
 from daemon.db.azure.base import DBConnection
-from daemon.llm.llm_client import LLMClient
-from daemon.processors.parse import DoclingParser
+from daemon.logger.log_utils import Logger, bind
+from daemon.queue_listener import TaskQueueListener
 from daemon.task_repository import TaskRepository
+from daemon.workflow_executor import WorkflowExecutor
+
+logger = Logger()
+
+# Runs of a task before it is marked failed; retries resume from the failed step.
+TASK_MAX_ATTEMPTS = int(os.getenv("TASK_MAX_ATTEMPTS", 3))
+# Longest wait for a queue notification before polling again.
+TASK_POLL_INTERVAL = float(os.getenv("TASK_POLL_INTERVAL", 2))
+
 
 class ExtractoWorker:
 
     def __init__(self):
-        self.llm = LLMClient()
+        self.executor = None
 
     async def run_forever(self):
-        session = DBConnection().get_session()
+        db_connection = DBConnection()
+        session = db_connection.get_session()
+        listener = TaskQueueListener(db_connection.engine)
+        # One executor (and so one parser and LLM client) serves every task of this worker.
+        self.executor = WorkflowExecutor(session)
         while True:
             task = TaskRepository.fetch_next_task(session)
 
             if not task:
-                await asyncio.sleep(2)
+                # End the read transaction so the next claim sees newly committed tasks.
+                session.commit()
+                await listener.wait(TASK_POLL_INTERVAL)
                 continue
 
-            try:
-                await self.process_task(session, task)
-            except Exception as e:
-                TaskRepository.fail(session, task, str(e))
+            # Every record logged while the task runs carries its id.
+            with bind(task_id=str(task.ID)):
+                try:
+                    await self.process_task(session, task)
+                except Exception as e:
+                    logger.error(f"Task {task.ID} failed: {e}")
+                    session.rollback()
+                    if task.STATUS.get("attempts", 0) + 1 < TASK_MAX_ATTEMPTS:
+                        TaskRepository.requeue(session, task)
+                    else:
+                        TaskRepository.mark_failure(session, task)
+
+            if get_cassette().mode == RECORD:
+                # Append the recordings of this task, a stopped daemon keeps what it recorded.
+                get_cassette().save()
 
     async def process_task(self, session, task):
-        #TODO: Redo the logic in process task to work with workflow config
-
-        # Ingestion
-        TaskRepository.update_status(session, task, "INGESTING")
-
-        # Load + Parse documents
-        TaskRepository.update_status(session, task, "PARSING")
-        text = await DoclingParser().parse_documents(task.DOCUMENT_IDS)
-
-        # Extract
-        TaskRepository.update_status(session, task, "EXTRACTING")
-        extracted = await self.llm.extract(
-            text=text,
-            schema={}  # fetch from Project.WORKFLOW later
-        )
-
-        # Summarize
-        TaskRepository.update_status(session, task, "SUMMARIZING")
-        summary = await self.llm.summarize(text)
-
-        TaskRepository.succeed(
-            session,
-            task,
-            ai_result=extracted,
-            output={"summary": summary}
-        )
+        workflow = TaskRepository.get_project_workflow(session, task)
+        TaskRepository.mark_in_progress(session, task)
+
+        await self.executor.execute(task, workflow)
+
+        TaskRepository.mark_success(session, task)
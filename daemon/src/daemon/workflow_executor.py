@@ -1,8 +1,24 @@
+import asyncio
+import os
+from typing import Any, Dict
+
+from daemon.checkpoint_repository import CheckpointRepository
 from daemon.constants.enums import StepMethod
+from daemon.logger.log_utils import Logger, bind
 from daemon.processors.ingest import IngestingProcessor
 from daemon.processors.parse import DoclingParser
-from daemon.processors.extract import ExtractingProcessor
+from daemon.processors.extract import ExtractingProcessor, document_key
 from daemon.processors.summarize import SummarizingProcessor
+from daemon.search_repository import SearchRepository
+from daemon.utils.status_utils import complete_step, fail_step, start_step
+from daemon.workflow_graph import WorkflowNode, build_graph, evaluate_condition, run_graph
+
+logger = Logger()
+
+# Steps (and per-document runs of one step) executed at the same time.
+WORKFLOW_MAX_PARALLEL = int(os.getenv("WORKFLOW_MAX_PARALLEL", 4))
+# Index parsed text and extraction results for full-text search as tasks complete.
+SEARCH_INDEXING = os.getenv("SEARCH_INDEXING", "true").lower() == "true"
 
 
 class WorkflowExecutor:
@@ -13,37 +29,168 @@ class WorkflowExecutor:
         self.extractor = ExtractingProcessor()
         self.summarizer = SummarizingProcessor()
 
+    def _save_partial_result(self, task, fields: dict):
+        # Streamed fields are committed as they arrive so clients polling the task see them early.
+        task.AI_RESULT = fields
+        self.session.commit()
+
+    async def _run_method(self, task, node: WorkflowNode, context: dict, documents, stream: bool) -> Any:
+        if node.method == StepMethod.INGESTING:
+            context["documents"] = self.ingestor.ingest_documents(task, self.session)
+            context["paths"] = [document["path"] for document in context["documents"]]
+            return None
+
+        if node.method == StepMethod.PARSING:
+            # Parsing is CPU bound; a thread keeps parallel branches of the workflow running.
+            # It returns plain results: the task and the session are only touched on the loop.
+            parsed, stats = await asyncio.to_thread(self.parser.convert, context["documents"])
+            context["parsed"] = parsed
+            context["text"] = "\n\n".join(document.text for document in parsed)
+            context["parse_stats"] = stats
+            return None
+
+        text = "\n\n".join(document.text for document in documents) if documents else context["text"]
+        if node.method == StepMethod.EXTRACTING:
+            return await self.extractor.run(
+                task,
+                text,
+                node.config,
+                documents=documents,
+                on_partial=(lambda fields: self._save_partial_result(task, fields)) if stream else None
+            )
+        return await self.summarizer.run(task, text, node.config, documents=documents)
+
+    async def _run_node(self, task, node: WorkflowNode, context: dict, max_parallel: int, stream: bool) -> Any:
+        if not node.forEach:
+            return await self._run_method(task, node, context, context.get("parsed"), stream)
+
+        # Fan-out: one run per parsed document, fanned back in as a result per document id.
+        documents = context["parsed"]
+        semaphore = asyncio.Semaphore(max_parallel)
+
+        async def run_document(document):
+            async with semaphore:
+                return await self._run_method(task, node, context, [document], False)
+
+        outputs = await asyncio.gather(*(run_document(document) for document in documents))
+        return {document_key(document, position): output for position, (document, output)
+                in enumerate(zip(documents, outputs))}
+
+    @staticmethod
+    def _checkpoint(node: WorkflowNode, context: dict, output: Any) -> dict:
+        """Output of a finished step to persist. Parsed documents are referenced, not copied."""
+        if node.method == StepMethod.INGESTING:
+            return {"documents": context["documents"]}
+        if node.method == StepMethod.PARSING:
+            return {
+                "documentIds": [document.documentId for document in context["parsed"]],
+                "parseStats": context["parse_stats"]
+            }
+        return {"output": output}
+
+    def _restore(self, node: WorkflowNode, checkpoint: dict, context: dict) -> bool:
+        """Load a step's checkpoint into the context, False when it cannot be restored."""
+        if node.method == StepMethod.INGESTING:
+            # Downloads are local to the host that ingested them; a retry elsewhere, or after
+            # the download cache was cleared, ingests again.
+            paths = [document["path"] for document in checkpoint["documents"]]
+            if not all(path and os.path.exists(path) for path in paths):
+                return False
+            context["documents"] = checkpoint["documents"]
+            context["paths"] = paths
+
+        elif node.method == StepMethod.PARSING:
+            parsed = []
+            for document_id in checkpoint["documentIds"]:
+                document = self.parser.store.load(document_id) if document_id else None
+                if document is None:
+                    return False
+                parsed.append(document)
+            context["parsed"] = parsed
+            context["text"] = "\n\n".join(document.text for document in parsed)
+            context["parse_stats"] = checkpoint.get("parseStats", [])
+
+        return "output" in checkpoint or node.method in (StepMethod.INGESTING, StepMethod.PARSING)
+
+    @staticmethod
+    def _collect(nodes, results: Dict[str, Any], method: StepMethod):
+        # A single step keeps the flat result of linear workflows; several are keyed by step id.
+        ids = [node.id for node in nodes if node.method == method and node.id in results]
+        if len(ids) == 1:
+            return results[ids[0]]
+        return {node_id: results[node_id] for node_id in ids} if ids else None
+
     async def execute(self, task, workflow: dict):
-        context = {}
+        """
+        Run the workflow graph, checkpointing the output of each step.
+
+        Steps start once their dependencies finish, up to ``maxParallel`` of the workflow
+        (WORKFLOW_MAX_PARALLEL by default) at a time; steps whose ``when`` condition is false
+        are skipped. A retried task restores the checkpoints of steps whose dependencies were
+        all restored and runs everything else again.
+        """
+        nodes = build_graph(workflow)
+        max_parallel = int(workflow.get("maxParallel", WORKFLOW_MAX_PARALLEL))
+        extraction_steps = [node for node in nodes if node.method == StepMethod.EXTRACTING]
+        # Streamed partial results go to AI_RESULT, which only works for a single extraction.
+        stream = len(extraction_steps) == 1 and not extraction_steps[0].forEach
 
-        for step in workflow.get("steps", []):
-            if not step.get("enabled", True):
-                continue
+        context, results = {}, {}
+        checkpoints = CheckpointRepository.load(self.session, task)
+        # Steps restored or skipped in this run; only their dependents may be restored too.
+        unchanged = set()
 
-            method = StepMethod(step["method"])
-            config = step.get("config", {})
+        async def run_node(node: WorkflowNode):
+            # Each node runs in its own asyncio task, so the step id stays with its records.
+            with bind(step=node.id):
+                await run_step(node)
 
-            if method == StepMethod.INGESTING:
-                context["paths"] = self.ingestor.ingest(task, self.session)
+        async def run_step(node: WorkflowNode):
+            if not evaluate_condition(node.when, results):
+                logger.info(f"Task {task.ID}: skipped {node.id}, condition not met")
+                unchanged.add(node.id)
+                return
 
-            elif method == StepMethod.PARSING:
-                context["text"] = self.parser.parse_documents(
-                    task, context["paths"]
-                )
+            checkpoint = checkpoints.get(node.key)
+            if (checkpoint is not None and all(dependency in unchanged for dependency in node.dependsOn)
+                    and self._restore(node, checkpoint, context)):
+                if "output" in checkpoint:
+                    results[node.id] = checkpoint["output"]
+                unchanged.add(node.id)
+                logger.info(f"Task {task.ID}: restored {node.id} from checkpoint")
+                return
 
-            elif method == StepMethod.EXTRACTING:
-                context["extracted"] = await self.extractor.run(
-                    task, context["text"], config
-                )
+            # Step metadata is kept per workflow step, so parallel steps of one method stay apart.
+            start_step(task, node.method, node.id)
+            try:
+                output = await self._run_node(task, node, context, max_parallel, stream)
+            except Exception as e:
+                fail_step(task, node.method, str(e), node.id)
+                raise
+            complete_step(task, node.method, node.id)
+            if node.method not in (StepMethod.INGESTING, StepMethod.PARSING):
+                results[node.id] = output
+            CheckpointRepository.save(self.session, task, node.key, self._checkpoint(node, context, output))
 
-            elif method == StepMethod.SUMMARIZING:
-                context["summary"] = await self.summarizer.run(
-                    task, context["text"], config
-                )
+        await run_graph(nodes, run_node, max_parallel)
 
-        task.AI_RESULT = context.get("extracted", {})
+        task.AI_RESULT = self._collect(nodes, results, StepMethod.EXTRACTING) or {}
         task.OUTPUT = {
-            "summary": context.get("summary")
+            "summary": self._collect(nodes, results, StepMethod.SUMMARIZING),
+            "parseStats": context.get("parse_stats", [])
         }
 
+        if SEARCH_INDEXING and context.get("parsed"):
+            self._index(task, context["parsed"])
+
+        CheckpointRepository.clear(self.session, task)
         self.session.commit()
+
+    def _index(self, task, documents):
+        # A savepoint: a failed index update is logged and leaves the task's results intact.
+        try:
+            with self.session.begin_nested():
+                rows = SearchRepository.index_task(self.session, task, documents, task.AI_RESULT)
+            logger.info(f"Task {task.ID}: indexed {rows} search rows")
+        except Exception as e:
+            logger.warning(f"Task {task.ID}: search indexing failed: {e}")
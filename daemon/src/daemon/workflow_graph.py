@@ -0,0 +1,159 @@
+import asyncio
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from daemon.constants.enums import StepMethod
+
+DOCUMENT = "document"
+
+# Steps that can run once per parsed document.
+_FAN_OUT_METHODS = {StepMethod.EXTRACTING, StepMethod.SUMMARIZING}
+
+
+def step_key(position: int, step: dict) -> str:
+    """
+    Identity of a workflow step for checkpointing: position, method and a hash of its config.
+
+    Editing a step's config changes its key, so an outdated checkpoint is never restored.
+    """
+    config = json.dumps(step.get("config", {}), sort_keys=True, default=str)
+    return f"{position}:{step['method']}:{hashlib.sha256(config.encode('utf-8')).hexdigest()[:16]}"
+
+
+class WorkflowNode(BaseModel):
+    id: str
+    key: str
+    method: StepMethod
+    config: dict = Field(default_factory=dict)
+    dependsOn: List[str] = Field(default_factory=list)
+    when: Optional[dict] = None
+    forEach: Optional[str] = None
+
+
+def build_graph(workflow: dict) -> List[WorkflowNode]:
+    """
+    Turn ``workflow["steps"]`` into validated graph nodes.
+
+    Steps may declare an ``id``, ``dependsOn`` (ids of upstream steps), ``when`` (a condition
+    on an upstream output, see :func:`evaluate_condition`) and ``forEach: "document"`` to run
+    once per parsed document. When no step declares ``dependsOn`` the steps form a chain in
+    list order, as linear workflows always did. Disabled steps are dropped and no longer
+    count as dependencies.
+
+    Raises:
+        ValueError: On duplicate or unknown step ids, unsupported fan-out, or a cycle.
+    """
+    steps = workflow.get("steps", [])
+    explicit = any("dependsOn" in step for step in steps)
+
+    nodes, disabled, previous = [], set(), None
+    for position, step in enumerate(steps):
+        method = StepMethod(step["method"])
+        node_id = step.get("id") or f"{method.value.lower()}_{position}"
+        if not step.get("enabled", True):
+            disabled.add(node_id)
+            continue
+
+        depends_on = step.get("dependsOn", []) if explicit else ([previous] if previous else [])
+        node = WorkflowNode(
+            id=node_id,
+            key=step_key(position, step),
+            method=method,
+            config=step.get("config", {}),
+            dependsOn=depends_on,
+            when=step.get("when"),
+            forEach=step.get("forEach")
+        )
+        if node.forEach not in (None, DOCUMENT):
+            raise ValueError(f"Step '{node_id}': unsupported forEach '{node.forEach}'")
+        if node.forEach and method not in _FAN_OUT_METHODS:
+            raise ValueError(f"Step '{node_id}': {method.value} cannot run per document")
+        nodes.append(node)
+        previous = node_id
+
+    ids = [node.id for node in nodes]
+    if len(set(ids)) != len(ids):
+        raise ValueError("Workflow step ids must be unique")
+    for node in nodes:
+        node.dependsOn = [dependency for dependency in node.dependsOn if dependency not in disabled]
+        unknown = [dependency for dependency in node.dependsOn if dependency not in ids]
+        if unknown:
+            raise ValueError(f"Step '{node.id}' depends on unknown steps {unknown}")
+        if explicit and node.when and node.when.get("step") not in node.dependsOn:
+            raise ValueError(
+                f"Step '{node.id}' has a condition on '{node.when.get('step')}' without depending on it"
+            )
+
+    # Kahn's algorithm: every node must be reachable without a cycle.
+    remaining = {node.id: set(node.dependsOn) for node in nodes}
+    while remaining:
+        ready = [node_id for node_id, dependencies in remaining.items() if not dependencies]
+        if not ready:
+            raise ValueError(f"Workflow has a dependency cycle between {sorted(remaining)}")
+        for node_id in ready:
+            del remaining[node_id]
+        for dependencies in remaining.values():
+            dependencies.difference_update(ready)
+    return nodes
+
+
+def _lookup(value: Any, path: Optional[str]) -> Any:
+    for part in (path.split(".") if path else []):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def evaluate_condition(when: Optional[dict], results: Dict[str, Any]) -> bool:
+    """
+    Evaluate a step condition against the outputs of finished steps.
+
+    ``{"step": <id>, "path": "a.b", <operator>: <value>}`` with one operator of ``equals``,
+    ``notEquals``, ``in`` or ``exists`` (the default, true when the value is present).
+    """
+    if not when:
+        return True
+    value = _lookup(results.get(when["step"]), when.get("path"))
+    if "equals" in when:
+        return value == when["equals"]
+    if "notEquals" in when:
+        return value != when["notEquals"]
+    if "in" in when:
+        return value in when["in"]
+    return (value is not None) == when.get("exists", True)
+
+
+async def run_graph(
+    nodes: List[WorkflowNode],
+    run_node: Callable[[WorkflowNode], Awaitable[None]],
+    max_parallel: int
+):
+    """
+    Run nodes as soon as their dependencies finish, at most ``max_parallel`` at a time.
+
+    The first failure cancels the running nodes and is raised.
+    """
+    pending = {node.id: node for node in nodes}
+    done, running = set(), {}
+
+    while pending or running:
+        for node in list(pending.values()):
+            if len(running) >= max_parallel:
+                break
+            if all(dependency in done for dependency in node.dependsOn):
+                del pending[node.id]
+                running[asyncio.ensure_future(run_node(node))] = node
+
+        finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+        for future in finished:
+            node = running.pop(future)
+            if future.exception():
+                for other in running:
+                    other.cancel()
+                await asyncio.gather(*running, return_exceptions=True)
+                raise future.exception()
+            done.add(node.id)
@@ -62,7 +62,7 @@ export default function ProjectDocuments() {
 
   const getTaskStatus = (documentId: string) => {
     const task = tasks.find((t) => t.documentIds.includes(documentId));
-    return task?.status || "Not Started";
+    return task?.status || "NOT_STARTED";
   };
 
   if (loading) {